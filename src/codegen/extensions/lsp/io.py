@@ -5,9 +5,10 @@ from pathlib import Path
 
 from attr import asdict
 from lsprotocol import types
-from lsprotocol.types import CreateFile, CreateFileOptions, DeleteFile, Position, Range, RenameFile, TextEdit
+from lsprotocol.types import CreateFile, CreateFileOptions, DeleteFile, RenameFile
 from pygls.workspace import TextDocument, Workspace
 
+from codegen.extensions.lsp.range import get_text_edits
 from codegen.sdk.codebase.io.file_io import FileIO
 from codegen.sdk.codebase.io.io import IO
 
@@ -18,7 +19,7 @@ logger = logging.getLogger(__name__)
 class File:
     doc: TextDocument | None
     path: Path
-    change: TextEdit | None = None
+    new_text: str | None = None  # Content written since the last workspace edit, sent to the client as minimal edits
     other_change: CreateFile | RenameFile | DeleteFile | None = None
     version: int = 0
 
@@ -61,12 +62,16 @@ class LSPIO(IO):
         if file.deleted:
             msg = f"File {path} has been deleted"
             raise FileNotFoundError(msg)
-        if file.change:
-            return file.change.new_text
+        if file.new_text is not None:
+            return file.new_text
+        return self._read_client_text(file)
+
+    def _read_client_text(self, file: File) -> str:
+        """Returns the content of the file as the client has it, ignoring any changes not sent yet"""
         if file.created:
             return ""
         if file.doc is None:
-            return self.base_io.read_text(path)
+            return self.base_io.read_text(file.path)
         return file.doc.source
 
     def read_bytes(self, path: Path) -> bytes:
@@ -74,8 +79,8 @@ class LSPIO(IO):
         if file.deleted:
             msg = f"File {path} has been deleted"
             raise FileNotFoundError(msg)
-        if file.change:
-            return file.change.new_text.encode("utf-8")
+        if file.new_text is not None:
+            return file.new_text.encode("utf-8")
         if file.created:
             return b""
         if file.doc is None:
@@ -84,18 +89,11 @@ class LSPIO(IO):
 
     def write_bytes(self, path: Path, content: bytes) -> None:
         logger.info(f"Writing bytes to {path}")
-        start = Position(line=0, character=0)
         file = self._get_file(path)
-        if self.file_exists(path):
-            lines = self.read_text(path).splitlines()
-            if len(lines) == 0:
-                end = Position(line=0, character=0)
-            else:
-                end = Position(line=len(lines) - 1, character=len(lines[-1]))
-            file.change = TextEdit(range=Range(start=start, end=end), new_text=content.decode("utf-8"))
-        else:
+        if not self.file_exists(path):
             file.other_change = CreateFile(uri=path.as_uri(), options=CreateFileOptions())
-            file.change = TextEdit(range=Range(start=start, end=start), new_text=content.decode("utf-8"))
+        # The edits are only computed once the workspace edit is requested, against the content the client has
+        file.new_text = content.decode("utf-8")
 
     def save_files(self, files: set[Path] | None = None) -> None:
         logger.info(f"Saving files {files}")
@@ -112,7 +110,7 @@ class LSPIO(IO):
         file = self._get_file(path)
         if file.deleted:
             return False
-        if file.change:
+        if file.new_text is not None:
             return True
         if file.created:
             return True
@@ -131,19 +129,33 @@ class LSPIO(IO):
         document_changes = []
         for _, file in self.files.items():
             id = file.identifier
+            # Diff against the client's content before the create is sent, as a created file is still empty there
+            edits = None if file.new_text is None else get_text_edits(self._read_client_text(file), file.new_text)
             if file.other_change:
                 document_changes.append(file.other_change)
                 file.other_change = None
-            if file.change:
-                document_changes.append(types.TextDocumentEdit(text_document=id, edits=[file.change]))
+            if edits:
+                document_changes.append(types.TextDocumentEdit(text_document=id, edits=edits))
                 file.version += 1
-                file.change = None
+            file.new_text = None
         logger.info(f"Workspace edit: {pprint.pformat(list(map(asdict, document_changes)))}")
         return types.WorkspaceEdit(document_changes=document_changes)
 
-    def update_file(self, path: Path, version: int | None = None) -> None:
+    def get_document(self, path: Path) -> TextDocument:
+        """Returns the document as the graph last read it, to resolve positions against the same content"""
+        file = self._get_file(path)
+        if file.doc is None:
+            return self._get_doc(path)
+        return file.doc
+
+    def update_file(self, path: Path, version: int | None = None, source: str | None = None) -> None:
+        """Reads the file from the client from now on, as of `source` if given or as the workspace has it otherwise"""
         file = self._get_file(path)
-        file.doc = self.workspace.get_text_document(path.as_uri())
+        if source is None:
+            file.doc = self.workspace.get_text_document(path.as_uri())
+        else:
+            # The workspace document keeps changing as notifications arrive, so keep the content as of this version
+            file.doc = TextDocument(path.as_uri(), source=source, version=version, position_codec=self.workspace.position_codec)
         if version is not None:
             file.version = version
 
@@ -9,8 +9,6 @@ from codegen.extensions.lsp.protocol import CodegenLanguageServerProtocol
 from codegen.extensions.lsp.range import get_range
 from codegen.extensions.lsp.server import CodegenLanguageServer
 from codegen.extensions.lsp.utils import get_path
-from codegen.sdk.codebase.diff_lite import ChangeType, DiffLite
-from codegen.sdk.core.file import SourceFile
 
 version = getattr(codegen, "__version__", "v0.1")
 server = CodegenLanguageServer("codegen", version, protocol_cls=CodegenLanguageServerProtocol)
@@ -24,11 +22,8 @@ def did_open(server: CodegenLanguageServer, params: types.DidOpenTextDocumentPar
     # The document is automatically added to the workspace by pygls
     # We can perform any additional processing here if needed
     path = get_path(params.text_document.uri)
-    server.io.update_file(path, params.text_document.version)
-    file = server.codebase.get_file(str(path), optional=True)
-    if not isinstance(file, SourceFile) and path.suffix in server.codebase.ctx.extensions:
-        sync = DiffLite(change_type=ChangeType.Added, path=path)
-        server.codebase.ctx.apply_diffs([sync])
+    # The graph only changes if the document is new to it, which the worker checks once it holds the graph lock
+    server.sync.schedule_open(path, params.text_document.version, params.text_document.text)
 
 
 @server.feature(types.TEXT_DOCUMENT_DID_CHANGE)
@@ -38,22 +33,27 @@ def did_change(server: CodegenLanguageServer, params: types.DidChangeTextDocumen
     # The document is automatically updated in the workspace by pygls
     # We can perform any additional processing here if needed
     path = get_path(params.text_document.uri)
-    server.io.update_file(path, params.text_document.version)
-    sync = DiffLite(change_type=ChangeType.Modified, path=path)
-    server.codebase.ctx.apply_diffs([sync])
+    # Keystrokes arrive faster than the graph can be re-synced, so the new version is only buffered here and the
+    # worker applies the versions buffered since the last batch at once, without blocking the event loop
+    document = server.workspace.get_text_document(params.text_document.uri)
+    server.sync.schedule(path, params.text_document.version, document.source)
 
 
 @server.feature(types.WORKSPACE_TEXT_DOCUMENT_CONTENT)
+@server.thread()
 def workspace_text_document_content(server: CodegenLanguageServer, params: types.TextDocumentContentParams) -> types.TextDocumentContentResult:
     """Handle workspace text document content notification."""
     logger.debug(f"Workspace text document content: {params.uri}")
     path = get_path(params.uri)
-    if not server.io.file_exists(path):
-        logger.warning(f"File does not exist: {path}")
-        return types.TextDocumentContentResult(
-            text="",
-        )
-    content = server.io.read_text(path)
+    # The content needs no graph, so a version still waiting for the next batch is served without flushing
+    with server.sync.lock:
+        if (content := server.sync.pending_source(path)) is None:
+            if not server.io.file_exists(path):
+                logger.warning(f"File does not exist: {path}")
+                return types.TextDocumentContentResult(
+                    text="",
+                )
+            content = server.io.read_text(path)
     return types.TextDocumentContentResult(
         text=content,
     )
@@ -66,72 +66,89 @@ def did_close(server: CodegenLanguageServer, params: types.DidCloseTextDocumentP
     # The document is automatically removed from the workspace by pygls
     # We can perform any additional cleanup here if needed
     path = get_path(params.text_document.uri)
-    server.io.close_file(path)
+    # Once the close is applied, the file is read from disk again
+    server.sync.schedule_close(path)
 
 
 @server.feature(
     types.TEXT_DOCUMENT_RENAME,
     options=types.RenameOptions(work_done_progress=True),
 )
+@server.thread()
 def rename(server: CodegenLanguageServer, params: types.RenameParams) -> types.RenameResult:
-    symbol = server.get_symbol(params.text_document.uri, params.position)
-    if symbol is None:
-        logger.warning(f"No symbol found at {params.text_document.uri}:{params.position}")
-        return
-    logger.info(f"Renaming symbol {symbol.name} to {params.new_name}")
-    task = server.progress_manager.begin_with_token(f"Renaming symbol {symbol.name} to {params.new_name}", params.work_done_token)
-    symbol.rename(params.new_name)
-    task.update("Committing changes")
-    server.codebase.commit()
-    task.end()
-    return server.io.get_workspace_edit()
+    with server.sync.flushed():
+        symbol = server.get_symbol(params.text_document.uri, params.position)
+        if symbol is None:
+            logger.warning(f"No symbol found at {params.text_document.uri}:{params.position}")
+            return
+        logger.info(f"Renaming symbol {symbol.name} to {params.new_name}")
+        task = server.progress_manager.begin_with_token(f"Renaming symbol {symbol.name} to {params.new_name}", params.work_done_token)
+        symbol.rename(params.new_name)
+        task.update("Committing changes")
+        server.codebase.commit()
+        task.end()
+        return server.io.get_workspace_edit()
 
 
 @server.feature(
     types.TEXT_DOCUMENT_DOCUMENT_SYMBOL,
     options=types.DocumentSymbolOptions(work_done_progress=True),
 )
+@server.thread()
 def document_symbol(server: CodegenLanguageServer, params: types.DocumentSymbolParams) -> types.DocumentSymbolResult:
-    file = server.get_file(params.text_document.uri)
-    symbols = []
-    task = server.progress_manager.begin_with_token(f"Getting document symbols for {params.text_document.uri}", params.work_done_token, count=len(file.symbols))
-    for idx, symbol in enumerate(file.symbols):
-        task.update(f"Getting document symbols for {params.text_document.uri}", count=idx)
-        symbols.append(get_document_symbol(symbol))
-    task.end()
-    return symbols
+    # Needs no position from the client, so the symbols are served from the last applied batch without waiting for pending changes
+    with server.sync.lock:
+        file = server.get_file(params.text_document.uri)
+        symbols = []
+        task = server.progress_manager.begin_with_token(f"Getting document symbols for {params.text_document.uri}", params.work_done_token, count=len(file.symbols))
+        for idx, symbol in enumerate(file.symbols):
+            task.update(f"Getting document symbols for {params.text_document.uri}", count=idx)
+            symbols.append(get_document_symbol(symbol))
+        task.end()
+        return symbols
 
 
 @server.feature(
     types.TEXT_DOCUMENT_DEFINITION,
     options=types.DefinitionOptions(work_done_progress=True),
 )
+@server.thread()
 def definition(server: CodegenLanguageServer, params: types.DefinitionParams):
-    node = server.get_node_under_cursor(params.text_document.uri, params.position)
-    task = server.progress_manager.begin_with_token(f"Getting definition for {params.text_document.uri}", params.work_done_token)
-    resolved = go_to_definition(node, params.text_document.uri, params.position)
-    task.end()
-    return types.Location(
-        uri=resolved.file.path.as_uri(),
-        range=get_range(resolved),
-    )
+    # The position refers to the client's latest version of the document, and LSPIO only keeps the version the graph
+    # was built from. Mapping positions between the two would need every edit in between, so pending changes are
+    # applied first and the position and the returned range both refer to the client's version.
+    with server.sync.flushed():
+        node = server.get_node_under_cursor(params.text_document.uri, params.position)
+        task = server.progress_manager.begin_with_token(f"Getting definition for {params.text_document.uri}", params.work_done_token)
+        resolved = go_to_definition(node, params.text_document.uri, params.position)
+        task.end()
+        return types.Location(
+            uri=resolved.file.path.as_uri(),
+            range=get_range(resolved),
+        )
 
 
 @server.feature(
     types.TEXT_DOCUMENT_CODE_ACTION,
     options=types.CodeActionOptions(resolve_provider=True, work_done_progress=True),
 )
+@server.thread()
 def code_action(server: CodegenLanguageServer, params: types.CodeActionParams) -> types.CodeActionResult:
     logger.info(f"Received code action: {params}")
-    actions = server.get_actions_for_range(params)
+    # Like definition, the range is resolved against the client's latest version of the document
+    with server.sync.flushed():
+        actions = server.get_actions_for_range(params)
     return actions
 
 
 @server.feature(
     types.CODE_ACTION_RESOLVE,
 )
+@server.thread()
 def code_action_resolve(server: CodegenLanguageServer, params: types.CodeAction) -> types.CodeAction:
-    return server.resolve_action(params)
+    # Resolving runs the action's codemod, which edits the graph and returns edits against the client's version
+    with server.sync.flushed():
+        return server.resolve_action(params)
 
 
 if __name__ == "__main__":
@@ -2,11 +2,12 @@ import os
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-from lsprotocol.types import INITIALIZE, InitializeParams, InitializeResult
+from lsprotocol.types import INITIALIZE, SHUTDOWN, InitializeParams, InitializeResult
 from pygls.protocol import LanguageServerProtocol, lsp_method
 
 from codegen.extensions.lsp.io import LSPIO
 from codegen.extensions.lsp.progress import LSPProgress
+from codegen.extensions.lsp.sync import GraphSync
 from codegen.extensions.lsp.utils import get_path
 from codegen.sdk.codebase.config import CodebaseConfig
 from codegen.sdk.core.codebase import Codebase
@@ -32,6 +33,7 @@ class CodegenLanguageServerProtocol(LanguageServerProtocol):
         self._server.codebase = Codebase(repo_path=str(root), config=config, io=io, progress=progress)
         self._server.progress_manager = progress
         self._server.io = io
+        self._server.sync = GraphSync(self._server.codebase)
         progress.finish_initialization()
 
     @lsp_method(INITIALIZE)
@@ -39,3 +41,10 @@ class CodegenLanguageServerProtocol(LanguageServerProtocol):
         ret = super().lsp_initialize(params)
         self._init_codebase(params)
         return ret
+
+    @lsp_method(SHUTDOWN)
+    def lsp_shutdown(self, *args) -> None:
+        # Stop syncing documents before the server exits, rather than in the middle of a batch
+        if getattr(self._server, "sync", None) is not None:
+            self._server.sync.close()
+        return super().lsp_shutdown(*args)
@@ -1,5 +1,9 @@
+import difflib
+import os
+import re
+
 import tree_sitter
-from lsprotocol.types import Position, Range
+from lsprotocol.types import Position, Range, TextEdit
 from pygls.workspace import TextDocument
 
 from codegen.sdk.core.interfaces.editable import Editable
@@ -30,3 +34,75 @@ def get_tree_sitter_range(range: Range, document: TextDocument) -> tree_sitter.R
         start_byte=start_byte,
         end_byte=end_byte,
     )
+
+
+# Line endings of LSP. Unlike str.splitlines, other characters like form feeds do not end a line.
+_LINE_ENDING = re.compile(r"\r\n|\r|\n")
+_LINE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+\Z")
+
+
+def _split_lines(text: str) -> list[str]:
+    r"""Splits text into lines, keeping line endings, like str.splitlines(keepends=True) does for \n, \r\n and \r"""
+    return _LINE.findall(text)
+
+
+def _utf16_length(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _get_position(line: int, block: str, offset: int) -> Position:
+    """Returns the position of an offset into a block of text starting at the given line.
+
+    Characters are counted in UTF-16 code units, the default position encoding of LSP.
+    """
+    line_start = 0
+    for ending in _LINE_ENDING.finditer(block, 0, offset):
+        line += 1
+        line_start = ending.end()
+    return Position(line=line, character=_utf16_length(block[line_start:offset]))
+
+
+def _splits_crlf(block: str, offset: int) -> bool:
+    return 0 < offset < len(block) and block[offset - 1] == "\r" and block[offset] == "\n"
+
+
+def get_text_edits(old_text: str, new_text: str) -> list[TextEdit]:
+    """Returns the edits that turn old_text into new_text, each spanning only the changed characters.
+
+    Lines are diffed first, so the cost scales with the changed region rather than character by character across the
+    whole file. Every changed block of lines is then trimmed down to the characters that actually differ.
+    """
+    old_lines = _split_lines(old_text)
+    new_lines = _split_lines(new_text)
+    # Skip the unchanged lines at the start and end before running the (much slower) line diff
+    start = 0
+    while start < min(len(old_lines), len(new_lines)) and old_lines[start] == new_lines[start]:
+        start += 1
+    end = 0
+    while end < min(len(old_lines), len(new_lines)) - start and old_lines[-end - 1] == new_lines[-end - 1]:
+        end += 1
+    matcher = difflib.SequenceMatcher(None, old_lines[start : len(old_lines) - end], new_lines[start : len(new_lines) - end])
+
+    edits = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        old_block = "".join(old_lines[start + i1 : start + i2])
+        new_block = "".join(new_lines[start + j1 : start + j2])
+        prefix = len(os.path.commonprefix([old_block, new_block]))
+        # A \r\n is a single line ending, so edits never start or end between its characters
+        if _splits_crlf(old_block, prefix) or _splits_crlf(new_block, prefix):
+            prefix -= 1
+        suffix = len(os.path.commonprefix([old_block[prefix:][::-1], new_block[prefix:][::-1]]))
+        if _splits_crlf(old_block, len(old_block) - suffix) or _splits_crlf(new_block, len(new_block) - suffix):
+            suffix -= 1
+        edits.append(
+            TextEdit(
+                range=Range(
+                    start=_get_position(start + i1, old_block, prefix),
+                    end=_get_position(start + i1, old_block, len(old_block) - suffix),
+                ),
+                new_text=new_block[prefix : len(new_block) - suffix],
+            )
+        )
+    return edits
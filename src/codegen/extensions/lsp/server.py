@@ -11,6 +11,7 @@ from codegen.extensions.lsp.execute import execute_action
 from codegen.extensions.lsp.io import LSPIO
 from codegen.extensions.lsp.progress import LSPProgress
 from codegen.extensions.lsp.range import get_tree_sitter_range
+from codegen.extensions.lsp.sync import GraphSync
 from codegen.extensions.lsp.utils import get_path
 from codegen.sdk.core.codebase import Codebase
 from codegen.sdk.core.file import File, SourceFile
@@ -24,6 +25,7 @@ class CodegenLanguageServer(LanguageServer):
     codebase: Optional[Codebase]
     io: Optional[LSPIO]
     progress_manager: Optional[LSPProgress]
+    sync: Optional[GraphSync]
     actions: dict[str, CodeAction]
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
@@ -47,24 +49,35 @@ class CodegenLanguageServer(LanguageServer):
         file = self.get_file(uri)
         resolved_uri = file.path.absolute().as_uri()
         logger.info(f"Getting node under cursor for {resolved_uri} at {position}")
-        document = self.workspace.get_text_document(resolved_uri)
-        candidates = []
+        # Positions are resolved against the content the graph was built from, so callers flush pending changes first
+        document = self.io.get_document(file.path.absolute())
         target_byte = document.offset_at_position(position)
-        end_byte = document.offset_at_position(end_position) if end_position is not None else None
-        for node in file._range_index.nodes:
-            if node.start_byte <= target_byte and node.end_byte >= target_byte:
-                if end_position is not None:
-                    if node.end_byte < end_byte:
-                        continue
-                candidates.append(node)
-        if not candidates:
+        end_byte = max(target_byte, document.offset_at_position(end_position) if end_position is not None else target_byte)
+        if self.codebase.ctx.config.feature_flags.full_range_index:
+            # The smallest node spanning from the cursor to the end position, looked up in the file's interval tree
+            return file._range_index.get_innermost(target_byte, end_byte)
+        return self._get_innermost_canonical(file, target_byte, end_byte)
+
+    def _get_innermost_canonical(self, file: SourceFile, start_byte: int, end_byte: int) -> Editable | None:
+        """Finds the smallest editable spanning a byte range when only canonical editables are in the range index"""
+        # Walk up from the innermost tree-sitter node to the first one with a canonical editable
+        ts_node = file.ts_node.descendant_for_byte_range(start_byte, end_byte)
+        while ts_node is not None and (node := file._range_index.get_canonical_for_range(ts_node.range, ts_node.kind_id)) is None:
+            ts_node = ts_node.parent
+        if ts_node is None:
             return None
-        return min(candidates, key=lambda node: abs(node.end_byte - node.start_byte))
+        # Then back down through the children of that editable, which are created on the way
+        while child := next((child for child in node.children if child.ts_node.start_byte <= start_byte and child.ts_node.end_byte >= end_byte), None):
+            node = child
+        return node
 
     def get_node_for_range(self, uri: str, range: Range) -> Editable | None:
         file = self.get_file(uri)
-        document = self.workspace.get_text_document(uri)
+        document = self.io.get_document(file.path.absolute())
         ts_range = get_tree_sitter_range(range, document)
+        if not self.codebase.ctx.config.feature_flags.full_range_index:
+            node = self._get_innermost_canonical(file, ts_range.start_byte, ts_range.end_byte)
+            return node if node is not None and node.ts_node.range == ts_range else None
         for node in file._range_index.get_all_for_range(ts_range):
             return node
         return None
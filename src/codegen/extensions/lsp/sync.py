@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple
+
+from codegen.sdk.codebase.diff_lite import ChangeType, DiffLite
+from codegen.sdk.core.codebase import Codebase
+from codegen.sdk.core.file import SourceFile
+
+logger = logging.getLogger(__name__)
+
+# Seconds without a new change to a document before the pending changes are applied to the graph
+DEFAULT_DEBOUNCE = 0.1
+
+
+class _DocumentChange(NamedTuple):
+    version: int | None
+    source: str | None  # Content of the document as of version, None to read it from io as it is
+    closed: bool
+    modified: bool  # Whether the graph has to parse the document again, rather than only add it if it is new
+
+
+class GraphSync:
+    """Applies document changes to the graph in the background, batching changes that arrive in quick succession.
+
+    Notifications only buffer the latest version of each document, without waiting for the graph. Once no change has
+    arrived for `debounce` seconds, a worker thread takes everything buffered, hands the new versions to the codebase's
+    io and applies them in a single `apply_diffs`, holding `lock` throughout. If the batch fails, its changes stay
+    buffered and the worker waits for the next change before trying again.
+
+    Requests that need no position from the client hold `lock`, so they are served from the last applied batch and
+    never see one half applied, while document content is served from `pending_source` where a newer version is
+    buffered. Requests resolving a client position or editing the graph use `flushed`, which applies whatever is still
+    buffered first, so the graph matches the client's version of each document.
+    """
+
+    codebase: Codebase
+    debounce: float
+    lock: threading.RLock
+    generation: int  # Number of batches applied so far
+
+    def __init__(self, codebase: Codebase, debounce: float = DEFAULT_DEBOUNCE) -> None:
+        self.codebase = codebase
+        self.debounce = debounce
+        self.lock = threading.RLock()
+        self.generation = 0
+        self._pending: dict[Path, _DocumentChange] = {}
+        self._last_change = 0.0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="graph-sync", daemon=True)
+        self._worker.start()
+
+    @property
+    def pending(self) -> list[Path]:
+        with self._condition:
+            return list(self._pending)
+
+    def pending_source(self, path: Path) -> str | None:
+        """Returns the content of a document as of its latest buffered change, or None if none carried the content"""
+        with self._condition:
+            change = self._pending.get(path)
+            return change.source if change is not None else None
+
+    def schedule(self, path: Path, version: int | None = None, source: str | None = None) -> None:
+        """Buffers a change to a document, to be applied once changes stop arriving.
+
+        `source` is the content of the document as of `version`, which the codebase's LSPIO reads from once the change
+        is applied. Without it, the document is read from the codebase's io as it is.
+        """
+        self._buffer(path, _DocumentChange(version, source, closed=False, modified=True))
+
+    def schedule_open(self, path: Path, version: int, source: str) -> None:
+        """Buffers opening a document. The graph only changes if the document is new to it."""
+        self._buffer(path, _DocumentChange(version, source, closed=False, modified=False))
+
+    def schedule_close(self, path: Path) -> None:
+        """Buffers closing a document, after which it is read from disk again"""
+        self._buffer(path, _DocumentChange(None, None, closed=True, modified=False))
+
+    def flush(self) -> None:
+        """Applies all pending changes before returning"""
+        with self.lock:
+            self._apply_pending()
+
+    @contextmanager
+    def flushed(self) -> Generator[None, None, None]:
+        """Holds the graph lock with all pending changes applied, for requests that resolve client positions or edit the graph"""
+        with self.lock:
+            self._apply_pending()
+            yield
+
+    def close(self) -> None:
+        """Stops the worker thread. Changes still pending are not applied."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join()
+
+    def _buffer(self, path: Path, change: _DocumentChange) -> None:
+        with self._condition:
+            if (previous := self._pending.get(path)) is not None and previous.modified:
+                # The graph still has to catch up with the earlier change, even if this one would not change it
+                change = change._replace(modified=True)
+            self._pending[path] = change
+            self._last_change = time.monotonic()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        failed_change = None
+        while True:
+            with self._condition:
+                # After a failed batch, wait for a new change rather than retrying the same documents right away
+                while (not self._pending or self._last_change == failed_change) and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                # Keep waiting until the document has been quiet for the debounce window
+                while (remaining := self._last_change + self.debounce - time.monotonic()) > 0 and not self._closed:
+                    self._condition.wait(remaining)
+                last_change = self._last_change
+            with self.lock:
+                try:
+                    self._apply_pending()
+                except Exception:
+                    logger.exception("Failed to sync changed documents to the graph")
+                    failed_change = last_change
+
+    def _apply_pending(self) -> None:
+        # Pending changes are only taken while holding the graph lock, so a flush can't miss a batch in flight
+        with self._condition:
+            changes = self._pending
+            self._pending = {}
+        if not changes:
+            return
+        io = self.codebase.ctx.io
+        diffs = []
+        for path, change in changes.items():
+            if change.closed:
+                io.close_file(path)
+            elif change.source is not None:
+                io.update_file(path, change.version, change.source)
+            if change.modified:
+                diffs.append(DiffLite(change_type=ChangeType.Modified, path=path))
+            elif not change.closed and path.suffix in self.codebase.ctx.extensions and not isinstance(self.codebase.get_file(str(path), optional=True), SourceFile):
+                diffs.append(DiffLite(change_type=ChangeType.Added, path=path))
+        if diffs:
+            logger.info(f"Syncing {len(diffs)} changed documents to the graph")
+            try:
+                self.codebase.ctx.apply_diffs(diffs)
+            except Exception:
+                # Keep the documents pending, so the next batch or flush applies them again
+                with self._condition:
+                    self._pending = changes | self._pending
+                raise
+        self.generation += 1
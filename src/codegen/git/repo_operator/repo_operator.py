@@ -5,7 +5,6 @@ import os
 from abc import ABC, abstractmethod
 from collections.abc import Generator
 from datetime import UTC, datetime
-from functools import cached_property
 from time import perf_counter
 
 from codeowners import CodeOwners as CodeOwnersParser
@@ -25,6 +24,9 @@ from codegen.shared.performance.time_utils import humanize_duration
 
 logger = logging.getLogger(__name__)
 
+# git ls-files mode of submodule entries, the only entries that are directories rather than files
+GITLINK_MODE = "160000"
+
 
 class RepoOperator(ABC):
     """A wrapper around GitPython to make it easier to interact with a repo."""
@@ -38,6 +40,7 @@ class RepoOperator(ABC):
     _codeowners_parser: CodeOwnersParser | None = None
     _default_branch: str | None = None
     _remote_git_repo: GitRepoClient | None = None
+    _git_cli: GitCLI | None = None
 
     def __init__(
         self,
@@ -103,9 +106,19 @@ class RepoOperator(ABC):
             if writer.has_option("user", "name"):
                 writer.remove_option("user", "name")
 
-    @cached_property
+    @property
     def git_cli(self) -> GitCLI:
-        git_cli = GitCLI(self.repo_path)
+        if self._git_cli is None:
+            self._git_cli = GitCLI(self.repo_path)
+            self._setup_bot_identity(self._git_cli)
+        return self._git_cli
+
+    @git_cli.setter
+    def git_cli(self, git_cli: GitCLI) -> None:
+        self._git_cli = git_cli
+
+    def _setup_bot_identity(self, git_cli: GitCLI) -> None:
+        """Sets up the user the repo commits as, which is the bot unless bot_commit is off and a user is configured"""
         username = None
         user_level = None
         email = None
@@ -139,7 +152,6 @@ class RepoOperator(ABC):
 
             elif email != CODEGEN_BOT_EMAIL and email_level != "repository":
                 self._unset_bot_email(git_cli)
-        return git_cli
 
     @property
     def head_commit(self) -> GitCommit:
@@ -227,6 +239,16 @@ class RepoOperator(ABC):
     # CHECKOUT, BRANCHES & COMMITS
     ####################################################################################################################
 
+    def set_worktree(self, worktree_path: str | None) -> None:
+        """Runs git operations, such as commits, in a linked worktree of the repo, or back in the repo itself if None.
+
+        Only git operations move: repo_path and the file helpers still point at the repo itself.
+        """
+        if self._git_cli is None:
+            # Worktrees share the config of the repo, so the bot identity set up for the repo applies to them as well
+            self._setup_bot_identity(GitCLI(self.repo_path))
+        self.git_cli = GitCLI(worktree_path or self.repo_path)
+
     def safe_get_commit(self, commit: str) -> GitCommit | None:
         """Gets commit if it exists, else returns None"""
         try:
@@ -487,15 +509,39 @@ class RepoOperator(ABC):
             os.rmdir(self.abspath(os.path.dirname(path)))
 
     def get_filepaths_for_repo(self, ignore_list):
+        return [filepath for filepath, _ in self.list_repo_files(ignore_list)]
+
+    def list_repo_files(self, ignore_list: list[str] | None = None) -> list[tuple[str, bool]]:
+        """Lists every path in the repo as (relative filepath, is_dir) pairs.
+
+        If the repo respects .gitignore this is a single `git ls-files` call, where only submodules are directories,
+        so no path needs to be stat'ed. Otherwise the working tree is globbed and every path is checked.
+        """
         # Get list of files to iterate over based on gitignore setting
         if self.repo_config.respect_gitignore:
-            filepaths = self.git_cli.git.ls_files().split("\n")
+            files = []
+            # -z keeps paths with special characters unquoted. Entries are "<mode> <sha> <stage>\t<path>"
+            for entry in self.git_cli.git.ls_files("-z", "--stage").split("\0"):
+                if entry:
+                    info, filepath = entry.split("\t", 1)
+                    files.append((filepath, info.startswith(GITLINK_MODE)))
+            # Unmerged files are listed once per stage
+            files = list(dict.fromkeys(files))
         else:
-            filepaths = glob.glob("**", root_dir=self.repo_path, recursive=True, include_hidden=True)
-            # Filter filepaths by ignore list.
+            files = [(filepath, os.path.isdir(os.path.join(self.repo_path, filepath))) for filepath in glob.glob("**", root_dir=self.repo_path, recursive=True, include_hidden=True)]
+        # Filter filepaths by ignore list.
         if ignore_list:
-            filepaths = [f for f in filepaths if not any(fnmatch.fnmatch(f, pattern) or f.startswith(pattern) for pattern in ignore_list)]
+            files = [(f, is_dir) for f, is_dir in files if not any(fnmatch.fnmatch(f, pattern) or f.startswith(pattern) for pattern in ignore_list)]
 
+        return files
+
+    @staticmethod
+    def filter_filepaths(filepaths: list[str], subdirs: list[str] | None = None, extensions: list[str] | None = None) -> list[str]:
+        """Filters relative filepaths by subdirectory (which can include full filenames) and extension"""
+        if subdirs:
+            filepaths = [filepath for filepath in filepaths if any(filepath.startswith(subdir) for subdir in subdirs)]
+        if extensions is not None:
+            filepaths = [filepath for filepath in filepaths if any(filepath.endswith(e) for e in extensions)]
         return filepaths
 
     # TODO: unify param naming i.e. subdirectories vs subdirs probably use subdirectories since that's in the DB
@@ -518,22 +564,15 @@ class RepoOperator(ABC):
             tuple: A tuple containing the relative filepath and the content of the file.
 
         """
-        filepaths = self.get_filepaths_for_repo(ignore_list)
+        filepaths = self.filter_filepaths(self.get_filepaths_for_repo(ignore_list), subdirs, extensions)
         # Iterate through files and yield contents
         for rel_filepath in filepaths:
-            rel_filepath: str
             filepath = os.path.join(self.repo_path, rel_filepath)
-
-            # Filter by subdirectory (includes full filenames)
-            if subdirs and not any(rel_filepath.startswith(subdir) for subdir in subdirs):
-                continue
-
-            if extensions is None or any(filepath.endswith(e) for e in extensions):
-                try:
-                    content = self.get_file(filepath)
-                    yield rel_filepath, content
-                except Exception as e:
-                    print(f"Error reading file {filepath}: {e}")
+            try:
+                content = self.get_file(filepath)
+                yield rel_filepath, content
+            except Exception as e:
+                print(f"Error reading file {filepath}: {e}")
 
     def list_files(self, subdirs: list[str] | None = None, extensions: list[str] | None = None) -> list[str]:
         """List files matching subdirs + extensions in a repo.
@@ -18,6 +18,7 @@ class GroupingConfig(BaseModel):
     subdirectories: list[str] | None = None
     group_by: GroupBy | None = None
     max_prs: int | None = None
+    max_workers: int | None = None
 
 
 class BranchConfig(BaseModel):
@@ -1,7 +1,15 @@
+import asyncio
+import functools
 import logging
-from collections.abc import Callable
+import multiprocessing
+from collections.abc import Awaitable, Callable
 from datetime import UTC, datetime
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from tempfile import TemporaryDirectory
 
+from git import GitCommandError
 from github.PullRequest import PullRequest
 
 from codegen.git.models.pr_options import PROptions
@@ -15,6 +23,7 @@ from codegen.sdk.codebase.factory.codebase_factory import CodebaseType
 from codegen.sdk.codebase.flagging.code_flag import CodeFlag
 from codegen.sdk.codebase.flagging.group import Group
 from codegen.sdk.codebase.flagging.groupers.utils import get_grouper_by_group_by
+from codegen.sdk.codebase.io.worktree_io import WorktreeIO
 from codegen.shared.exceptions.control_flow import StopCodemodException
 from codegen.shared.performance.stopwatch_utils import stopwatch
 from codegen.visualizations.viz_utils import get_graph_json
@@ -22,6 +31,43 @@ from codegen.visualizations.viz_utils import get_graph_json
 logger = logging.getLogger(__name__)
 
 
+def _run_forked_group(run_group: Callable[[], Awaitable[tuple[CodemodRunResult, bool]]], conn: Connection) -> None:
+    """Entry point of a forked group worker, which sends (run result, whether it committed) back to the parent"""
+    try:
+        outcome = asyncio.run(run_group())
+    except Exception as e:
+        logger.exception(e)
+        outcome = (CodemodRunResult(is_complete=False, error=str(e), completed_at=datetime.now(tz=UTC)), False)
+    conn.send(outcome)
+    conn.close()
+
+
+async def _receive_group_outcome(conn: Connection, process: BaseProcess) -> tuple[CodemodRunResult, bool]:
+    """Waits for a group worker's outcome on the event loop.
+
+    A waiter thread would still be running when the next group forks, and forking a multi-threaded process is unsafe.
+    """
+    loop = asyncio.get_running_loop()
+    readable = loop.create_future()
+
+    def on_readable() -> None:
+        loop.remove_reader(conn.fileno())
+        readable.set_result(None)
+
+    loop.add_reader(conn.fileno(), on_readable)
+    try:
+        await readable
+        outcome = conn.recv()
+    except EOFError:
+        process.join()
+        outcome = (CodemodRunResult(is_complete=False, error=f"Group worker exited with code {process.exitcode}", completed_at=datetime.now(tz=UTC)), False)
+    finally:
+        loop.remove_reader(conn.fileno())
+        conn.close()
+    process.join()
+    return outcome
+
+
 class SandboxExecutor:
     """Responsible for executing the user defined codemod in the sandbox."""
 
@@ -54,7 +100,13 @@ class SandboxExecutor:
         logger.info(f"> Created {len(groups)} groups")
         return groups
 
-    async def execute_flag_groups(self, commit_msg: str, execute_func: Callable, flag_groups: list[Group], branch_config: BranchConfig) -> tuple[list[CodemodRunResult], list[CreatedBranch]]:
+    async def execute_flag_groups(
+        self, commit_msg: str, execute_func: Callable, flag_groups: list[Group], branch_config: BranchConfig, max_workers: int = 1
+    ) -> tuple[list[CodemodRunResult], list[CreatedBranch]]:
+        # Groups sharing a custom head branch build on each other, so they have to run in sequence
+        if max_workers > 1 and len(flag_groups) > 1 and not branch_config.custom_head_branch:
+            return await self._execute_flag_groups_in_parallel(commit_msg, execute_func, flag_groups, branch_config, max_workers)
+
         run_results = []
         head_branches = []
         for idx, group in enumerate(flag_groups):
@@ -80,6 +132,77 @@ class SandboxExecutor:
         self.codebase.ctx.flags._flags.clear()
         return run_results, head_branches
 
+    async def _execute_flag_groups_in_parallel(
+        self, commit_msg: str, execute_func: Callable, flag_groups: list[Group], branch_config: BranchConfig, max_workers: int
+    ) -> tuple[list[CodemodRunResult], list[CreatedBranch]]:
+        """Runs each group in a forked worker against its own git worktree, then pushes the resulting branches.
+
+        Workers are forked from the warmed codebase and share its graph copy-on-write, so the parent graph is never
+        modified and no codebase.reset() is needed between groups.
+        """
+        base_branch = branch_config.custom_base_branch
+        head_branches = [get_head_branch_name(branch_config.branch_name, group) for group in flag_groups]
+        # Workers fork the graph of the current checkout, so the worktrees have to start from the same commit
+        if base_branch is not None and not self.codebase.op.is_branch_checked_out(base_branch):
+            logger.info(f"Checking out base branch {base_branch} ...")
+            self.codebase.checkout(branch=base_branch, create_if_missing=True)
+        start_point = base_branch or self.codebase.op.head_commit.hexsha
+        mp_context = multiprocessing.get_context("fork")
+        slots = asyncio.Semaphore(max_workers)
+
+        async def fork_group(idx: int, worktrees_dir: Path) -> tuple[CodemodRunResult, bool]:
+            # One process per group, so that every group starts from the unmodified graph. Only groups holding a slot
+            # have a worktree checked out, and the branch committed to outlives it.
+            async with slots:
+                worktree = worktrees_dir / str(idx)
+                try:
+                    self.remote_repo.add_worktree(start_point, head_branches[idx], worktree)
+                except GitCommandError as e:
+                    # Fail only this group, the others are still running in their worktrees
+                    logger.exception(e)
+                    return CodemodRunResult(is_complete=False, error=str(e), completed_at=datetime.now(tz=UTC)), False
+                try:
+                    receiver, sender = mp_context.Pipe(duplex=False)
+                    run_group = functools.partial(self._execute_group_in_worktree, commit_msg, execute_func, flag_groups[idx], worktree)
+                    process = mp_context.Process(target=functools.partial(_run_forked_group, run_group, sender))
+                    process.start()
+                    sender.close()
+                    return await _receive_group_outcome(receiver, process)
+                finally:
+                    self.remote_repo.remove_worktree(worktree)
+
+        with TemporaryDirectory(prefix="codegen-worktrees-") as worktrees_dir:
+            logger.info(f"Running {len(flag_groups)} groups with {max_workers} workers ...")
+            outcomes = await asyncio.gather(*(fork_group(idx, Path(worktrees_dir)) for idx in range(len(flag_groups))))
+
+        run_results = []
+        created_branches = []
+        for (run_result, has_commit), head_branch in zip(outcomes, head_branches):
+            if run_results and run_results[-1].error:
+                logger.info("Skipping remaining groups because of error in previous group")
+                break
+            created_branch = CreatedBranch(base_branch=base_branch, head_ref=None)
+            if has_commit and self.remote_repo.push_branch(head_branch, branch_config.force_push_head_branch):
+                created_branch.head_ref = head_branch
+            run_results.append(run_result)
+            created_branches.append(created_branch)
+
+        self.codebase.ctx.flags._flags.clear()
+        return run_results, created_branches
+
+    async def _execute_group_in_worktree(self, commit_msg: str, execute_func: Callable, group: Group, worktree: Path) -> tuple[CodemodRunResult, bool]:
+        """Runs a single group inside a forked worker and commits its changes to the worktree's head branch.
+
+        The forked codebase is a private copy, so its IO and git operations are repointed at the worktree, and only the
+        flags of the group are kept for the diff.
+        """
+        self.codebase.ctx.io = WorktreeIO(Path(self.codebase.ctx.repo_path), worktree)
+        self.codebase.op.set_worktree(str(worktree))
+        self.codebase.ctx.flags._flags[:] = group.flags
+        run_result = await self.execute(execute_func, group=group)
+        has_commit = self.codebase.git_commit(f"[Codegen] {commit_msg}") is not None
+        return run_result, has_commit
+
     async def execute(self, execute_func: Callable, group: Group | None = None, session_options: SessionOptions = SessionOptions()) -> CodemodRunResult:
         """Runs the execute_func in edit_mode and returns the saved the result"""
         self.codebase.set_find_mode(False)
@@ -1,4 +1,5 @@
 import logging
+from pathlib import Path
 
 from codegen.sdk.codebase.factory.codebase_factory import CodebaseType
 
@@ -62,10 +63,25 @@ class SandboxRepo:
             logger.info("Skipping opening pull request for cm_run b/c the codemod produced no changes")
             return False
 
-        # =====[ Push changes highside ]=====
+        return self.push_branch(head_branch, force_push)
+
+    def push_branch(self, head_branch: str, force_push: bool) -> bool:
+        """Pushes the local head branch highside, without touching the working tree"""
         highside_remote = self.codebase.op.git_cli.remote(name="origin")
         highside_res = self.codebase.op.push_changes(remote=highside_remote, refspec=f"{head_branch}:{head_branch}", force=force_push)
         return not any(push_info.flags & push_info.ERROR for push_info in highside_res)
 
+    def add_worktree(self, start_point: str, head_branch: str, path: Path) -> None:
+        """Checks out the head branch into a separate worktree at path, creating it at start_point if missing."""
+        git_cli = self.codebase.op.git_cli
+        logger.info(f"Adding worktree for head branch {head_branch} at {path} ...")
+        if head_branch in git_cli.heads:
+            git_cli.git.worktree("add", str(path), head_branch)
+        else:
+            git_cli.git.worktree("add", "-b", head_branch, str(path), start_point)
+
+    def remove_worktree(self, path: Path) -> None:
+        self.codebase.op.git_cli.git.worktree("remove", "--force", str(path))
+
     # TODO: move bunch of codebase git operations into this class.
     # The goal is to make the codebase class ONLY allow LocalRepoOperator.
@@ -105,7 +105,8 @@ class SandboxRunner:
             logger.info(f"Max PRs limit reached: {max_prs}. Skipping remaining groups.")
             flag_groups = flag_groups[:max_prs]
 
-        run_results, branches = await self.executor.execute_flag_groups(request.commit_msg, code_to_exec, flag_groups, branch_config)
+        max_workers = request.grouping_config.max_workers or 1
+        run_results, branches = await self.executor.execute_flag_groups(request.commit_msg, code_to_exec, flag_groups, branch_config, max_workers=max_workers)
         response.results = run_results
         response.branches = branches
 
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import copy
+from typing import TYPE_CHECKING, Any
+
+from codegen.sdk.codebase.range_index import RangeIndex
+from codegen.sdk.core.directory import Directory
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from rustworkx import PyDiGraph
+
+    from codegen.sdk.codebase.codebase_context import CodebaseContext
+    from codegen.sdk.core.file import SourceFile
+    from codegen.sdk.core.interfaces.editable import Editable
+    from codegen.sdk.core.node_id_factory import NodeId
+    from codegen.sdk.enums import Edge
+    from codegen.sdk.tree_sitter_parser import ParsedTree
+
+
+class GraphCheckpoint:
+    """Copy-on-write checkpoint of a codebase graph, which can be restored without re-parsing any file.
+
+    Nothing is copied when the checkpoint is taken. The first sync after it copies the graph structure, sharing the node
+    objects, and every file, directory or editable kept by an incremental reparse is saved right before it is first
+    changed. Files and editables keep going with copies of their containers, so the saved originals stay untouched.
+    Restoring swaps the originals back in, so it costs a graph swap plus the work for the changed files.
+    """
+
+    ctx: CodebaseContext
+    _graph: PyDiGraph[Any, Edge] | None
+    _filepath_idx: dict[str, NodeId]
+    _ext_module_idx: dict[str, NodeId]
+    _directories: dict[Path, Directory]
+    _directory_items: dict[int, tuple[Directory, dict[str, Any]]]
+    _files: dict[NodeId, tuple[SourceFile, dict[str, Any], tuple[tuple[Path, str], ParsedTree | None] | None]]
+    _editables: dict[int, tuple[Editable, dict[str, Any]]]
+
+    def __init__(self, ctx: CodebaseContext) -> None:
+        self.ctx = ctx
+        self._graph = None
+        self._directory_items = {}
+        self._files = {}
+        self._editables = {}
+
+    @property
+    def is_dirty(self) -> bool:
+        """Whether the graph has been synced since the checkpoint was taken"""
+        return self._graph is not None
+
+    def before_sync(self) -> None:
+        """Saves the graph structure and indexes, unless they were saved by an earlier sync"""
+        if self._graph is not None:
+            return
+        self._graph = self.ctx._graph.copy()
+        self._filepath_idx = dict(self.ctx.filepath_idx)
+        self._ext_module_idx = dict(self.ctx._ext_module_idx)
+        self._directories = dict(self.ctx.directories)
+
+    def save_file(self, file: SourceFile) -> None:
+        """Saves a file that is about to be reparsed or removed, unless it was saved by an earlier sync"""
+        if file.node_id in self._files:
+            return
+        state = dict(file.__dict__)
+        # Compact editables of the file are resolved against the tree it was parsed into, which is kept while still cached
+        self._files[file.node_id] = (file, state, self.ctx.tree_cache.save(file.node_id))
+        for name, value in state.items():
+            if isinstance(value, list | set | dict):
+                file.__dict__[name] = copy.copy(value)
+            elif isinstance(value, RangeIndex):
+                file.__dict__[name] = value.copy()
+
+    def save_editable(self, editable: Editable) -> None:
+        """Saves an editable an incremental reparse is about to move onto a new tree, unless it was saved by an earlier sync"""
+        if id(editable) in self._editables:
+            return
+        state = dict(editable.__dict__)
+        self._editables[id(editable)] = (editable, state)
+        for name, value in state.items():
+            if isinstance(value, list | set | dict):
+                editable.__dict__[name] = copy.copy(value)
+
+    def save_directory(self, directory: Directory) -> None:
+        """Saves the items of a directory that is about to be changed, unless they were saved by an earlier sync"""
+        if id(directory) not in self._directory_items:
+            self._directory_items[id(directory)] = (directory, dict(directory.items))
+
+    def restore(self) -> None:
+        """Restores the graph to the state it was in when the checkpoint was taken. A checkpoint can only be restored once."""
+        if self._graph is None:
+            return
+        ctx = self.ctx
+        for file, state, saved_tree in self._files.values():
+            file.__dict__.clear()
+            file.__dict__.update(state)
+            ctx.tree_cache.restore(file.node_id, saved_tree)
+        for editable, state in self._editables.values():
+            editable.__dict__.clear()
+            editable.__dict__.update(state)
+        ctx._graph = self._graph
+        ctx._reset_file_indexes(self._filepath_idx)
+        ctx._ext_module_idx = self._ext_module_idx
+        ctx._reset_node_indexes()
+        ctx.directories = self._directories
+        for directory, items in self._directory_items.values():
+            directory.items = items
+            directory._invalidate_files()
+            for item in items.values():
+                if not isinstance(item, Directory):
+                    item._set_directory(directory)
+        self._graph = None
+        self._directory_items = {}
+        self._files = {}
+        self._editables = {}
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import time
 from collections import Counter, defaultdict
 from contextlib import contextmanager
 from enum import IntEnum, auto, unique
@@ -9,45 +10,54 @@ from os import PathLike
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
-from rustworkx import PyDiGraph, WeightedEdgeList
+from rustworkx import NoSuitableNeighbors, PyDiGraph, WeightedEdgeList
 
+from codegen.sdk.codebase.codeowners_index import CodeOwnersIndex
 from codegen.sdk.codebase.config import CodebaseConfig, DefaultConfig, ProjectConfig, SessionOptions
 from codegen.sdk.codebase.config_parser import ConfigParser, get_config_parser_for_language
+from codegen.sdk.codebase.dependency_worklist import DependencyStats, DependencyWorklist
 from codegen.sdk.codebase.diff_lite import ChangeType, DiffLite
 from codegen.sdk.codebase.flagging.flags import Flags
 from codegen.sdk.codebase.io.file_io import FileIO
+from codegen.sdk.codebase.module_resolution_cache import ModuleResolutionCache
 from codegen.sdk.codebase.progress.stub_progress import StubProgress
+from codegen.sdk.codebase.reparse import IncrementalReparse
 from codegen.sdk.codebase.transaction_manager import TransactionManager
+from codegen.sdk.codebase.tree_cache import TreeCache, content_digest
 from codegen.sdk.codebase.validation import get_edges, post_reset_validation
 from codegen.sdk.core.autocommit import AutoCommit, commiter
 from codegen.sdk.core.directory import Directory
 from codegen.sdk.core.external.dependency_manager import DependencyManager, get_dependency_manager
 from codegen.sdk.core.external.language_engine import LanguageEngine, get_language_engine
-from codegen.sdk.enums import Edge, EdgeType, NodeType
+from codegen.sdk.enums import Edge, EdgeType, NodeType, SymbolType
 from codegen.sdk.extensions.sort import sort_editables
-from codegen.sdk.extensions.utils import uncache_all
+from codegen.sdk.extensions.utils import uncache_all, uncache_files, uncache_unowned
+from codegen.sdk.tree_sitter_parser import ParsedTree, parse_tree
 from codegen.sdk.typescript.external.ts_declassify.ts_declassify import TSDeclassify
 from codegen.shared.enums.programming_language import ProgrammingLanguage
 from codegen.shared.exceptions.control_flow import StopCodemodException
 from codegen.shared.performance.stopwatch_utils import stopwatch, stopwatch_with_sentry
 
 if TYPE_CHECKING:
-    from collections.abc import Generator, Mapping, Sequence
+    from collections.abc import Generator, Iterable, Iterator, Mapping, Sequence
 
     from codeowners import CodeOwners as CodeOwnersParser
     from git import Commit as GitCommit
 
     from codegen.git.repo_operator.repo_operator import RepoOperator
+    from codegen.sdk.codebase.checkpoint import GraphCheckpoint
     from codegen.sdk.codebase.io.io import IO
     from codegen.sdk.codebase.node_classes.node_classes import NodeClasses
     from codegen.sdk.codebase.progress.progress import Progress
-    from codegen.sdk.core.dataclasses.usage import Usage
+    from codegen.sdk.core.dataclasses.usage import Usage, UsageType
     from codegen.sdk.core.expressions import Expression
     from codegen.sdk.core.external_module import ExternalModule
     from codegen.sdk.core.file import SourceFile
+    from codegen.sdk.core.interfaces.editable import Editable
     from codegen.sdk.core.interfaces.importable import Importable
     from codegen.sdk.core.node_id_factory import NodeId
     from codegen.sdk.core.parser import Parser
+    from codegen.sdk.core.symbol import Symbol
 
 import logging
 
@@ -56,6 +66,8 @@ logger = logging.getLogger(__name__)
 
 # src/vs/platform/contextview/browser/contextMenuService.ts is ignored as there is a parsing error with tree-sitter
 GLOBAL_FILE_IGNORE_LIST = [".git/*", ".yarn/releases/*", ".*/tests/static/chunk-.*.js", ".*/ace/.*.js", "src/vs/platform/contextview/browser/contextMenuService.ts"]
+# Number of progress updates reported per pass of dependency computation
+PROGRESS_SAMPLES = 100
 
 
 @unique
@@ -79,6 +91,25 @@ def get_node_classes(programming_language: ProgrammingLanguage) -> NodeClasses:
         raise ValueError(msg)
 
 
+def _module_name(filepath: str) -> str | None:
+    """Returns the dotted module name of a relative .py filepath, or None if it can not be imported by name"""
+    if not filepath.endswith(".py"):
+        return None
+    parts = filepath.removesuffix(".py").split(os.sep)
+    # A dot in a directory or file name would make the module ambiguous, and such paths can't be imported anyway
+    if any(not part or "." in part for part in parts):
+        return None
+    return ".".join(parts)
+
+
+def _dir_has_file(dirpath: PathLike) -> bool:
+    try:
+        with os.scandir(dirpath) as entries:
+            return any(entry.is_file() for entry in entries)
+    except FileNotFoundError:
+        return False
+
+
 class CodebaseContext:
     """MultiDiGraph Wrapper with TransactionManager"""
 
@@ -88,12 +119,14 @@ class CodebaseContext:
     repo_path: str
     repo_name: str
     codeowners_parser: CodeOwnersParser | None
+    codeowners_index: CodeOwnersIndex | None
     config: CodebaseConfig
 
     # =====[ computed attributes ]=====
     transaction_manager: TransactionManager
     pending_syncs: list[DiffLite]  # Diffs that have been applied to disk, but not the graph (to be used for sync graph)
     all_syncs: list[DiffLite]  # All diffs that have been applied to the graph (to be used for graph reset)
+    _checkpoint: GraphCheckpoint | None  # Graph state from before all_syncs, if no other diffs were applied since
     _autocommit: AutoCommit
     generation: int
     parser: Parser[Expression]
@@ -105,15 +138,34 @@ class CodebaseContext:
     dependency_manager: DependencyManager | None
     language_engine: LanguageEngine | None
     _computing = False
+    dependency_stats: DependencyStats | None = None  # Counters of the last dependency computation
     _graph: PyDiGraph[Importable, Edge]
     filepath_idx: dict[str, NodeId]
+    _module_idx: dict[str, NodeId]  # Dotted python module name of every .py file, e.g. "a.b.c" or "a.b.__init__"
     _ext_module_idx: dict[str, NodeId]
+    module_resolution_cache: ModuleResolutionCache
+    _node_type_idx: dict[NodeType, set[NodeId]]
+    _node_type_views: dict[NodeType, list[Importable]]
+    _symbol_idx: dict[SymbolType, dict[str, set[NodeId]]]
+    _symbol_idx_keys: dict[NodeId, tuple[SymbolType, str]]
+    _unindexed_symbols: set[NodeId]
+    _in_edge_idx: dict[NodeId, dict[EdgeType, list[tuple[NodeId, NodeId, Edge]]]]
+    _out_edge_idx: dict[NodeId, dict[EdgeType, list[tuple[NodeId, NodeId, Edge]]]]
+    _neighbour_idx: dict[tuple[NodeId, bool], dict[EdgeType, list[Importable]]]
+    # Memoized transitive closures, by (node, edge type, usage types, max depth, outgoing, symbols)
+    _closure_idx: dict[tuple[NodeId, EdgeType, UsageType | None, int | None, bool, bool], list[NodeId]]
     flags: Flags
     session_options: SessionOptions = SessionOptions()
     projects: list[ProjectConfig]
     unapplied_diffs: list[DiffLite]
     io: IO
     progress: Progress
+    tree_cache: TreeCache
+    uncompacted_editables: list[Editable]  # Editables created since the last compaction, which still hold TSNodes
+    # Whether editables may hold references to their nodes in place of the nodes, re-acquired through tree_cache. True
+    # with compact editables, and once the graph is restored from a snapshot.
+    lazy_nodes: bool
+    _compacting: bool = False
 
     def __init__(
         self,
@@ -128,7 +180,11 @@ class CodebaseContext:
         self.progress = progress or StubProgress()
         self._graph = PyDiGraph()
         self.filepath_idx = {}
+        self._module_idx = {}
         self._ext_module_idx = {}
+        self.module_resolution_cache = ModuleResolutionCache()
+        self._reset_node_indexes()
+        self._checkpoint = None
         self.generation = 0
 
         # NOTE: The differences between base_path, repo_name, and repo_path
@@ -145,12 +201,17 @@ class CodebaseContext:
         context = projects[0]
         self.node_classes = get_node_classes(context.programming_language)
         self.config = config
+        self.tree_cache = TreeCache(self, config.feature_flags.tree_cache_size)
+        self.uncompacted_editables = []
+        self.lazy_nodes = config.feature_flags.compact_editables
         self.repo_name = context.repo_operator.repo_name
         self.repo_path = str(Path(context.repo_operator.repo_path).resolve())
         self.codeowners_parser = context.repo_operator.codeowners_parser
+        self.codeowners_index = CodeOwnersIndex(self, self.codeowners_parser) if self.codeowners_parser is not None else None
         self.base_url = context.repo_operator.base_url
         # =====[ computed attributes ]=====
         self.transaction_manager = TransactionManager()
+        self.transaction_manager.record_edits = config.feature_flags.incremental_reparse
         self._autocommit = AutoCommit(self)
         self.init_nodes = None
         self.init_edges = None
@@ -163,8 +224,9 @@ class CodebaseContext:
         self.language_engine = get_language_engine(context.programming_language, self)
         self.programming_language = context.programming_language
 
-        # Build the graph
-        self.build_graph(context.repo_operator)
+        # Build the graph, unless it can be restored from a snapshot
+        if not self._load_snapshot(context.repo_operator):
+            self.build_graph(context.repo_operator)
         try:
             self.synced_commit = context.repo_operator.head_commit
         except ValueError as e:
@@ -174,6 +236,8 @@ class CodebaseContext:
         self.all_syncs = []
         self.unapplied_diffs = []
         self.flags = Flags()
+        if self.config.feature_flags.save_snapshots:
+            self.save_snapshot()
 
     def __repr__(self):
         return self.__class__.__name__
@@ -183,23 +247,114 @@ class CodebaseContext:
     def build_graph(self, repo_operator: RepoOperator) -> None:
         """Builds a codebase graph based on the current file state of the given repo operator"""
         self._graph.clear()
+        self._reset_node_indexes()
+        self._checkpoint = None
+        self.tree_cache.clear()
 
         # =====[ Add all files to the graph in parallel ]=====
+        # List the repo once: files are only read when they are parsed, and the listing is reused for the directory tree
+        repo_files = repo_operator.list_repo_files(GLOBAL_FILE_IGNORE_LIST)
+        filepaths = repo_operator.filter_filepaths([filepath for filepath, is_dir in repo_files if not is_dir], self.projects[0].subdirectories, self.extensions)
         syncs = defaultdict(lambda: [])
-        for filepath, _ in repo_operator.iter_files(subdirs=self.projects[0].subdirectories, extensions=self.extensions, ignore_list=GLOBAL_FILE_IGNORE_LIST):
-            syncs[SyncType.ADD].append(self.to_absolute(filepath))
+        syncs[SyncType.ADD] = [self.to_absolute(filepath) for filepath in filepaths]
         logger.info(f"> Parsing {len(syncs[SyncType.ADD])} files in {self.projects[0].subdirectories or 'ALL'} subdirectories with {self.extensions} extensions")
-        self._process_diff_files(syncs, incremental=False)
+        self._process_diff_files(syncs, incremental=False, repo_files={repo_operator: repo_files})
         files: list[SourceFile] = self.get_nodes(NodeType.FILE)
         logger.info(f"> Found {len(files)} files")
         logger.info(f"> Found {len(self.nodes)} nodes and {len(self.edges)} edges")
         if self.config.feature_flags.track_graph:
             self.old_graph = self._graph.copy()
 
+    @stopwatch
+    def _load_snapshot(self, repo_operator: RepoOperator) -> bool:
+        """Restores the graph from the snapshot closest to HEAD, then applies the diff against the current file state.
+
+        Returns False if no usable snapshot exists, in which case the graph has to be built from scratch.
+        """
+        from codegen.sdk.codebase.snapshot import GraphSnapshotStore
+
+        snapshot_dir = self.config.feature_flags.snapshot_dir
+        # Dependency managers and language engines hold state outside the graph, which is not snapshotted. Neither are the
+        # trees compact editables are resolved against.
+        if snapshot_dir is None or self.dependency_manager is not None or self.language_engine is not None or self.config.feature_flags.compact_editables:
+            return False
+        git_cli = repo_operator.git_cli
+        try:
+            store = GraphSnapshotStore(snapshot_dir, self)
+            closest = store.find_closest(git_cli, repo_operator.head_commit.hexsha)
+            if closest is None:
+                return False
+            snapshot = store.load(self, git_cli, closest)
+            changed = snapshot.changed_files(git_cli)
+        except Exception as e:
+            logger.warning("Failed to load graph snapshot, building from scratch: %s", e)
+            self._graph = PyDiGraph()
+            self.filepath_idx = {}
+            self._module_idx = {}
+            self._ext_module_idx = {}
+            self.module_resolution_cache.clear()
+            self._reset_node_indexes()
+            self.directories = dict()
+            self.generation = 0
+            self.tree_cache.clear()
+            self.lazy_nodes = self.config.feature_flags.compact_editables
+            return False
+        logger.info(f"> Loaded graph snapshot from commit {closest}")
+
+        # =====[ Diff the snapshotted file contents against the current ones ]=====
+        # Only the files git reports as changed are read, the others still have the content the snapshot was taken from
+        diffs = []
+        repo_files = repo_operator.list_repo_files(GLOBAL_FILE_IGNORE_LIST)
+        filepaths = repo_operator.filter_filepaths([filepath for filepath, is_dir in repo_files if not is_dir], self.projects[0].subdirectories, self.extensions)
+        for filepath in filepaths:
+            if (digest := snapshot.digests.get(filepath)) is None:
+                diffs.append(DiffLite(ChangeType.Added, self.to_absolute(filepath)))
+            elif filepath in changed and self.io.file_exists(path := self.to_absolute(filepath)) and content_digest(self.io.read_bytes(path)) != digest:
+                diffs.append(DiffLite(ChangeType.Modified, path, old_content=snapshot.read(git_cli, digest)))
+        for filepath in snapshot.digests.keys() - set(filepaths):
+            diffs.append(DiffLite(ChangeType.Removed, self.to_absolute(filepath), old_content=snapshot.read(git_cli, snapshot.digests[filepath])))
+        if diffs:
+            self.apply_diffs(diffs)
+        elif self.config_parser is not None:
+            # Config parsers keep their state outside the graph
+            self.config_parser.parse_configs()
+        logger.info(f"> Found {len(self.nodes)} nodes and {len(self.edges)} edges")
+        if self.config.feature_flags.track_graph:
+            self.old_graph = self._graph.copy()
+        return True
+
+    def save_snapshot(self) -> None:
+        """Saves a snapshot of the graph for the synced commit, so later sessions at or near it can skip the cold build.
+
+        Does nothing unless the snapshot_dir feature flag is set, or if the graph has diverged from the files on disk. Runs
+        after every build if the save_snapshots feature flag is set.
+        """
+        from codegen.sdk.codebase.snapshot import GraphSnapshotStore
+
+        snapshot_dir = self.config.feature_flags.snapshot_dir
+        if snapshot_dir is None or self.synced_commit is None or self.dependency_manager is not None or self.language_engine is not None or self.config.feature_flags.compact_editables:
+            return
+        if self.pending_syncs or self.all_syncs or self.unapplied_diffs or self.transaction_manager.get_num_transactions() > 0:
+            logger.info("Skipping graph snapshot, there are uncommitted changes")
+            return
+        try:
+            store = GraphSnapshotStore(snapshot_dir, self)
+            if store.path_for(self.synced_commit.hexsha).exists():
+                return
+            path = store.save(self, self.projects[0].repo_operator.git_cli, self.synced_commit.hexsha)
+            logger.info(f"> Saved graph snapshot to {path}")
+        except Exception as e:
+            logger.warning("Failed to save graph snapshot: %s", e)
+
     @stopwatch
     @commiter
-    def apply_diffs(self, diff_list: list[DiffLite]) -> None:
-        """Applies the given set of diffs to the graph in order to match the current file system content"""
+    def apply_diffs(self, diff_list: list[DiffLite], checkpoint: GraphCheckpoint | None = None) -> None:
+        """Applies the given set of diffs to the graph in order to match the current file system content
+
+        If a checkpoint is given, the state the diffs overwrite is saved to it. Otherwise any checkpoint is dropped, as
+        restoring it would also undo these diffs.
+        """
+        self._checkpoint = checkpoint
         if self.session_options:
             self.session_options = self.session_options.model_copy(update={"max_seconds": None})
         logger.info(f"Applying {len(diff_list)} diffs to graph")
@@ -209,6 +364,11 @@ class CodebaseContext:
         extensions = file_cls.get_extensions()
         for diff in diff_list:
             filepath = Path(diff.path)
+            if self.config_parser is not None and self.config_parser.is_config_file(filepath):
+                # Imports of every file the config applies to may now resolve elsewhere, so reparse them
+                self.module_resolution_cache.clear_translations()
+                for file in self.config_parser.invalidate(filepath):
+                    files_to_sync.setdefault(file.path, SyncType.REPARSE)
             if extensions is not None and filepath.suffix not in extensions:
                 continue
             if self.projects[0].subdirectories is not None and not any(filepath.relative_to(subdir) for subdir in self.projects[0].subdirectories):
@@ -226,6 +386,9 @@ class CodebaseContext:
                 files_to_sync[filepath] = SyncType.DELETE
             else:
                 logger.warning(f"Unhandled diff change type: {diff.change_type}")
+            if self.lazy_nodes and diff.old_content is not None and (file := self.get_file(filepath)) is not None:
+                # The file has already changed in io, so its old tree can only be parsed again from the recorded content
+                self.tree_cache.pin(file.node_id, file.path, diff.old_content)
         by_sync_type = defaultdict(lambda: [])
         for filepath, sync_type in files_to_sync.items():
             if self.get_file(filepath) is None:
@@ -241,7 +404,10 @@ class CodebaseContext:
 
             by_sync_type[sync_type].append(filepath)
         self.generation += 1
-        self._process_diff_files(by_sync_type)
+        try:
+            self._process_diff_files(by_sync_type)
+        finally:
+            self.tree_cache.unpin()
 
     def _reset_files(self, syncs: list[DiffLite]) -> None:
         files_to_write = []
@@ -286,10 +452,40 @@ class CodebaseContext:
         self.io.check_changes()
         self.pending_syncs.clear()  # Discard pending changes
         if len(self.all_syncs) > 0:
-            logger.info(f"Unapplying {len(self.all_syncs)} diffs to graph. Current graph commit: {self.synced_commit}")
-            self._revert_diffs(list(reversed(self.all_syncs)))
+            if self._checkpoint is not None and self.language_engine is None:
+                logger.info(f"Restoring graph checkpoint from before {len(self.all_syncs)} diffs. Current graph commit: {self.synced_commit}")
+                self._restore_checkpoint(self._checkpoint)
+            else:
+                logger.info(f"Unapplying {len(self.all_syncs)} diffs to graph. Current graph commit: {self.synced_commit}")
+                self._revert_diffs(list(reversed(self.all_syncs)))
+        self._checkpoint = None
         self.all_syncs.clear()
 
+    def _sync_diffs(self, diff_list: list[DiffLite]) -> None:
+        """Applies diffs made in this session to the graph and records them in all_syncs, so they can be undone"""
+        from codegen.sdk.codebase.checkpoint import GraphCheckpoint
+
+        # The checkpoint is taken before the first recorded diff, and is kept for as long as only recorded diffs follow
+        checkpoint = self._checkpoint if self.all_syncs else GraphCheckpoint(self)
+        self.all_syncs.extend(diff_list)
+        self.apply_diffs(diff_list, checkpoint=checkpoint)
+
+    @stopwatch
+    @commiter(reset=True)
+    def _restore_checkpoint(self, checkpoint: GraphCheckpoint) -> None:
+        """Resets the graph to the checkpoint taken before the first of all_syncs, without re-parsing the changed files"""
+        self._autocommit.reset()
+        checkpoint.restore()
+        self.generation += 1
+        if self.codeowners_index is not None:
+            self.codeowners_index.reset()
+        uncache_all()
+        if self.config_parser is not None:
+            # Config parsers keep their state outside the graph
+            self.config_parser.parse_configs()
+        if self.config.feature_flags.verify_graph:
+            post_reset_validation(self.old_graph.nodes(), self._graph.nodes(), get_edges(self.old_graph), get_edges(self._graph), self.repo_name, self.projects[0].subdirectories)
+
     @stopwatch
     @commiter(reset=True)
     def _revert_diffs(self, diff_list: list[DiffLite]) -> None:
@@ -306,6 +502,7 @@ class CodebaseContext:
         if commit is not None:
             logger.info(f"Saving commit {commit.hexsha} to graph")
             self.all_syncs.clear()
+            self._checkpoint = None
             self.unapplied_diffs.clear()
             self.synced_commit = commit
             if self.config.feature_flags.verify_graph:
@@ -320,8 +517,12 @@ class CodebaseContext:
                 self.remove_node(module.node_id)
                 self._ext_module_idx.pop(module._idx_key, None)
 
-    def build_directory_tree(self, files: list[SourceFile]) -> None:
-        """Builds the directory tree for the codebase"""
+    def build_directory_tree(self, files: list[SourceFile], repo_files: Mapping[RepoOperator, list[tuple[str, bool]]] | None = None) -> None:
+        """Builds the directory tree for the codebase.
+
+        Args:
+            repo_files: Listings of the repos by RepoOperator.list_repo_files, if already known
+        """
         # Reset and rebuild the directory tree
         self.directories = dict()
         created_dirs = set()
@@ -331,22 +532,53 @@ class CodebaseContext:
             file._set_directory(directory)
             created_dirs.add(file.path.parent)
 
-        def _dir_has_file(filepath):
-            gen = os.scandir(filepath)
-            while entry := next(gen, None):
-                if entry.is_file():
-                    return True
-            return False
-
         for ctx in self.projects:
-            for rel_filepath in ctx.repo_operator.get_filepaths_for_repo(GLOBAL_FILE_IGNORE_LIST):
+            if repo_files is not None and ctx.repo_operator in repo_files:
+                listing = repo_files[ctx.repo_operator]
+            else:
+                listing = ctx.repo_operator.list_repo_files(GLOBAL_FILE_IGNORE_LIST)
+            for rel_filepath, is_dir in listing:
                 abs_filepath = self.to_absolute(rel_filepath)
-                if not abs_filepath.is_dir():
-                    abs_filepath = abs_filepath.parent
+                if is_dir:
+                    dirpath, has_file = abs_filepath, _dir_has_file
+                else:
+                    # The listing can include files removed since it was taken, so check the file itself is still there
+                    dirpath, has_file = abs_filepath.parent, lambda _: os.path.isfile(abs_filepath)
+
+                if dirpath not in created_dirs and self.is_subdir(dirpath) and has_file(dirpath):
+                    directory = self.get_directory(dirpath, create_on_missing=True)
+                    created_dirs.add(dirpath)
+
+    def update_directory_tree(self, added_files: list[SourceFile], removed_files: list[SourceFile]) -> None:
+        """Updates the directory tree in place for files added to or removed from the graph.
 
-                if abs_filepath not in created_dirs and self.is_subdir(abs_filepath) and _dir_has_file(abs_filepath):
-                    directory = self.get_directory(abs_filepath, create_on_missing=True)
-                    created_dirs.add(abs_filepath)
+        Directories left without any items, in the graph or on disk, are removed along with their emptied parents.
+        """
+        shrunk = []
+        for file in removed_files:
+            if (directory := file._directory) is None:
+                continue
+            self._save_directory(directory)
+            if directory.items.get(os.path.relpath(file.file_path, directory.dirpath)) is file:
+                directory.remove_file(file)
+                shrunk.append(directory)
+            file._set_directory(None)
+        for file in added_files:
+            directory = self.get_directory(file.path.parent, create_on_missing=True)
+            self._save_directory(directory)
+            directory.add_file(file)
+            file._set_directory(directory)
+        for directory in shrunk:
+            while directory is not None and len(directory.items) == 0 and self.directories.get(directory.path) is directory and not _dir_has_file(directory.path):
+                del self.directories[directory.path]
+                if directory.parent is not None:
+                    self._save_directory(directory.parent)
+                    directory.parent.remove_subdirectory(directory)
+                directory = directory.parent
+
+    def _save_directory(self, directory: Directory) -> None:
+        if self._checkpoint is not None:
+            self._checkpoint.save_directory(directory)
 
     def get_directory(self, directory_path: PathLike, create_on_missing: bool = False, ignore_case: bool = False) -> Directory | None:
         """Returns the directory object for the given path, or None if the directory does not exist.
@@ -360,7 +592,7 @@ class CodebaseContext:
             return None
 
         # Get the directory
-        if dir := self.directories.get(absolute_path, None):
+        if (dir := self.directories.get(absolute_path, None)) is not None:
             return dir
         if ignore_case:
             for path, directory in self.directories.items():
@@ -383,17 +615,20 @@ class CodebaseContext:
             # Create the directory
             directory = Directory(path=absolute_path, dirpath=str(self.to_relative(absolute_path)), parent=parent)
             # Add the directory to the parent
+            self._save_directory(parent)
             parent.add_subdirectory(directory)
             # Add the directory to the tree
             self.directories[absolute_path] = directory
             return directory
         return None
 
-    def _process_diff_files(self, files_to_sync: Mapping[SyncType, list[Path]], incremental: bool = True) -> None:
+    def _process_diff_files(self, files_to_sync: Mapping[SyncType, list[Path]], incremental: bool = True, repo_files: Mapping[RepoOperator, list[tuple[str, bool]]] | None = None) -> None:
         # If all the files are empty, don't uncache
         assert self._computing is False
         skip_uncache = incremental and ((len(files_to_sync[SyncType.DELETE]) + len(files_to_sync[SyncType.REPARSE])) == 0)
-        if not skip_uncache:
+        # Files whose cached properties may be stale. Incremental syncs only uncache these (and anything outside of files).
+        affected: set[NodeId] | None = set() if incremental else None
+        if not skip_uncache and not incremental:
             uncache_all()
         # Step 0: Start the dependency manager and language engine if they exist
         # Start the dependency manager. This may or may not run asynchronously, depending on the implementation
@@ -441,10 +676,21 @@ class CodebaseContext:
                 else:
                     logger.warning(f"SYNC: SourceFile {file_path} does not exist and also not found on graph!")
 
+            if not skip_uncache:
+                # Expand while the old edges are still in the graph, so chains of imports and re-exports are followed
+                affected.update(self._dependent_files(self.get_file(file_path).node_id for file_path in files_to_sync[SyncType.DELETE] + files_to_sync[SyncType.REPARSE]))
+                self._uncache(affected)
+
         # Step 3: Remove files to delete from graph
+        if self._checkpoint is not None:
+            self._checkpoint.before_sync()
+            for file_path in files_to_sync[SyncType.DELETE] + files_to_sync[SyncType.REPARSE]:
+                self._checkpoint.save_file(self.get_file(file_path))
         to_resolve = []
+        removed_files = []
         for file_path in files_to_sync[SyncType.DELETE]:
             file = self.get_file(file_path)
+            removed_files.append(file)
             file.remove_internal_edges()
             to_resolve.extend(file.unparse())
         to_resolve = list(filter(lambda node: self.has_node(node.node_id) and node is not None, to_resolve))
@@ -458,34 +704,47 @@ class CodebaseContext:
         for idx, file_path in enumerate(files_to_sync[SyncType.REPARSE]):
             task.update(f"Reparsing {self.to_relative(file_path)}", count=idx)
             file = self.get_file(file_path)
-            to_resolve.extend(file.unparse(reparse=True))
+            edits = self.transaction_manager.edits.pop(file.path, None)
+            reparse = IncrementalReparse.plan(file, file.content, edits) if self.config.feature_flags.incremental_reparse else None
+            to_resolve.extend(file.unparse(reparse=True, keep=reparse.nodes if reparse is not None else ()))
             to_resolve = list(filter(lambda node: self.has_node(node.node_id) and node is not None, to_resolve))
-            file.sync_with_file_content()
+            file.sync_with_file_content(reparse)
             files_to_resolve.append(file)
         task.end()
         # Step 5: Add new files as nodes to graph (does not yet add edges)
         task = self.progress.begin("Adding new files", count=len(files_to_sync[SyncType.ADD]))
-        for idx, filepath in enumerate(files_to_sync[SyncType.ADD]):
+        added_files = []
+        for idx, (filepath, content, parsed) in enumerate(self._read_and_parse_files(files_to_sync[SyncType.ADD])):
             task.update(f"Adding {self.to_relative(filepath)}", count=idx)
-            content = self.io.read_text(filepath)
-            # TODO: this is wrong with context changes
-            if filepath.suffix in self.extensions:
-                file_cls = self.node_classes.file_cls
-                new_file = file_cls.from_content(filepath, content, self, sync=False, verify_syntax=False)
-                if new_file is not None:
-                    files_to_resolve.append(new_file)
+            file_cls = self.node_classes.file_cls
+            new_file = file_cls.from_content(filepath, content, self, sync=False, verify_syntax=False, ts_node=parsed.tree.root_node)
+            if new_file is not None:
+                if self.config.feature_flags.compact_editables or self.config.feature_flags.incremental_reparse:
+                    new_file._parsed_tree = parsed
+                files_to_resolve.append(new_file)
+                added_files.append(new_file)
         task.end()
         for file in files_to_resolve:
             to_resolve.append(file)
             to_resolve.extend(file.get_nodes())
+        self._index_symbols()
 
         to_resolve = list(filter(lambda node: self.has_node(node.node_id) and node is not None, to_resolve))
         counter = Counter(node.node_type for node in to_resolve)
 
         # Step 6: Build directory tree
-        logger.info("> Building directory tree")
-        files = [f for f in sort_editables(self.get_nodes(NodeType.FILE), alphabetical=True, dedupe=False)]
-        self.build_directory_tree(files)
+        if incremental:
+            logger.info("> Updating directory tree")
+            self.update_directory_tree(added_files, removed_files)
+        else:
+            logger.info("> Building directory tree")
+            files = [f for f in sort_editables(self.get_nodes(NodeType.FILE), alphabetical=True, dedupe=False)]
+            self.build_directory_tree(files, repo_files)
+        if self.codeowners_index is not None:
+            if incremental:
+                self.codeowners_index.update(added_files, removed_files)
+            else:
+                self.codeowners_index.reset()
 
         # Step 7: Build configs
         if self.config_parser is not None:
@@ -493,7 +752,7 @@ class CodebaseContext:
 
         # Step 8: Add internal import resolution edges for new and updated files
         if not skip_uncache:
-            uncache_all()
+            self._uncache(affected, to_resolve)
 
         if self.config.feature_flags.disable_graph:
             logger.warning("Graph generation is disabled. Skipping import and symbol resolution")
@@ -503,58 +762,168 @@ class CodebaseContext:
             try:
                 logger.info(f"> Computing import resolution edges for {counter[NodeType.IMPORT]} imports")
                 task = self.progress.begin("Resolving imports", count=counter[NodeType.IMPORT])
-                for node in to_resolve:
+                for idx, node in enumerate(to_resolve):
                     if node.node_type == NodeType.IMPORT:
                         task.update(f"Resolving imports in {node.filepath}", count=idx)
                         node._remove_internal_edges(EdgeType.IMPORT_SYMBOL_RESOLUTION)
                         node.add_symbol_resolution_edge()
-                        to_resolve.extend(node.symbol_usages)
+                        to_resolve.extend(usages := node.symbol_usages)
+                        if not skip_uncache:
+                            self._uncache_new(affected, usages)
                 task.end()
                 if counter[NodeType.EXPORT] > 0:
                     logger.info(f"> Computing export dependencies for {counter[NodeType.EXPORT]} exports")
                     task = self.progress.begin("Computing export dependencies", count=counter[NodeType.EXPORT])
-                    for node in to_resolve:
+                    for idx, node in enumerate(to_resolve):
                         if node.node_type == NodeType.EXPORT:
                             task.update(f"Computing export dependencies for {node.filepath}", count=idx)
                             node._remove_internal_edges(EdgeType.EXPORT)
                             node.compute_export_dependencies()
-                            to_resolve.extend(node.symbol_usages)
+                            to_resolve.extend(usages := node.symbol_usages)
+                            if not skip_uncache:
+                                self._uncache_new(affected, usages)
                     task.end()
                 if counter[NodeType.SYMBOL] > 0:
                     from codegen.sdk.core.interfaces.inherits import Inherits
 
                     logger.info("> Computing superclass dependencies")
                     task = self.progress.begin("Computing superclass dependencies", count=counter[NodeType.SYMBOL])
-                    for symbol in to_resolve:
+                    for idx, symbol in enumerate(to_resolve):
                         if isinstance(symbol, Inherits):
                             task.update(f"Computing superclass dependencies for {symbol.filepath}", count=idx)
                             symbol._remove_internal_edges(EdgeType.SUBCLASS)
                             symbol.compute_superclass_dependencies()
                     task.end()
                 if not skip_uncache:
-                    uncache_all()
+                    self._uncache(affected, to_resolve)
                 self._compute_dependencies(to_resolve, incremental)
             finally:
                 self._computing = False
+        if self.config.feature_flags.compact_editables:
+            self.compact_editables()
+
+    def _uncache(self, affected: set[NodeId] | None, nodes: Iterable[Editable] = ()) -> None:
+        """Clears cached properties that may be stale after a sync.
+
+        With affected set to None every cached value is cleared. Otherwise, the files of the given nodes are added to
+        affected, and only the cached values of affected files and of objects outside of any file are cleared.
+        """
+        if affected is None:
+            uncache_all()
+            return
+        affected.update(node.file_node_id for node in nodes)
+        self._uncache_files(affected)
+        uncache_unowned()
+
+    def _uncache_files(self, file_node_ids: set[NodeId]) -> None:
+        # The names a file exports, wildcard imports included, are cached apart from the tracked values. Removed files
+        # are no longer on the graph, and their node ids may have been reused.
+        for file_node_id in file_node_ids:
+            if file_node_id is not None and self.has_node(file_node_id) and (file := self.get_node(file_node_id)).node_type == NodeType.FILE:
+                file.invalidate()
+        uncache_files(file_node_ids)
+
+    def _dependent_files(self, file_node_ids: Iterable[NodeId]) -> set[NodeId]:
+        """Returns the given files along with every file depending on them, directly or through chains of imports and re-exports.
+
+        The files the given files depend on are included as well, as values cached there, such as usages, hold their nodes.
+        """
+        ret = set(file_node_ids)
+        frontier = list(ret)
+        dependencies = set()
+        for file_node_id in frontier:
+            file = self.get_node(file_node_id)
+            for node in [file, *file.get_nodes(sort=False)]:
+                for successor in self.successors(node.node_id, sort=False):
+                    if (dependency := getattr(successor, "file_node_id", None)) is not None:
+                        dependencies.add(dependency)
+        while frontier:
+            file = self.get_node(frontier.pop())
+            for node in [file, *file.get_nodes(sort=False)]:
+                for predecessor in self.predecessors(node.node_id):
+                    dependent = getattr(predecessor, "file_node_id", None)
+                    if dependent is not None and dependent not in ret:
+                        ret.add(dependent)
+                        frontier.append(dependent)
+        return ret | dependencies
+
+    def _uncache_new(self, affected: set[NodeId] | None, nodes: Iterable[Editable]) -> None:
+        """Clears the cached properties of files of nodes found to be affected while resolving the current sync"""
+        if affected is None:
+            return
+        if new := {node.file_node_id for node in nodes} - affected:
+            affected.update(new)
+            self._uncache_files(new)
+
+    def _read_and_parse_files(self, filepaths: list[Path]) -> Iterator[tuple[Path, str, ParsedTree]]:
+        """Reads and parses the given files, yielding (filepath, content, parsed tree) in input order.
+
+        Files that cannot be read, such as tracked files missing from the working tree, are logged and skipped.
+        """
+        # TODO: this is wrong with context changes
+        for filepath in filepaths:
+            if filepath.suffix not in self.extensions:
+                continue
+            try:
+                content = self.io.read_text(filepath)
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"Skipping file {filepath}: {e}")
+                continue
+            yield filepath, content, parse_tree(filepath, content)
+
+    @stopwatch
+    def compact_editables(self) -> None:
+        """Replaces the TSNodes held by editables created since the last call with byte range references.
+
+        Afterwards only the trees in tree_cache stay resident, and compact editables re-acquire their nodes from there.
+        Runs after every graph sync, so building the graph still works on live nodes.
+        """
+        if self._compacting or not self.uncompacted_editables:
+            return
+        self._compacting = True
+        try:
+            by_file: dict[NodeId, list[Editable]] = defaultdict(list)
+            for editable in self.uncompacted_editables:
+                by_file[editable.file_node_id].append(editable)
+            self.uncompacted_editables = []
+            for file_node_id, editables in by_file.items():
+                if not self.has_node(file_node_id):
+                    continue
+                file = self.get_node(file_node_id)
+                # Files hand the tree they were parsed from over to the cache. Editables created after that use the cached tree.
+                if (parsed := file.__dict__.pop("_parsed_tree", None)) is not None:
+                    self.tree_cache.add(file_node_id, file.path, parsed)
+                elif (parsed := self.tree_cache.get(file_node_id)) is None:
+                    continue
+                root = parsed.tree.root_node
+                for editable in editables:
+                    editable._compact(root)
+        finally:
+            self._compacting = False
 
     def _compute_dependencies(self, to_update: list[Importable], incremental: bool):
-        seen = set()
-        while to_update:
-            task = self.progress.begin("Computing dependencies", count=len(to_update))
-            step = to_update.copy()
-            to_update.clear()
+        stats = self.dependency_stats = DependencyStats()
+        worklist = DependencyWorklist()
+        worklist.extend(to_update)
+        while worklist:
+            step = worklist.pop_pass()
+            stats.passes += 1
+            task = self.progress.begin("Computing dependencies", count=len(step))
             logger.info(f"> Incrementally computing dependencies for {len(step)} nodes")
+            # Only report progress a bounded number of times per pass
+            sample = max(1, len(step) // PROGRESS_SAMPLES)
             for idx, current in enumerate(step):
-                task.update(f"Computing dependencies for {current.filepath}", count=idx)
-                if current not in seen:
-                    seen.add(current)
-                    to_update.extend(current.recompute(incremental))
+                if idx % sample == 0:
+                    task.update(f"Computing dependencies for {current.filepath}", count=idx)
+                start = time.perf_counter()
+                worklist.extend(current.recompute(incremental))
+                stats.record(current.node_type, time.perf_counter() - start)
             if not incremental:
-                for node in self._graph.nodes():
-                    if node not in seen:
-                        to_update.append(node)
+                for node_id in self._graph.node_indices():
+                    if not worklist.is_seen(node_id):
+                        worklist.push(self._graph[node_id])
             task.end()
-        seen.clear()
+        stats.log()
 
     def build_subgraph(self, nodes: list[NodeId]) -> PyDiGraph[Importable, Edge]:
         """Builds a subgraph from the given set of nodes"""
@@ -571,9 +940,13 @@ class CodebaseContext:
             msg = "node_type and exclude_type cannot both be specified"
             raise ValueError(msg)
         if node_type is not None:
-            return [self.get_node(node_id) for node_id in self._graph.filter_nodes(lambda node: node.node_type == node_type)]
+            # Views are cached per node type until a node of that type is added or removed
+            if (view := self._node_type_views.get(node_type)) is None:
+                view = self._node_type_views[node_type] = [self.get_node(node_id) for node_id in sorted(self._node_type_idx[node_type])]
+            return list(view)
         if exclude_type is not None:
-            return [self.get_node(node_id) for node_id in self._graph.filter_nodes(lambda node: node.node_type != node_type)]
+            node_ids = sorted(node_id for other_type, node_ids in self._node_type_idx.items() if other_type != exclude_type for node_id in node_ids)
+            return [self.get_node(node_id) for node_id in node_ids]
         return self._graph.nodes()
 
     def get_edges(self) -> list[tuple[NodeId, NodeId, EdgeType, Usage | None]]:
@@ -592,6 +965,37 @@ class CodebaseContext:
             if directory := self.get_directory(parent, ignore_case=ignore_case):
                 return directory.get_file(os.path.basename(file_path), ignore_case=ignore_case)
 
+    def get_module_file(self, module: str) -> SourceFile | None:
+        """Returns the file of a dotted python module name, relative to the repo root.
+
+        "a.b.c" is the file a/b/c.py and "a.b.__init__" the package a/b/__init__.py. Unlike get_file, this is a single
+        lookup that never touches the filesystem.
+        """
+        node_id = self._module_idx.get(module, None)
+        if node_id is not None:
+            return self.get_node(node_id)
+
+    def index_file(self, filepath: str, node_id: NodeId) -> None:
+        """Adds a file to the filepath and module indexes"""
+        self.filepath_idx[filepath] = node_id
+        if (module := _module_name(filepath)) is not None:
+            self._module_idx[module] = node_id
+        self.module_resolution_cache.invalidate_file(filepath)
+
+    def unindex_file(self, filepath: str) -> None:
+        """Removes a file from the filepath and module indexes"""
+        self.filepath_idx.pop(filepath, None)
+        if (module := _module_name(filepath)) is not None:
+            self._module_idx.pop(module, None)
+        self.module_resolution_cache.invalidate_file(filepath)
+
+    def _reset_file_indexes(self, filepath_idx: dict[str, NodeId]) -> None:
+        self.filepath_idx = {}
+        self._module_idx = {}
+        self.module_resolution_cache.clear()
+        for filepath, node_id in filepath_idx.items():
+            self.index_file(filepath, node_id)
+
     def get_external_module(self, module: str, import_name: str) -> ExternalModule | None:
         node_id = self._ext_module_idx.get(module + "::" + import_name, None)
         if node_id is not None:
@@ -604,7 +1008,9 @@ class CodebaseContext:
                 raise Exception(msg)
         if self.config.feature_flags.debug and self._computing and node.node_type != NodeType.EXTERNAL:
             assert False, f"Adding node during compute dependencies: {node!r}"
-        return self._graph.add_node(node)
+        node_id = self._graph.add_node(node)
+        self._index_node(node_id, node)
+        return node_id
 
     def add_child(self, parent: NodeId, node: Importable, type: EdgeType, usage: Usage | None = None) -> int:
         if self.config.feature_flags.debug:
@@ -613,7 +1019,10 @@ class CodebaseContext:
                 raise Exception(msg)
         if self.config.feature_flags.debug and self._computing and node.node_type != NodeType.EXTERNAL:
             assert False, f"Adding node during compute dependencies: {node!r}"
-        return self._graph.add_child(parent, node, Edge(type, usage))
+        node_id = self._graph.add_child(parent, node, Edge(type, usage))
+        self._index_node(node_id, node)
+        self._invalidate_edges(parent, node_id)
+        return node_id
 
     def has_node(self, node_id: NodeId):
         return isinstance(node_id, int) and self._graph.has_node(node_id)
@@ -628,6 +1037,7 @@ class CodebaseContext:
             assert self._graph.has_node(v), v
             assert not self.has_edge(u, v, edge), (u, v, edge)
         self._graph.add_edge(u, v, edge)
+        self._invalidate_edges(u, v)
 
     def add_edges(self, edges: list[tuple[NodeId, NodeId, Edge]]) -> None:
         if self.config.feature_flags.debug:
@@ -636,6 +1046,8 @@ class CodebaseContext:
                 assert self._graph.has_node(v), v
                 assert not self.has_edge(u, v, edge), (self.get_node(u), self.get_node(v), edge)
         self._graph.add_edges_from(edges)
+        for u, v, _ in edges:
+            self._invalidate_edges(u, v)
 
     @property
     def nodes(self):
@@ -646,18 +1058,25 @@ class CodebaseContext:
         return self._graph.weighted_edge_list()
 
     def predecessor(self, n: NodeId, *, edge_type: EdgeType | None) -> Importable:
+        if edge_type is not None:
+            edges = self._edges_by_type(n, outgoing=False).get(edge_type)
+            if not edges:
+                msg = f"No predecessor of {n} with edge type {edge_type}"
+                raise NoSuitableNeighbors(msg)
+            return self.get_node(edges[0][0])
         return self._graph.find_predecessor_node_by_edge(n, lambda edge: edge.type == edge_type)
 
     def predecessors(self, n: NodeId, edge_type: EdgeType | None = None) -> Sequence[Importable]:
         if edge_type is not None:
-            return sort_editables(self._graph.find_predecessors_by_edge(n, lambda edge: edge.type == edge_type), by_id=True)
+            return list(self._neighbours_by_type(n, edge_type, outgoing=False))
         return self._graph.predecessors(n)
 
     def successors(self, n: NodeId, *, edge_type: EdgeType | None = None, sort: bool = True) -> Sequence[Importable]:
         if edge_type is not None:
-            res = self._graph.find_successors_by_edge(n, lambda edge: edge.type == edge_type)
-        else:
-            res = self._graph.successors(n)
+            if sort:
+                return list(self._neighbours_by_type(n, edge_type, outgoing=True))
+            return [self.get_node(v) for v in dict.fromkeys(v for _, v, _ in self._edges_by_type(n, outgoing=True).get(edge_type, ()))]
+        res = self._graph.successors(n)
         if sort:
             return sort_editables(res, by_id=True, dedupe=False)
         return res
@@ -665,21 +1084,195 @@ class CodebaseContext:
     def get_edge_data(self, *args, **kwargs) -> set[Edge]:
         return set(self._graph.get_all_edge_data(*args, **kwargs))
 
-    def in_edges(self, n: NodeId) -> WeightedEdgeList[Edge]:
+    def in_edges(self, n: NodeId, edge_type: EdgeType | None = None) -> Sequence[tuple[NodeId, NodeId, Edge]]:
+        if edge_type is not None:
+            return list(self._edges_by_type(n, outgoing=False).get(edge_type, ()))
         return self._graph.in_edges(n)
 
-    def out_edges(self, n: NodeId) -> WeightedEdgeList[Edge]:
+    def out_edges(self, n: NodeId, edge_type: EdgeType | None = None) -> Sequence[tuple[NodeId, NodeId, Edge]]:
+        if edge_type is not None:
+            return list(self._edges_by_type(n, outgoing=True).get(edge_type, ()))
         return self._graph.out_edges(n)
 
+    def _edges_by_type(self, n: NodeId, *, outgoing: bool) -> dict[EdgeType, list[tuple[NodeId, NodeId, Edge]]]:
+        """Edges of n bucketed by edge type, cached until an edge of n changes"""
+        idx = self._out_edge_idx if outgoing else self._in_edge_idx
+        if (by_type := idx.get(n)) is None:
+            by_type = idx[n] = defaultdict(list)
+            for edge in self._graph.out_edges(n) if outgoing else self._graph.in_edges(n):
+                by_type[edge[2].type].append(edge)
+        return by_type
+
+    def _neighbours_by_type(self, n: NodeId, edge_type: EdgeType, *, outgoing: bool) -> list[Importable]:
+        by_type = self._neighbour_idx.setdefault((n, outgoing), {})
+        if (neighbours := by_type.get(edge_type)) is None:
+            edges = self._edges_by_type(n, outgoing=outgoing).get(edge_type, ())
+            node_ids = dict.fromkeys(v if outgoing else u for u, v, _ in edges)
+            neighbours = by_type[edge_type] = sort_editables((self.get_node(node_id) for node_id in node_ids), by_id=True, dedupe=False)
+        return neighbours
+
+    def transitive_successors(
+        self,
+        n: NodeId,
+        *,
+        edge_type: EdgeType = EdgeType.SYMBOL_USAGE,
+        usage_types: UsageType | None = None,
+        max_depth: int | None = None,
+        symbols: bool = False,
+        cache: bool = False,
+    ) -> list[Importable]:
+        """Returns the nodes reachable from n through edges of edge_type, such as everything n transitively depends on.
+
+        Args:
+            usage_types: Only follow symbol usage edges of these usage types. Defaults to any.
+            max_depth: Only return nodes at most this many edges away from n. Defaults to no limit.
+            symbols: Follow the edges of each node's nested symbols as well, other than those between them, as
+                Importable.dependencies does.
+            cache: Memoize the result until an edge of the graph changes, for queries that are repeated.
+
+        Returns:
+            The reachable nodes other than n, ordered by their distance from n.
+        """
+        return [self.get_node(node_id) for node_id in self._closure(n, edge_type, usage_types, max_depth, outgoing=True, symbols=symbols, cache=cache)]
+
+    def transitive_predecessors(
+        self,
+        n: NodeId,
+        *,
+        edge_type: EdgeType = EdgeType.SYMBOL_USAGE,
+        usage_types: UsageType | None = None,
+        max_depth: int | None = None,
+        symbols: bool = False,
+        cache: bool = False,
+    ) -> list[Importable]:
+        """Returns the nodes n is reachable from through edges of edge_type, such as everything transitively depending on n.
+
+        Takes the same arguments as transitive_successors. With symbols, each edge leads to the symbol containing its
+        usage, as Usable.symbol_usages does.
+        """
+        return [self.get_node(node_id) for node_id in self._closure(n, edge_type, usage_types, max_depth, outgoing=False, symbols=symbols, cache=cache)]
+
+    def _closure(self, n: NodeId, edge_type: EdgeType, usage_types: UsageType | None, max_depth: int | None, *, outgoing: bool, symbols: bool, cache: bool) -> list[NodeId]:
+        """Breadth first search from n, so every node is expanded once, no matter how many paths lead to it"""
+        key = (n, edge_type, usage_types, max_depth, outgoing, symbols)
+        if (ret := self._closure_idx.get(key)) is not None:
+            return ret
+        ret = []
+        # Symbols can depend on or use themselves, so n is only skipped when following plain edges
+        seen = set() if symbols else {n}
+        frontier = [n]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for node_id in frontier:
+                for neighbour in self._closure_neighbours(node_id, edge_type, usage_types, outgoing=outgoing, symbols=symbols):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        ret.append(neighbour)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        # Edges change throughout a sync, so nothing computed during one is memoized
+        if cache and not self._computing:
+            self._closure_idx[key] = ret
+        return ret
+
+    def _closure_neighbours(self, n: NodeId, edge_type: EdgeType, usage_types: UsageType | None, *, outgoing: bool, symbols: bool) -> Iterator[NodeId]:
+        nested = {symbol.node_id for symbol in self.get_node(n).descendant_symbols} if symbols and outgoing else None
+        for node_id in (n,) if nested is None else nested:
+            edges = self._edges_by_type(node_id, outgoing=outgoing).get(edge_type, ())
+            if symbols and not outgoing:
+                # In the order of Usable.usages
+                edges = sorted(edges, key=lambda edge: edge[2].usage.start_byte if edge[2].usage is not None else -1, reverse=True)
+            for u, v, edge in edges:
+                if usage_types is not None and edge.usage is not None and edge.usage.usage_type is not None and edge.usage.usage_type not in usage_types:
+                    continue
+                if outgoing:
+                    if nested is None or v not in nested:
+                        yield v
+                elif symbols:
+                    # The symbol the usage is in, rather than the node of the usage itself
+                    yield (edge.usage.usage_symbol if edge.usage is not None else self.get_node(u)).parent_symbol.node_id
+                else:
+                    yield u
+
+    def _invalidate_edges(self, u: NodeId, v: NodeId) -> None:
+        self._out_edge_idx.pop(u, None)
+        self._neighbour_idx.pop((u, True), None)
+        self._in_edge_idx.pop(v, None)
+        self._neighbour_idx.pop((v, False), None)
+        if self._closure_idx:
+            self._closure_idx.clear()
+
     def remove_node(self, n: NodeId):
+        # Node ids are reused by the graph, so drop the id from the indexes as well
+        if self._graph.has_node(n):
+            node_type = self._graph.get_node_data(n).node_type
+            self._node_type_idx[node_type].discard(n)
+            self._node_type_views.pop(node_type, None)
+            for u in self._graph.predecessor_indices(n):
+                self._invalidate_edges(u, n)
+            for v in self._graph.successor_indices(n):
+                self._invalidate_edges(n, v)
+            self._invalidate_edges(n, n)
+        self._unindexed_symbols.discard(n)
+        if (key := self._symbol_idx_keys.pop(n, None)) is not None:
+            symbol_type, name = key
+            node_ids = self._symbol_idx[symbol_type][name]
+            node_ids.discard(n)
+            if not node_ids:
+                del self._symbol_idx[symbol_type][name]
         return self._graph.remove_node(n)
 
+    def _index_node(self, node_id: NodeId, node: Importable) -> None:
+        self._node_type_idx[node.node_type].add(node_id)
+        self._node_type_views.pop(node.node_type, None)
+        if node.node_type == NodeType.SYMBOL:
+            # Symbols are added before their name is parsed, so they are indexed by name lazily
+            self._unindexed_symbols.add(node_id)
+
+    def _reset_node_indexes(self) -> None:
+        """Rebuilds the node type and symbol name indexes from the nodes in the graph, and clears the edge indexes"""
+        self._node_type_idx = defaultdict(set)
+        self._node_type_views = {}
+        self._symbol_idx = defaultdict(dict)
+        self._symbol_idx_keys = {}
+        self._unindexed_symbols = set()
+        self._in_edge_idx = {}
+        self._out_edge_idx = {}
+        self._neighbour_idx = {}
+        self._closure_idx = {}
+        for node_id in self._graph.node_indices():
+            self._index_node(node_id, self._graph.get_node_data(node_id))
+
+    def _index_symbols(self) -> None:
+        """Adds the symbols added since the last call to the name index"""
+        for node_id in self._unindexed_symbols:
+            node = self._graph.get_node_data(node_id)
+            if (name := node.name) is None:
+                continue
+            self._symbol_idx[node.symbol_type].setdefault(name, set()).add(node_id)
+            self._symbol_idx_keys[node_id] = (node.symbol_type, name)
+        self._unindexed_symbols.clear()
+
+    def get_symbols_by_name(self, name: str, symbol_type: SymbolType | None = None) -> list[Symbol]:
+        """Returns all symbols (including nested ones) with the given name, optionally filtered by symbol type"""
+        if self._unindexed_symbols:
+            self._index_symbols()
+        if symbol_type is not None:
+            node_ids = self._symbol_idx[symbol_type].get(name, ())
+        else:
+            node_ids = [node_id for by_name in self._symbol_idx.values() for node_id in by_name.get(name, ())]
+        # Return symbols in graph order, like get_nodes does
+        return [self._graph.get_node_data(node_id) for node_id in sorted(node_ids)]
+
     def remove_edge(self, u: NodeId, v: NodeId, *, edge_type: EdgeType | None = None):
         for edge in self._graph.edge_indices_from_endpoints(u, v):
             if edge_type is not None:
                 if self._graph.get_edge_data_by_index(edge).type != edge_type:
                     continue
             self._graph.remove_edge_from_index(edge)
+        self._invalidate_edges(u, v)
 
     @lru_cache(maxsize=10000)
     def to_absolute(self, filepath: PathLike | str) -> Path:
@@ -724,16 +1317,14 @@ class CodebaseContext:
 
         # Sync the graph if requested
         if sync_graph and len(self.pending_syncs) > 0:
-            self.apply_diffs(self.pending_syncs)
-            self.all_syncs.extend(self.pending_syncs)
+            self._sync_diffs(self.pending_syncs)
             self.pending_syncs.clear()
 
     @commiter
     def add_single_file(self, filepath: PathLike) -> None:
         """Adds a file to the graph and computes it's dependencies"""
         sync = DiffLite(ChangeType.Added, self.to_absolute(filepath))
-        self.all_syncs.append(sync)
-        self.apply_diffs([sync])
+        self._sync_diffs([sync])
         self.transaction_manager.check_limits()
 
     @contextmanager
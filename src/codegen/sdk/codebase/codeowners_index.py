@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from codegen.sdk.enums import NodeType
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from codeowners import CodeOwners as CodeOwnersParser
+
+    from codegen.sdk.codebase.codebase_context import CodebaseContext
+    from codegen.sdk.core.file import SourceFile
+    from codegen.sdk.core.node_id_factory import NodeId
+
+# (owner type, owner value), e.g. ("TEAM", "@org/team")
+OwnerTuple = tuple[str, str]
+
+
+class CodeOwnersIndex:
+    """Owners of the files in a codebase, matched against the CODEOWNERS rules once per path.
+
+    Matching a path walks every rule until one matches, so the owners are memoized by path. The inverted index from
+    owner to file node ids is built the first time it is queried, and is then kept up to date by every sync.
+    """
+
+    ctx: CodebaseContext
+    parser: CodeOwnersParser
+    _owners: dict[str, list[OwnerTuple]]
+    _files_by_owner: defaultdict[str, set[NodeId]] | None
+    _owners_by_file: dict[NodeId, set[str]]
+
+    def __init__(self, ctx: CodebaseContext, parser: CodeOwnersParser) -> None:
+        self.ctx = ctx
+        self.parser = parser
+        self._owners = {}
+        self.reset()
+
+    def of(self, filepath: str) -> list[OwnerTuple]:
+        """Returns the owners of a path, in the order of the matching CODEOWNERS rule"""
+        if (owners := self._owners.get(filepath)) is None:
+            owners = self._owners[filepath] = self.parser.of(filepath)
+        return owners
+
+    def owners(self, filepath: str) -> set[str]:
+        """Returns the owner values of a path"""
+        return {owner_value for _, owner_value in self.of(filepath)}
+
+    def file_node_ids(self, owner_value: str) -> set[NodeId]:
+        """Returns the node ids of the files in the graph owned by the given owner"""
+        if self._files_by_owner is None:
+            self._files_by_owner = defaultdict(set)
+            for file in self.ctx.get_nodes(NodeType.FILE):
+                self._add_file(file)
+        return self._files_by_owner.get(owner_value, set())
+
+    def update(self, added_files: Iterable[SourceFile], removed_files: Iterable[SourceFile]) -> None:
+        """Updates the inverted index for files added to or removed from the graph, if it has been built"""
+        if self._files_by_owner is None:
+            return
+        # Node ids are reused, so remove first
+        for file in removed_files:
+            for owner_value in self._owners_by_file.pop(file.node_id, ()):
+                self._files_by_owner[owner_value].discard(file.node_id)
+        for file in added_files:
+            self._add_file(file)
+
+    def reset(self) -> None:
+        """Drops the inverted index, to be rebuilt on the next query. Owners of paths are kept, as the rules do not change."""
+        self._files_by_owner = None
+        self._owners_by_file = {}
+
+    def _add_file(self, file: SourceFile) -> None:
+        owner_values = self._owners_by_file[file.node_id] = self.owners(file.file_path)
+        for owner_value in owner_values:
+            self._files_by_owner[owner_value].add(file.node_id)
@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 from codegen.shared.enums.programming_language import ProgrammingLanguage
 
 if TYPE_CHECKING:
     from codegen.sdk.codebase.codebase_context import CodebaseContext
+    from codegen.sdk.core.file import SourceFile
 
 
 class ConfigParser(ABC):
@@ -14,6 +16,13 @@ class ConfigParser(ABC):
     @abstractmethod
     def parse_configs(self, codebase_context: "CodebaseContext"): ...
 
+    def is_config_file(self, filepath: Path) -> bool:
+        return False
+
+    def invalidate(self, filepath: Path) -> list["SourceFile"]:
+        """Drops the parsed configs after the given config file changed, returning the files that may be configured by it"""
+        return []
+
 
 def get_config_parser_for_language(language: ProgrammingLanguage, codebase_context: "CodebaseContext") -> ConfigParser | None:
     from codegen.sdk.typescript.config_parser import TSConfigParser
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import itertools
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from codegen.sdk.core.interfaces.importable import Importable
+    from codegen.sdk.core.node_id_factory import NodeId
+    from codegen.sdk.enums import NodeType
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DependencyStats:
+    """Counters collected while computing dependencies, to see where a build spends its time."""
+
+    passes: int = 0
+    recomputed: int = 0
+    recomputed_by_type: Counter[NodeType] = field(default_factory=Counter)
+    seconds_by_type: defaultdict[NodeType, float] = field(default_factory=lambda: defaultdict(float))
+
+    def record(self, node_type: NodeType, seconds: float) -> None:
+        self.recomputed += 1
+        self.recomputed_by_type[node_type] += 1
+        self.seconds_by_type[node_type] += seconds
+
+    def log(self) -> None:
+        logger.info(f"> Computed dependencies for {self.recomputed} nodes in {self.passes} passes")
+        for node_type, seconds in sorted(self.seconds_by_type.items(), key=lambda item: item[1], reverse=True):
+            logger.info(f"  {node_type.name}: {self.recomputed_by_type[node_type]} nodes in {seconds:.3f}s")
+
+
+class DependencyWorklist:
+    """Deduplicating queue of nodes whose dependencies need to be (re)computed, keyed by node id.
+
+    A node is only ever handed out once, no matter how often it is pushed. Nodes are handed out in passes, grouped by
+    the file they belong to so consecutive recomputes hit the same file's resolution caches.
+    """
+
+    def __init__(self) -> None:
+        self._seen: set[NodeId] = set()
+        self._pending: dict[NodeId, Importable] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def push(self, node: Importable) -> None:
+        if node.node_id not in self._seen and node.node_id not in self._pending:
+            self._pending[node.node_id] = node
+
+    def extend(self, nodes: Iterable[Importable]) -> None:
+        for node in nodes:
+            self.push(node)
+
+    def is_seen(self, node_id: NodeId) -> bool:
+        return node_id in self._seen or node_id in self._pending
+
+    def pop_pass(self) -> list[Importable]:
+        """Hands out all pending nodes, grouped by file in the order the files were first queued"""
+        by_file: dict[NodeId | None, list[Importable]] = {}
+        for node in self._pending.values():
+            by_file.setdefault(getattr(node, "file_node_id", None), []).append(node)
+        self._seen.update(self._pending)
+        self._pending = {}
+        return list(itertools.chain.from_iterable(by_file.values()))
@@ -3,6 +3,7 @@ from codegen.sdk.codebase.flagging.code_flag import CodeFlag
 from codegen.sdk.codebase.flagging.group import Group
 from codegen.sdk.codebase.flagging.groupers.base_grouper import BaseGrouper
 from codegen.sdk.codebase.flagging.groupers.enums import GroupBy
+from codegen.sdk.core.interfaces.editable import Editable
 
 DEFAULT_CHUNK_SIZE = 5
 
@@ -21,8 +22,14 @@ class CodeownerGrouper(BaseGrouper):
     def create_all_groups(flags: list[CodeFlag], repo_operator: RemoteRepoOperator | None = None) -> list[Group]:
         owner_to_group: dict[str, Group] = {}
         no_owner_group = Group(group_by=GroupBy.CODEOWNER, segment="@no-owner", flags=[])
+        # Flags are often raised in the same files, so match each path against the rules once. Flags on editables go
+        # through the codebase's index, which keeps the owners of each path across calls.
+        owners_by_filepath: dict[str, list[tuple[str, str]]] = {}
         for idx, flag in enumerate(flags):
-            flag_owners = repo_operator.codeowners_parser.of(flag.filepath)  # TODO: handle codeowners_parser could be null
+            if isinstance(flag.symbol, Editable) and flag.symbol.ctx.codeowners_index is not None:
+                flag_owners = flag.symbol.ctx.codeowners_index.of(flag.filepath)
+            elif (flag_owners := owners_by_filepath.get(flag.filepath)) is None:
+                flag_owners = owners_by_filepath[flag.filepath] = repo_operator.codeowners_parser.of(flag.filepath)  # TODO: handle codeowners_parser could be null
             if not flag_owners:
                 no_owner_group.flags.append(flag)
                 continue
@@ -1,4 +1,6 @@
 import logging
+import mmap
+import os
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
@@ -6,6 +8,9 @@ from codegen.sdk.codebase.io.io import IO, BadWriteError
 
 logger = logging.getLogger(__name__)
 
+# Files at least this large are decoded straight from a memory map, skipping the intermediate bytes copy
+MMAP_THRESHOLD = 1 << 20
+
 
 class FileIO(IO):
     """IO implementation that writes files to disk, and tracks pending changes."""
@@ -22,12 +27,22 @@ class FileIO(IO):
         if path in self.files:
             return self.files[path]
         else:
-            return path.read_bytes()
+            return self._disk_path(path).read_bytes()
+
+    def read_text(self, path: Path) -> str:
+        if path in self.files:
+            return self.files[path].decode("utf-8")
+        with open(self._disk_path(path), "rb") as f:
+            # Small files, including empty ones which can not be mapped, are cheaper to read directly
+            if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+                return f.read().decode("utf-8")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return str(mm, "utf-8")
 
     def save_files(self, files: set[Path] | None = None) -> None:
         to_save = set(filter(lambda f: f in files, self.files)) if files is not None else self.files.keys()
         with ThreadPoolExecutor() as exec:
-            exec.map(lambda path: path.write_bytes(self.files[path]), to_save)
+            exec.map(lambda path: self._disk_path(path).write_bytes(self.files[path]), to_save)
         if files is None:
             self.files.clear()
         else:
@@ -41,11 +56,16 @@ class FileIO(IO):
 
     def delete_file(self, path: Path) -> None:
         self.untrack_file(path)
-        if path.exists():
-            path.unlink()
+        disk_path = self._disk_path(path)
+        if disk_path.exists():
+            disk_path.unlink()
 
     def untrack_file(self, path: Path) -> None:
         self.files.pop(path, None)
 
     def file_exists(self, path: Path) -> bool:
-        return path.exists()
+        return self._disk_path(path).exists()
+
+    def _disk_path(self, path: Path) -> Path:
+        """Where `path` lives on disk. Subclasses override this to redirect reads and writes elsewhere."""
+        return path
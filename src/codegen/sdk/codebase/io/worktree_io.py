@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from codegen.sdk.codebase.io.file_io import FileIO
+
+
+class WorktreeIO(FileIO):
+    """FileIO that maps paths inside the repo onto a git worktree of it.
+
+    Graph nodes keep their original absolute paths, while every read and write goes to the worktree.
+    """
+
+    repo_path: Path
+    worktree_path: Path
+
+    def __init__(self, repo_path: Path, worktree_path: Path):
+        super().__init__()
+        self.repo_path = repo_path
+        self.worktree_path = worktree_path
+
+    def _disk_path(self, path: Path) -> Path:
+        if not path.is_relative_to(self.repo_path):
+            return path
+        return self.worktree_path / path.relative_to(self.repo_path)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from codegen.sdk.core.node_id_factory import NodeId
+
+
+class ModuleResolutionCache:
+    """Caches which file a module path resolves to, e.g. `src/utils` to src/utils/index.ts.
+
+    Resolving a module path probes a handful of candidate files: the path itself, the path with an extension appended
+    and the path with its extension swapped. Every candidate is one of the "stems" of the entry followed by an
+    extension. When a file is added or removed, only the entries probing one of its stems (the path cut at any dot in
+    its name) are dropped, so unrelated resolutions stay cached across syncs.
+    """
+
+    _resolved: dict[str, NodeId | None]
+    _paths_by_stem: defaultdict[str, set[str]]
+    _translations: dict[tuple[object, str], str]
+
+    def __init__(self) -> None:
+        self._resolved = {}
+        self._paths_by_stem = defaultdict(set)
+        self._translations = {}
+
+    def __len__(self) -> int:
+        return len(self._resolved)
+
+    def __contains__(self, module_path: str) -> bool:
+        return module_path in self._resolved
+
+    def get(self, module_path: str) -> NodeId | None:
+        """Returns the node id of the file the module path resolved to, or None if it did not resolve"""
+        return self._resolved[module_path]
+
+    def set(self, module_path: str, node_id: NodeId | None, stems: Iterable[str]) -> None:
+        """Caches the file the module path resolved to, given the stems of all candidates probed to find it"""
+        self._resolved[module_path] = node_id
+        for stem in stems:
+            self._paths_by_stem[stem].add(module_path)
+
+    def get_translation(self, config: object, import_path: str) -> str | None:
+        """Returns the cached translation of an import path by a config (e.g. a tsconfig's path aliases)"""
+        return self._translations.get((config, import_path), None)
+
+    def set_translation(self, config: object, import_path: str, translated: str) -> None:
+        self._translations[(config, import_path)] = translated
+
+    def clear_translations(self) -> None:
+        """Drops all translations, e.g. after a config changed"""
+        self._translations.clear()
+
+    def invalidate_file(self, filepath: str) -> None:
+        """Drops every resolution that probed the given file as a candidate"""
+        for stem in self._stems(filepath):
+            for module_path in self._paths_by_stem.pop(stem, ()):
+                self._resolved.pop(module_path, None)
+
+    def clear(self) -> None:
+        self._resolved.clear()
+        self._paths_by_stem.clear()
+        self._translations.clear()
+
+    @staticmethod
+    def _stems(filepath: str) -> list[str]:
+        """Returns the file path cut at every dot in its name, e.g. a/b.d.ts, a/b.d and a/b for a/b.d.ts"""
+        dirname, _, name = filepath.rpartition("/")
+        prefix = f"{dirname}/" if dirname else ""
+        parts = name.split(".")
+        return [prefix + ".".join(parts[:i]) for i in range(len(parts), 0, -1)]
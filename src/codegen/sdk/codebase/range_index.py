@@ -1,23 +1,117 @@
 import itertools
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from functools import cached_property
+from typing import Self
 
 from tree_sitter import Range
 
 from codegen.sdk.core.interfaces.editable import Editable
 from codegen.sdk.extensions.sort import sort_editables
 
+# Editables indexed since the interval tree was built are scanned linearly, until there are more than this many
+MIN_PENDING = 64
+# Or more than this fraction of the editables in the tree, at which point the tree is rebuilt
+MAX_PENDING_RATIO = 0.125
+
+
+class IntervalTree:
+    """Static interval tree over the byte ranges of a list of editables.
+
+    Editables are sorted by start byte, with a segment tree holding the maximum end byte of every block, so a query
+    only descends into blocks that can contain a match. Queries take O(log n + k) for k matches.
+
+    Other objects with byte ranges, such as transactions, can be indexed by passing their (start, end) spans.
+    """
+
+    def __init__(self, editables: list[Editable], positions: list[tuple[int, int]] | None = None, spans: list[tuple[int, int]] | None = None) -> None:
+        if spans is None:
+            spans = [(editable.ts_node.start_byte, editable.ts_node.end_byte) for editable in editables]
+        # Sort by start byte, keeping the original order (or the given positions) as a tie breaker
+        entries = sorted(zip(spans, positions or [(i, 0) for i in range(len(editables))], editables), key=lambda entry: (entry[0][0], entry[1]))
+        self._positions = [position for _, position, _ in entries]
+        self._editables = [editable for _, _, editable in entries]
+        self._starts = [start for (start, _), _, _ in entries]
+        self._ends = [end for (_, end), _, _ in entries]
+        self._size = 1
+        while self._size < len(entries):
+            self._size *= 2
+        self._max_end = [-1] * (2 * self._size)
+        self._max_end[self._size : self._size + len(entries)] = self._ends
+        for node in range(self._size - 1, 0, -1):
+            self._max_end[node] = max(self._max_end[2 * node], self._max_end[2 * node + 1])
+
+    def __len__(self) -> int:
+        return len(self._editables)
+
+    def _find(self, hi: int, min_end: int) -> list[int]:
+        """Returns the indexes below hi with an end byte of at least min_end, in order"""
+        ret = []
+        stack = [(1, 0, self._size)]
+        while stack:
+            node, lo, width = stack.pop()
+            if lo >= hi or self._max_end[node] < min_end:
+                continue
+            if node >= self._size:
+                ret.append(node - self._size)
+            else:
+                width //= 2
+                stack.append((2 * node + 1, lo + width, width))
+                stack.append((2 * node, lo, width))
+        return ret
+
+    def overlapping(self, start_byte: int, end_byte: int) -> list[Editable]:
+        """Returns all editables that overlap with [start_byte, end_byte), ordered by start byte"""
+        return [self._editables[i] for i in self._find(bisect_left(self._starts, end_byte), start_byte + 1)]
+
+    def containing(self, start_byte: int, end_byte: int) -> list[Editable]:
+        """Returns all editables that fully contain [start_byte, end_byte), ordered by start byte"""
+        return [self._editables[i] for i in self._find(bisect_right(self._starts, start_byte), end_byte)]
+
+    def starting_at(self, start_byte: int) -> list[Editable]:
+        """Returns all editables starting at start_byte, in the order they were passed in"""
+        return self._editables[bisect_left(self._starts, start_byte) : bisect_right(self._starts, start_byte)]
+
+    def innermost(self, start_byte: int, end_byte: int) -> Editable | None:
+        """Returns the smallest editable containing [start_byte, end_byte).
+
+        Ties are broken by the order the editables were passed in.
+        """
+        if (entry := self.innermost_entry(start_byte, end_byte)) is None:
+            return None
+        return entry[-1]
+
+    def innermost_entry(self, start_byte: int, end_byte: int) -> tuple[int, tuple[int, int], Editable] | None:
+        """Returns (length, position, editable) of the smallest editable containing [start_byte, end_byte)"""
+        matches = self._find(bisect_right(self._starts, start_byte), end_byte)
+        if not matches:
+            return None
+        best = min(matches, key=lambda i: (self._ends[i] - self._starts[i], self._positions[i]))
+        return self._ends[best] - self._starts[best], self._positions[best], self._editables[best]
+
 
 class RangeIndex:
     _ranges: defaultdict[Range, list[Editable]]
     _canonical_range: defaultdict[Range, dict[int, Editable]]
+    _range_positions: dict[Range, int]
+    # Editables added since the interval tree was built, with their position in the order of `nodes`
+    _pending: list[tuple[tuple[int, int], Editable]]
 
     def __init__(self):
         self._ranges = defaultdict(list)
         self._canonical_range = defaultdict(dict)
+        self._range_positions = {}
+        self._pending = []
 
     def add_to_range(self, editable: Editable) -> None:
-        self._ranges[editable.range].append(editable)
+        editables = self._ranges[editable.range]
+        editables.append(editable)
+        position = (self._range_positions.setdefault(editable.range, len(self._range_positions)), len(editables) - 1)
+        # Editables are also created lazily after a file is parsed, so keep the tree until enough of those pile up
+        if (tree := self.__dict__.get("interval_tree")) is not None:
+            self._pending.append((position, editable))
+            if len(self._pending) > max(MIN_PENDING, len(tree) * MAX_PENDING_RATIO):
+                del self.__dict__["interval_tree"]
 
     def mark_as_canonical(self, editable: Editable) -> None:
         self._canonical_range[editable.range][editable.ts_node.kind_id] = editable
@@ -32,13 +126,63 @@ class RangeIndex:
     def clear(self):
         self._ranges.clear()
         self._canonical_range.clear()
+        self._range_positions.clear()
+        self._pending.clear()
         self.__dict__.pop("children", None)
         self.__dict__.pop("nodes", None)
+        self.__dict__.pop("interval_tree", None)
+
+    def copy(self) -> Self:
+        """Returns a copy that can be changed without affecting this index. Editables are shared."""
+        ret = type(self)()
+        ret._ranges.update((range, list(editables)) for range, editables in self._ranges.items())
+        ret._canonical_range.update((range, dict(mapping)) for range, mapping in self._canonical_range.items())
+        ret._range_positions = dict(self._range_positions)
+        return ret
 
     @cached_property
     def nodes(self) -> list[Editable]:
         return list(itertools.chain.from_iterable(self._ranges.values()))
 
+    @cached_property
+    def interval_tree(self) -> IntervalTree:
+        """Built on the first overlap query, as most files are never queried by position"""
+        self._pending.clear()
+        editables, positions = [], []
+        for key, range_editables in self._ranges.items():
+            editables.extend(range_editables)
+            positions.extend((self._range_positions[key], i) for i in range(len(range_editables)))
+        return IntervalTree(editables, positions)
+
+    def get_overlapping(self, start_byte: int, end_byte: int) -> list[Editable]:
+        """Returns all indexed editables that overlap with the byte range [start_byte, end_byte)"""
+        ret = self.interval_tree.overlapping(start_byte, end_byte)
+        if pending := [editable for _, editable in self._pending if editable.ts_node.start_byte < end_byte and editable.ts_node.end_byte > start_byte]:
+            ret = sorted(ret + pending, key=lambda editable: editable.ts_node.start_byte)
+        return ret
+
+    def get_containing(self, start_byte: int, end_byte: int) -> list[Editable]:
+        """Returns all indexed editables that start at or before start_byte and end at or after end_byte"""
+        ret = self.interval_tree.containing(start_byte, end_byte)
+        if pending := [editable for _, editable in self._pending if editable.ts_node.start_byte <= start_byte and editable.ts_node.end_byte >= end_byte]:
+            ret = sorted(ret + pending, key=lambda editable: editable.ts_node.start_byte)
+        return ret
+
+    def get_innermost(self, start_byte: int, end_byte: int | None = None) -> Editable | None:
+        """Returns the smallest indexed editable containing the byte range, or the byte if end_byte is None.
+
+        Ties are broken by the order of `nodes`, so the result matches a linear scan for the smallest editable.
+        """
+        end_byte = start_byte if end_byte is None else end_byte
+        best = self.interval_tree.innermost_entry(start_byte, end_byte)
+        for position, editable in self._pending:
+            ts_node = editable.ts_node
+            if ts_node.start_byte <= start_byte and ts_node.end_byte >= end_byte:
+                entry = (ts_node.end_byte - ts_node.start_byte, position, editable)
+                if best is None or entry[:2] < best[:2]:
+                    best = entry
+        return None if best is None else best[-1]
+
     @cached_property
     def children(self) -> dict[Editable, list[Editable]]:
         ret = defaultdict(list)
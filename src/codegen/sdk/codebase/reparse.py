@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import Counter
+from functools import cache, cached_property
+from itertools import accumulate
+from typing import TYPE_CHECKING, Any, NamedTuple, Self
+
+from tree_sitter import Node as TSNode
+
+from codegen.sdk.codebase.tree_cache import TSNodeRef, find_ts_node
+from codegen.sdk.tree_sitter_parser import ParsedTree, get_parser_by_filepath_or_extension
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from codegen.sdk.core.detached_symbols.code_block import CodeBlock
+    from codegen.sdk.core.file import SourceFile
+    from codegen.sdk.core.interfaces.editable import Editable
+    from codegen.sdk.core.interfaces.importable import Importable
+    from codegen.sdk.core.statements.statement import Statement
+
+# Attributes editables keep byte offsets of their file in, rather than nodes
+OFFSET_ATTRIBUTES = frozenset({"_container_start_byte", "_container_end_byte"})
+
+
+class TextEdit(NamedTuple):
+    """The byte range two versions of a file differ in, found by trimming their common prefix and suffix"""
+
+    start_byte: int
+    old_end_byte: int
+    new_end_byte: int
+
+    @classmethod
+    def between(cls, old: bytes, new: bytes) -> Self:
+        limit = min(len(old), len(new))
+        prefix = _longest(lambda n: old[:n] == new[:n], limit)
+        suffix = _longest(lambda n: old[len(old) - n :] == new[len(new) - n :], limit - prefix)
+        return cls(prefix, len(old) - suffix, len(new) - suffix)
+
+    @property
+    def delta(self) -> int:
+        return self.new_end_byte - self.old_end_byte
+
+
+class FileEdits(NamedTuple):
+    """The byte edits a commit made to a file, in the order they were made, so each is relative to the content before it"""
+
+    old_content: bytes
+    new_content: bytes
+    edits: list[TextEdit]
+
+
+def _longest(matches: Callable[[int], bool], limit: int) -> int:
+    """Returns the largest n <= limit that matches, given that every n up to it matches as well"""
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if matches(mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+@cache
+def _cached_attributes(cls: type) -> frozenset[str]:
+    """Names of the cached properties of a class, which are computed again rather than moved"""
+    return frozenset(name for klass in cls.__mro__ for name, value in vars(klass).items() if isinstance(value, cached_property))
+
+
+def _point(content: bytes, byte: int) -> tuple[int, int]:
+    return content.count(b"\n", 0, byte), byte - content.rfind(b"\n", 0, byte) - 1
+
+
+def _end_point(start: tuple[int, int], inserted: bytes) -> tuple[int, int]:
+    if (newline := inserted.rfind(b"\n")) == -1:
+        return start[0], start[1] + len(inserted)
+    return start[0] + inserted.count(b"\n"), len(inserted) - newline - 1
+
+
+# Stands in for the code block of the file in the updates, as the new one only exists once the re-parse has started
+_BLOCK = object()
+
+
+class _Unmovable(Exception):
+    """Raised for a value that can not be moved onto the new tree"""
+
+
+class IncrementalReparse:
+    """Re-parse of a file that keeps the top level statements an edit did not touch.
+
+    A tree of the old content is edited and handed back to tree-sitter, which re-uses its unchanged subtrees.
+    Statements clear of the edited bytes and of the ranges tree-sitter reports as changed are kept: the editables below
+    them are moved onto the nodes of the new tree, and the ones on the graph keep their node ids. Only the other
+    statements are parsed again.
+
+    Statements after the edit are only kept if they start on a later line, so moving them never changes a column.
+    Statements containing imports are always parsed again, as the imports of a file are parsed separately.
+    """
+
+    file: SourceFile
+    parsed: ParsedTree
+    # Kept statements, by the node of the new tree they are moved onto
+    statements: dict[TSNodeRef, Statement]
+    # Nodes on the graph below the kept statements
+    nodes: list[Importable]
+    # Attribute updates moving each editable below the kept statements onto the new tree
+    _moves: list[tuple[Editable, dict[str, Any]]]
+    # Ids of moved editables that are the canonical editable of their range
+    _canonical: set[int]
+
+    def __init__(self, file: SourceFile, parsed: ParsedTree) -> None:
+        self.file = file
+        self.parsed = parsed
+        self.statements = {}
+        self.nodes = []
+        self._moves = []
+        self._canonical = set()
+
+    @classmethod
+    def plan(cls, file: SourceFile, content: str, edits: FileEdits | None = None) -> Self | None:
+        """Parses the new content of a file and finds the statements to keep. Changes nothing until applied.
+
+        `edits` are the byte edits of the commit that wrote the content, if known. Otherwise the edit is found by
+        comparing the old and new content. Returns None if the file does not have the tree it was parsed from.
+        """
+        from codegen.sdk.core.import_resolution import Import
+
+        if (old := file._parsed_tree) is None:
+            return None
+        new = bytes(content, "utf-8")
+        if edits is not None and edits.old_content == old.content and edits.new_content == new:
+            # Made in descending order of start_byte, so each is relative to the original content up to its end
+            text_edits = edits.edits
+        else:
+            text_edits = [TextEdit.between(old.content, new)]
+        # Ascending, with the bytes each edit's range moves by once the edits before it are applied
+        ascending = text_edits[::-1]
+        shifts = list(accumulate((edit.delta for edit in ascending), initial=0))
+        old_end_rows = [_point(old.content, edit.old_end_byte)[0] for edit in ascending]
+        parser = get_parser_by_filepath_or_extension(file.filepath)
+        # The old tree stays as it is for the editables still on it. Freeing a Tree.copy() crashes py-tree-sitter 0.24,
+        # so the tree to edit is parsed again from the old one instead. That re-uses all of its subtrees, which editing
+        # the new tree copies on write, and the tree is dropped once the new content has been parsed.
+        tree = parser.parse(old.content, old.tree)
+        for edit, shift in zip(text_edits, reversed(shifts[:-1])):
+            start_point = _point(old.content, edit.start_byte)
+            tree.edit(
+                start_byte=edit.start_byte,
+                old_end_byte=edit.old_end_byte,
+                new_end_byte=edit.new_end_byte,
+                start_point=start_point,
+                old_end_point=_point(old.content, edit.old_end_byte),
+                new_end_point=_end_point(start_point, new[edit.start_byte + shift : edit.new_end_byte + shift]),
+            )
+        ret = cls(file, ParsedTree(parser.parse(new, tree), new))
+        # Text changes within a token do not show up in the changed ranges, so the edits themselves are dirty as well
+        dirty = [(edit.start_byte + shift, edit.new_end_byte + shift) for edit, shift in zip(ascending, shifts)]
+        dirty.extend((changed.start_byte, changed.end_byte) for changed in tree.changed_ranges(ret.parsed.tree))
+        del tree
+        starts = [edit.start_byte for edit in ascending]
+        imports = [(node.ts_node.start_byte, node.ts_node.end_byte) for node in file._nodes if isinstance(node, Import)]
+        statements = file.code_block.statements
+        # Statements sharing a node can not be told apart when the new statements are parsed
+        refs = Counter(TSNodeRef.from_node(statement.ts_node) for statement in statements)
+        root = ret.parsed.tree.root_node
+        moves: dict[int, list[tuple[Editable, dict[str, Any]]]] = {}
+        for statement in statements:
+            node = statement.ts_node
+            ref = TSNodeRef.from_node(node)
+            # The edits starting up to the end of the statement must all end before it starts, on an earlier line
+            if (preceding := bisect_right(starts, node.end_byte)) and (ascending[preceding - 1].old_end_byte >= node.start_byte or old_end_rows[preceding - 1] >= node.start_point[0]):
+                continue
+            shift = shifts[preceding]
+            if refs[ref] > 1 or any(start <= node.end_byte and node.start_byte <= end for start, end in imports):
+                continue
+            new_ref = TSNodeRef(ref.start_byte + shift, ref.end_byte + shift, ref.kind_id)
+            if any(start <= new_ref.end_byte and new_ref.start_byte <= end for start, end in dirty):
+                continue
+            if (new_node := find_ts_node(root, new_ref)) is None or new_node.parent != root:
+                continue
+            if (statement_moves := ret._collect(statement, shift, old.tree.root_node)) is not None:
+                ret.statements[new_ref] = statement
+                moves[id(statement)] = statement_moves
+
+        # Nodes on the graph must be moved along with their statement, or the statement is parsed again
+        for ref, statement in list(ret.statements.items()):
+            start, end = statement.ts_node.start_byte, statement.ts_node.end_byte
+            nodes = [node for node in file._nodes if start <= node.ts_node.start_byte and node.ts_node.end_byte <= end]
+            moved = {id(editable) for editable, _ in moves[id(statement)]}
+            if all(id(node) in moved for node in nodes):
+                ret.nodes.extend(nodes)
+                ret._moves.extend(moves[id(statement)])
+            else:
+                del ret.statements[ref]
+        return ret
+
+    def _collect(self, statement: Statement, shift: int, old_root: TSNode) -> list[tuple[Editable, dict[str, Any]]] | None:
+        """Finds the attribute updates moving every editable below a statement onto the new tree.
+
+        Returns None if an editable can not be moved, such as one holding a node or editable outside of the statement.
+        """
+        from codegen.sdk.core.interfaces.editable import Editable
+
+        file = self.file
+        block = file.code_block
+        index = file._range_index
+        root = self.parsed.tree.root_node
+        start, end = statement.ts_node.start_byte, statement.ts_node.end_byte
+        ret = []
+        seen = {id(statement)}
+        stack = [statement]
+
+        def move(value: Any) -> Any:
+            if isinstance(value, TSNode):
+                ref = TSNodeRef.from_node(value)
+                # Editables can also hold nodes parsed from other content, which stay as they are
+                if find_ts_node(old_root, ref) != value:
+                    return value
+                if ref.start_byte < start or ref.end_byte > end:
+                    raise _Unmovable
+                if (moved := find_ts_node(root, TSNodeRef(ref.start_byte + shift, ref.end_byte + shift, ref.kind_id))) is None:
+                    raise _Unmovable
+                return moved
+            if isinstance(value, Editable):
+                if value is block:
+                    return _BLOCK
+                if value is file or value.file_node_id != file.node_id or id(value) in seen:
+                    return value
+                node = value.__dict__.get("ts_node")
+                if not isinstance(node, TSNode) or node.start_byte < start or node.end_byte > end:
+                    raise _Unmovable
+                seen.add(id(value))
+                stack.append(value)
+                return value
+            if type(value) in (list, tuple):
+                moved = [move(item) for item in value]
+                if any(item is _BLOCK for item in moved):
+                    raise _Unmovable
+                return value if all(new is old for new, old in zip(moved, value)) else type(value)(moved)
+            if type(value) is dict:
+                moved = {key: move(item) for key, item in value.items()}
+                if any(item is _BLOCK for item in moved.values()):
+                    raise _Unmovable
+                return value if all(moved[key] is item for key, item in value.items()) else moved
+            if isinstance(value, set | frozenset) and any(isinstance(item, Editable | TSNode) for item in value):
+                raise _Unmovable
+            return value
+
+        try:
+            while stack:
+                editable = stack.pop()
+                node = editable.ts_node
+                if index.get_canonical_for_range(node.range, node.kind_id) is editable:
+                    self._canonical.add(id(editable))
+                updates = {}
+                cached = _cached_attributes(type(editable))
+                for name, value in editable.__dict__.items():
+                    if name == "autocommit_cache" or name in cached:
+                        continue
+                    if name in OFFSET_ATTRIBUTES:
+                        updates[name] = value + shift
+                    elif (moved := move(value)) is not value:
+                        updates[name] = moved
+                ret.append((editable, updates))
+        except _Unmovable:
+            return None
+        return ret
+
+    def apply(self, code_block: CodeBlock) -> None:
+        """Moves the kept editables onto the new tree, below the new code block of the file"""
+        file = self.file
+        checkpoint = file.ctx._checkpoint
+        for editable, updates in self._moves:
+            if checkpoint is not None:
+                checkpoint.save_editable(editable)
+            for name, value in updates.items():
+                editable.__dict__[name] = code_block if value is _BLOCK else value
+            # Cached values of the moved editables still describe the old tree
+            for name in _cached_attributes(type(editable)) & editable.__dict__.keys():
+                del editable.__dict__[name]
+            editable.__dict__.pop("_hash", None)
+            editable.autocommit_cache = {}
+        index = file._range_index
+        for editable, _ in self._moves:
+            if file.ctx.config.feature_flags.full_range_index:
+                index.add_to_range(editable)
+            if id(editable) in self._canonical:
+                index.mark_as_canonical(editable)
@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import gc
+import gzip
+import hashlib
+import hmac
+import io
+import logging
+import os
+import pickle
+import secrets
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from git import GitCommandError
+from gitdb.util import hex_to_bin
+from tree_sitter import Node as TSNode
+from tree_sitter import Point, Range
+
+from codegen.sdk.codebase.tree_cache import TSNodeRef, content_digest
+from codegen.sdk.core.interfaces.editable import Editable
+from codegen.sdk.enums import NodeType
+from codegen.sdk.extensions import utils
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable
+
+    from git import Repo as GitCLI
+
+    from codegen.sdk.codebase.codebase_context import CodebaseContext
+    from codegen.sdk.core.node_id_factory import NodeId
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the pickled layout of the graph changes so stale snapshots are ignored
+SNAPSHOT_VERSION = 2
+SNAPSHOT_SUFFIX = ".snapshot"
+MAX_SNAPSHOTS_PER_REPO = 5
+# Snapshots more commits away from HEAD than this are not considered
+MAX_SNAPSHOT_DISTANCE = 10_000
+# Snapshots are signed with a key generated on first use and only readable by its owner
+KEY_FILENAME = ".key"
+KEY_SIZE = 32
+DIGEST_SIZE = hashlib.sha256().digest_size
+# Attributes that are rebuilt after a snapshot is loaded rather than persisted: ts_config is re-assigned by the config
+# parser and _parsed_tree (an unpicklable tree-sitter tree) is re-created by the next sync of the file
+TRANSIENT_ATTRIBUTES = frozenset({"ts_config", "_parsed_tree"})
+# Feature flags that do not change the contents of the graph, so snapshots are shared between their values
+GRAPH_INDEPENDENT_FLAGS = frozenset({"debug", "verify_graph", "track_graph", "sync_enabled", "snapshot_dir", "save_snapshots", "tree_cache_size", "incremental_reparse"})
+
+
+class GraphSnapshot(NamedTuple):
+    """Header of a snapshot: the commit it was taken at and the exact content every file was parsed from.
+
+    Contents are identified by their git blob hash. Only the ones the repository may not have, as they differed from the
+    commit when the snapshot was taken, are stored in full.
+    """
+
+    version: int
+    commit: str
+    generation: int
+    filepath_idx: dict[str, NodeId]
+    # Digest of the content each file was parsed from, by filepath
+    digests: dict[str, str]
+    # Contents that differ from the commit, by digest
+    contents: dict[str, bytes]
+
+    def read(self, git_cli: GitCLI, digest: str) -> bytes | None:
+        """Returns the content with the given digest, or None if neither the snapshot nor the repository has it"""
+        if (content := self.contents.get(digest)) is not None:
+            return content
+        try:
+            return git_cli.odb.stream(hex_to_bin(digest)).read()
+        except (ValueError, GitCommandError):
+            return None
+
+    def changed_files(self, git_cli: GitCLI) -> set[str]:
+        """Returns the files that may differ from the snapshot, without reading the ones git knows are unchanged.
+
+        These are the files git reports as changed since the commit, and the ones that did not match the commit when the
+        snapshot was taken.
+        """
+        committed = _tree_digests(git_cli, self.commit)
+        changed = {filepath for filepath, digest in self.digests.items() if committed.get(filepath) != digest}
+        changed.update(filepath for filepath in git_cli.git.diff("--name-only", "-z", "--no-renames", self.commit).split("\0") if filepath)
+        return changed
+
+
+@cache
+def _is_editable(cls: type) -> bool:
+    return issubclass(cls, Editable)
+
+
+def _context() -> CodebaseContext:
+    """Placeholder for the context the snapshot is loaded into, swapped out by the unpickler"""
+    msg = "Snapshots can only be loaded by a snapshot unpickler"
+    raise pickle.UnpicklingError(msg)
+
+
+def _tree_digests(git_cli: GitCLI, commit: str) -> dict[str, str]:
+    """Returns the blob hash of every file in a commit by filepath, without reading any of them"""
+    ret = {}
+    # -z keeps paths with special characters unquoted. Entries are "<mode> <type> <sha>\t<path>"
+    for entry in git_cli.git.ls_tree("-r", "-z", "--full-tree", commit).split("\0"):
+        if entry:
+            info, filepath = entry.split("\t", 1)
+            _, kind, digest = info.split(" ")
+            if kind == "blob":
+                ret[filepath] = digest
+    return ret
+
+
+def _load_key(root: Path) -> bytes:
+    """Returns the key snapshots under root are signed with, creating it and root on first use.
+
+    Loading a snapshot unpickles it, which runs arbitrary code, so snapshots are only trusted if signed with a key no
+    other user can read or replace.
+    """
+    root.mkdir(mode=0o700, parents=True, exist_ok=True)
+    path = root / KEY_FILENAME
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    else:
+        with os.fdopen(fd, "wb") as f:
+            f.write(secrets.token_bytes(KEY_SIZE))
+    stat = path.stat()
+    if stat.st_mode & 0o077 or (hasattr(os, "getuid") and stat.st_uid != os.getuid()):
+        msg = f"Snapshot key {path} must be owned by and only accessible to the current user"
+        raise PermissionError(msg)
+    key = path.read_bytes()
+    if len(key) != KEY_SIZE:
+        msg = f"Snapshot key {path} is invalid"
+        raise ValueError(msg)
+    return key
+
+
+def _closest_commit(git_cli: GitCLI, commit: str, candidates: Iterable[str]) -> str | None:
+    """Returns the candidate the fewest commits away from commit, walking the history of all of them in one rev-list"""
+    candidates = set(candidates)
+    if commit in candidates:
+        return commit
+    if not candidates:
+        return None
+    try:
+        history = git_cli.git.rev_list("--parents", "--ignore-missing", f"--max-count={MAX_SNAPSHOT_DISTANCE}", commit, *sorted(candidates))
+    except GitCommandError:
+        return None
+    neighbours: dict[str, list[str]] = defaultdict(list)
+    for line in history.splitlines():
+        child, *parents = line.split()
+        for parent in parents:
+            neighbours[child].append(parent)
+            neighbours[parent].append(child)
+    # Breadth-first over parent and child links, so the first candidate found has the fewest commits in between
+    seen = {commit}
+    frontier = deque([commit])
+    while frontier:
+        for neighbour in neighbours[frontier.popleft()]:
+            if neighbour in candidates:
+                return neighbour
+            if neighbour not in seen:
+                seen.add(neighbour)
+                frontier.append(neighbour)
+    return None
+
+
+class _SigningWriter:
+    """Writes through to a file while computing the HMAC of everything written"""
+
+    def __init__(self, file, key: bytes) -> None:
+        self.file = file
+        self.mac = hmac.new(key, digestmod=hashlib.sha256)
+
+    def write(self, data) -> int:
+        self.mac.update(data)
+        return self.file.write(data)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+
+@contextmanager
+def _gc_paused() -> Generator[None, None, None]:
+    """(Un)pickling a graph allocates millions of objects, so skip the cyclic GC passes that would trigger"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class _SnapshotPickler(pickle.Pickler):
+    def __init__(self, file, ctx: CodebaseContext) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.ctx = ctx
+        # Cached properties are derived from the graph, so they are dropped rather than persisted.
+        # Hashing editables while pickling computes new ones, which are tracked and skipped as well.
+        utils.uncache_all()
+
+    def reducer_override(self, obj):
+        cls = type(obj)
+        if _is_editable(cls):
+            # Use type() rather than __class__, as some symbol groups masquerade as builtins
+            attrs = {}
+            for name, value in obj.__dict__.items():
+                if name in TRANSIENT_ATTRIBUTES or utils.is_cached(obj, name):
+                    continue
+                if isinstance(value, TSNode):
+                    # Stored the way compact editables hold them, so the restored ones re-acquire their nodes on access
+                    attrs[f"_{name}_ref"] = TSNodeRef.from_node(value).pack()
+                else:
+                    attrs[name] = value
+            attrs["autocommit_cache"] = {}
+            return object.__new__, (cls,), attrs
+        if obj is self.ctx:
+            return _context, ()
+        if cls is Range:
+            return Range, (obj.start_point, obj.end_point, obj.start_byte, obj.end_byte)
+        if cls is Point:
+            # The default reduce of this tuple subclass can not be unpickled by every py-tree-sitter version
+            return Point, (obj.row, obj.column)
+        return NotImplemented
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, ctx: CodebaseContext) -> None:
+        super().__init__(file)
+        self.ctx = ctx
+
+    def find_class(self, module: str, name: str):
+        if module == __name__ and name == _context.__name__:
+            return lambda: self.ctx
+        return super().find_class(module, name)
+
+
+class GraphSnapshotStore:
+    """On-disk store of built graphs for a single codebase, keyed by commit hash.
+
+    A snapshot holds the pickled graph, its indexes and directory tree, plus the digest of the content every file was
+    parsed from. TSNodes are not picklable, so they are stored as byte ranges. Restored editables re-acquire them on
+    first access, so a file is only parsed again once its nodes are needed.
+    Every snapshot is prefixed with its HMAC, and snapshots with a mismatching HMAC are never unpickled.
+    """
+
+    directory: Path
+    key: bytes
+
+    def __init__(self, root: str | Path, ctx: CodebaseContext) -> None:
+        project = ctx.projects[0]
+        key = "\n".join(
+            [
+                str(SNAPSHOT_VERSION),
+                ctx.repo_path,
+                ctx.programming_language.value,
+                ",".join(project.subdirectories or []),
+                ctx.config.feature_flags.model_dump_json(exclude=set(GRAPH_INDEPENDENT_FLAGS)),
+            ]
+        )
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        root = Path(root).expanduser()
+        self.key = _load_key(root)
+        self.directory = root / f"{ctx.repo_name}-{digest}"
+
+    def path_for(self, commit: str) -> Path:
+        return self.directory / f"{commit}{SNAPSHOT_SUFFIX}"
+
+    def commits(self) -> list[str]:
+        if not self.directory.exists():
+            return []
+        return [path.stem for path in self.directory.glob(f"*{SNAPSHOT_SUFFIX}")]
+
+    def find_closest(self, git_cli: GitCLI, commit: str) -> str | None:
+        """Returns the snapshotted commit with the fewest commits between it and the given commit"""
+        return _closest_commit(git_cli, commit, self.commits())
+
+    def save(self, ctx: CodebaseContext, git_cli: GitCLI, commit: str) -> Path:
+        committed = _tree_digests(git_cli, commit)
+        digests = {}
+        contents = {}
+        for file in ctx.get_nodes(NodeType.FILE):
+            content = file.content_bytes
+            digests[file.file_path] = digest = content_digest(content)
+            if committed.get(file.file_path) != digest:
+                contents[digest] = content
+        header = GraphSnapshot(SNAPSHOT_VERSION, commit, ctx.generation, dict(ctx.filepath_idx), digests, contents)
+        self.directory.mkdir(mode=0o700, exist_ok=True)
+        path = self.path_for(commit)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "wb") as raw:
+                # Reserve room for the HMAC, which is only known once the payload has been written
+                raw.write(bytes(DIGEST_SIZE))
+                signer = _SigningWriter(raw, self.key)
+                with gzip.GzipFile(fileobj=signer, mode="wb", compresslevel=1) as f, _gc_paused():
+                    pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    _SnapshotPickler(f, ctx).dump((ctx._graph, ctx._ext_module_idx, ctx.directories))
+                raw.seek(0)
+                raw.write(signer.mac.digest())
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        # Write to a temporary file first so concurrent sessions never see a partial snapshot
+        tmp_path.replace(path)
+        self.prune()
+        return path
+
+    def load(self, ctx: CodebaseContext, git_cli: GitCLI, commit: str) -> GraphSnapshot:
+        """Restores the snapshot for the given commit into ctx and returns its header.
+
+        No file is read or parsed here. The trees of the files are parsed once their editables first need a node.
+        """
+        data = self.path_for(commit).read_bytes()
+        digest, payload = data[:DIGEST_SIZE], data[DIGEST_SIZE:]
+        if not hmac.compare_digest(digest, hmac.new(self.key, payload, hashlib.sha256).digest()):
+            msg = f"Snapshot for commit {commit} is not signed by this store"
+            raise pickle.UnpicklingError(msg)
+        with gzip.GzipFile(fileobj=io.BytesIO(payload), mode="rb") as f, _gc_paused():
+            header: GraphSnapshot = pickle.load(f)
+            if header.version != SNAPSHOT_VERSION:
+                msg = f"Snapshot version {header.version} does not match {SNAPSHOT_VERSION}"
+                raise pickle.UnpicklingError(msg)
+            graph, ext_module_idx, directories = _SnapshotUnpickler(f, ctx).load()
+        ctx._graph = graph
+        ctx._reset_file_indexes(header.filepath_idx)
+        ctx._ext_module_idx = ext_module_idx
+        ctx._reset_node_indexes()
+        ctx.directories = directories
+        ctx.generation = header.generation
+        for filepath, node_id in header.filepath_idx.items():
+            ctx.tree_cache.register(node_id, ctx.to_absolute(filepath), header.digests[filepath])
+        # Files changed since are parsed again from the content the snapshot was taken from
+        ctx.tree_cache.read_blob = lambda digest: header.read(git_cli, digest)
+        ctx.lazy_nodes = True
+        return header
+
+    def prune(self) -> None:
+        """Removes the oldest snapshots beyond MAX_SNAPSHOTS_PER_REPO"""
+        paths = sorted(self.directory.glob(f"*{SNAPSHOT_SUFFIX}"), key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in paths[MAX_SNAPSHOTS_PER_REPO:]:
+            path.unlink(missing_ok=True)
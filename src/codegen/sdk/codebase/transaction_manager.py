@@ -1,14 +1,19 @@
 import time
-from collections.abc import Callable
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from codegen.sdk.codebase.diff_lite import ChangeType, DiffLite
+from codegen.sdk.codebase.range_index import MAX_PENDING_RATIO, MIN_PENDING, IntervalTree
+from codegen.sdk.codebase.reparse import FileEdits
 from codegen.sdk.codebase.transactions import (
+    ContentBuffer,
     EditTransaction,
     FileAddTransaction,
     FileRemoveTransaction,
     FileRenameTransaction,
+    InsertTransaction,
     RemoveTransaction,
     Transaction,
     TransactionPriority,
@@ -27,6 +32,130 @@ class TransactionError(Exception):
     pass
 
 
+class TransactionIndex:
+    """Index over the queued transactions of a single file.
+
+    Transactions are kept in an interval tree, so overlap and range queries take O(log n + k) no matter how long the
+    queued transactions are. Transactions queued or removed since the tree was built are tracked on the side, until
+    there are enough of them to rebuild it. Results are returned in queue order, the same as a scan over the queue would.
+    """
+
+    queue: list[Transaction]
+
+    def __init__(self, queue: list[Transaction]) -> None:
+        self.queue = queue
+        self._tree: IntervalTree | None = None
+        # Transactions queued since the tree was built, and the ids of the ones in the tree removed since
+        self._pending: list[Transaction] = []
+        self._removed: set[int] = set()
+        self._dedupe_keys: dict[tuple, int] = {}
+        # Relative position of each transaction (by id, as hashing a transaction evaluates its content) in the queue
+        self._positions: dict[int, int] = {}
+        self._next_position = 0
+        self._positions_stale = True
+        for transaction in queue:
+            self._index(transaction)
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def _index(self, transaction: Transaction) -> None:
+        if self._tree is not None:
+            self._pending.append(transaction)
+            self._check_tree()
+        key = transaction.dedupe_key()
+        self._dedupe_keys[key] = self._dedupe_keys.get(key, 0) + 1
+
+    def _unindex(self, transaction: Transaction) -> None:
+        if self._tree is not None:
+            for idx, pending in enumerate(self._pending):
+                if pending is transaction:
+                    del self._pending[idx]
+                    break
+            else:
+                self._removed.add(id(transaction))
+            self._check_tree()
+        key = transaction.dedupe_key()
+        if self._dedupe_keys[key] == 1:
+            del self._dedupe_keys[key]
+        else:
+            self._dedupe_keys[key] -= 1
+        self._positions.pop(id(transaction), None)
+
+    def _check_tree(self) -> None:
+        """Drops the tree once the changes since it was built outweigh it, so the next query rebuilds it"""
+        if len(self._pending) + len(self._removed) > max(MIN_PENDING, len(self._tree) * MAX_PENDING_RATIO):
+            self._tree = None
+            self._pending = []
+            self._removed = set()
+
+    def _matching(self, query: Callable[[IntervalTree], list[Transaction]], predicate: Callable[[Transaction], bool]) -> list[Transaction]:
+        """Returns the queued transactions found by query in the tree, or matching predicate among the pending ones, in queue order"""
+        if self._tree is None:
+            self._tree = IntervalTree(self.queue, spans=[(transaction.start_byte, transaction.end_byte) for transaction in self.queue])
+        ret = query(self._tree)
+        if self._removed:
+            ret = [transaction for transaction in ret if id(transaction) not in self._removed]
+        ret.extend(transaction for transaction in self._pending if predicate(transaction))
+        return self._in_queue_order(ret)
+
+    def contains(self, transaction: Transaction) -> bool:
+        """Whether an equal transaction is already queued"""
+        return transaction.dedupe_key() in self._dedupe_keys
+
+    def append(self, transaction: Transaction) -> None:
+        self.queue.append(transaction)
+        self._index(transaction)
+        if not self._positions_stale:
+            self._positions[id(transaction)] = self._next_position
+            self._next_position += 1
+
+    def insert(self, idx: int, transaction: Transaction) -> None:
+        self.queue.insert(idx, transaction)
+        self._index(transaction)
+        self._positions_stale = True
+
+    def remove(self, transaction: Transaction) -> int:
+        """Removes the given transaction (by identity) and returns the index it had in the queue"""
+        self._update_positions()
+        if (position := self._positions.get(id(transaction))) is not None:
+            # Positions increase along the queue, so the transaction can be found by bisection
+            idx = bisect_left(self.queue, position, key=lambda queued: self._positions[id(queued)])
+            if idx < len(self.queue) and self.queue[idx] is transaction:
+                del self.queue[idx]
+                self._unindex(transaction)
+                return idx
+        msg = f"{transaction} is not queued"
+        raise ValueError(msg)
+
+    def sort(self) -> None:
+        self.queue.sort(key=Transaction._to_sort_key)
+        self._positions_stale = True
+
+    def _update_positions(self) -> None:
+        if self._positions_stale:
+            self._positions = {id(transaction): idx for idx, transaction in enumerate(self.queue)}
+            self._next_position = len(self.queue)
+            self._positions_stale = False
+
+    def _in_queue_order(self, transactions: Iterable[Transaction]) -> list[Transaction]:
+        self._update_positions()
+        return sorted(transactions, key=lambda transaction: self._positions[id(transaction)])
+
+    def overlapping(self, start_byte: int, end_byte: int) -> list[Transaction]:
+        """Returns all transactions that overlap with the given range"""
+        return self._matching(lambda tree: tree.overlapping(start_byte, end_byte), lambda t: t.start_byte < end_byte and t.end_byte > start_byte)
+
+    def containing(self, start_byte: int, end_byte: int) -> Transaction | None:
+        """Returns the first transaction that completely contains the given range"""
+        matches = self._matching(lambda tree: tree.containing(start_byte, end_byte), lambda t: t.start_byte <= start_byte and t.end_byte >= end_byte)
+        return matches[0] if matches else None
+
+    def starting_at(self, start_byte: int) -> list[Transaction]:
+        """Returns all transactions starting at the given byte"""
+        return self._matching(lambda tree: tree.starting_at(start_byte), lambda t: t.start_byte == start_byte)
+
+
 class TransactionManager:
     """Responsible for handling `Transaction` objects - basically an atomic modification of a codebase.
 
@@ -34,30 +163,41 @@ class TransactionManager:
     """
 
     # Unsorted list of transactions, grouped by file
-    # TODO: consider using SortedList for better performance
     queued_transactions: dict[Path, list[Transaction]]
+    # Index over each file's queue, which all changes to the queues go through
+    _indexes: dict[Path, TransactionIndex]
+    _num_transactions: int = 0
     pending_undos: set[Callable[[], None]]
     _commiting: bool = False
     max_transactions: int | None = None  # None = no limit
     stopwatch_start = None
     stopwatch_max_seconds: int | None = None  # None = no limit
+    # Whether to keep the byte edits of each committed file, for re-parsing it incrementally
+    record_edits: bool = False
+    # The byte edits of the last commit to each file, until the file is re-parsed
+    edits: dict[Path, FileEdits]
 
     def __init__(self) -> None:
         self.queued_transactions = dict()
+        self._indexes = dict()
         self.pending_undos = set()
+        self.edits = dict()
 
     def sort_transactions(self) -> None:
-        for file_path, file_transactions in self.queued_transactions.items():
-            file_transactions.sort(key=Transaction._to_sort_key)
+        for index in self._indexes.values():
+            index.sort()
 
     def clear_transactions(self) -> None:
         """Should be called between tests to remove any potential extraneous transactions. Makes sure we reset max_transactions as well."""
         if len(self.queued_transactions) > 0:
             logger.warning("Not all transactions have been committed")
             self.queued_transactions.clear()
+        self._indexes.clear()
+        self._num_transactions = 0
         for undo in self.pending_undos:
             undo()
         self.pending_undos.clear()
+        self.edits.clear()
         self.set_max_transactions(None)
         self.reset_stopwatch()
 
@@ -74,7 +214,7 @@ class TransactionManager:
 
     def get_num_transactions(self) -> int:
         """Returns total number of transactions created to date"""
-        return sum([len(transactions) for transactions in self.queued_transactions.values()])
+        return self._num_transactions
 
     def set_max_transactions(self, max_transactions: int | None = None) -> None:
         self.max_transactions = max_transactions
@@ -83,7 +223,7 @@ class TransactionManager:
         """Util method to check if the max transactions limit has been exceeded."""
         if self.max_transactions is None:
             return False
-        return self.get_num_transactions() >= self.max_transactions
+        return self._num_transactions >= self.max_transactions
 
     ####################################################################################################################
     # Stopwatch
@@ -121,15 +261,17 @@ class TransactionManager:
         file_path = transaction.file_path
         if file_path not in self.queued_transactions:
             self.queued_transactions[file_path] = []
-        file_queue = self.queued_transactions[file_path]
+            self._indexes[file_path] = TransactionIndex(self.queued_transactions[file_path])
+        file_index = self._indexes[file_path]
 
         # Dedupe transactions
-        if dedupe and transaction in file_queue:
+        if dedupe and file_index.contains(transaction):
             logger.debug(f"Transaction already exists in queue: {transaction}")
             return False
         # Solve conflicts
-        if new_transaction := self._resolve_conflicts(transaction, file_queue, solve_conflicts=solve_conflicts):
-            file_queue.append(new_transaction)
+        if new_transaction := self._resolve_conflicts(transaction, file_index, solve_conflicts=solve_conflicts):
+            file_index.append(new_transaction)
+            self._num_transactions += 1
 
         self.check_limits()
         return True
@@ -189,36 +331,73 @@ class TransactionManager:
                     logger.info(f"Committing {len(self.queued_transactions[file])} transactions for {file}")
             for file_path in files:
                 file_transactions = self.queued_transactions.pop(file_path, [])
-                modified = False
-                for transaction in file_transactions:
-                    # Add diff IF the file is a source file
-                    diff = transaction.get_diff()
-                    if diff.change_type == ChangeType.Modified:
-                        if not modified:
-                            modified = True
-                            diffs.append(diff)
-                    else:
-                        diffs.append(diff)
-                    transaction.execute()
+                self._indexes.pop(file_path, None)
+                self._num_transactions -= len(file_transactions)
+                diffs.extend(self._commit_file(file_transactions))
             return diffs
         finally:
             self._commiting = False
 
+    def _commit_file(self, file_transactions: list[Transaction]) -> list[DiffLite]:
+        """Execute the sorted transactions of a single file.
+
+        Content edits are applied to a buffer and the file is written once, rather than rewriting the whole file for
+        every transaction. exec_funcs still run right after their own transaction, in the same order as before.
+        """
+        diffs: list[DiffLite] = []
+        modified = False
+        buffer: ContentBuffer | None = None
+        buffered_file: File | None = None
+        # The edits only describe the new content if it was written in a single pass
+        record_edits = self.record_edits
+        for transaction in file_transactions:
+            if isinstance(transaction, RemoveTransaction | InsertTransaction | EditTransaction):
+                if buffer is None:
+                    # Add diff IF the file is a source file
+                    if not modified:
+                        modified = True
+                        diffs.append(transaction.get_diff())
+                    buffered_file = transaction.file
+                    original = buffered_file.content_bytes
+                    buffer = ContentBuffer(original)
+                transaction.apply(buffer)
+                continue
+            # File operations act on the file on disk, so flush any buffered edits first
+            record_edits = False
+            if buffer is not None:
+                buffered_file.write_bytes(buffer.getvalue())
+                buffer = None
+            diff = transaction.get_diff()
+            if diff.change_type == ChangeType.Modified:
+                if not modified:
+                    modified = True
+                    diffs.append(diff)
+            else:
+                diffs.append(diff)
+            transaction.execute()
+        if buffer is not None:
+            content = buffer.getvalue()
+            buffered_file.write_bytes(content)
+            if record_edits and buffer.edits is not None:
+                self.edits[buffered_file.path] = FileEdits(original, content, buffer.edits)
+        return diffs
+
     ####################################################################################################################
     # Conflict Resolution
     ####################################################################################################################
 
-    def _resolve_conflicts(self, transaction: Transaction, file_queue: list[Transaction], solve_conflicts: bool = True) -> Transaction | None:
+    def _resolve_conflicts(self, transaction: Transaction, file_index: TransactionIndex, solve_conflicts: bool = True) -> Transaction | None:
         def break_down(to_break: EditTransaction) -> bool:
             if new_transactions := to_break.break_down():
                 try:
-                    insert_idx = file_queue.index(to_break)
-                    file_queue.pop(insert_idx)
+                    insert_idx = file_index.remove(to_break)
+                    self._num_transactions -= 1
                 except ValueError:
-                    insert_idx = len(file_queue)
+                    insert_idx = len(file_index)
                 for new_transaction in new_transactions:
-                    if broken_down := self._resolve_conflicts(new_transaction, file_queue, solve_conflicts=solve_conflicts):
-                        file_queue.insert(insert_idx, broken_down)
+                    if broken_down := self._resolve_conflicts(new_transaction, file_index, solve_conflicts=solve_conflicts):
+                        file_index.insert(insert_idx, broken_down)
+                        self._num_transactions += 1
                 return True
             return False
 
@@ -241,7 +420,8 @@ class TransactionManager:
                     # If current transaction is deleted, remove all conflicting transactions
                     if isinstance(transaction, RemoveTransaction):
                         for t in conflicts:
-                            file_queue.remove(t)
+                            file_index.remove(t)
+                            self._num_transactions -= 1
                     # If current transaction is edit, raise an error
                     elif isinstance(transaction, EditTransaction):
                         if break_down(transaction):
@@ -275,32 +455,23 @@ class TransactionManager:
             combined: Return a list of transactions which collectively apply to the given range
         """
         matching_transactions = []
-        if file_path not in self.queued_transactions:
+        if file_path not in self._indexes:
             return matching_transactions
 
-        for t in self.queued_transactions[file_path]:
-            if t.start_byte == start_byte:
-                if t.end_byte == end_byte:
-                    if transaction_order is None or t.transaction_order == transaction_order:
-                        matching_transactions.append(t)
-                elif combined and t.start_byte != t.end_byte:
-                    if other := self.get_transactions_at_range(t.file_path, t.end_byte, end_byte, transaction_order, combined=combined):
-                        return [t, *other]
+        for t in self._indexes[file_path].starting_at(start_byte):
+            if t.end_byte == end_byte:
+                if transaction_order is None or t.transaction_order == transaction_order:
+                    matching_transactions.append(t)
+            elif combined and t.start_byte != t.end_byte:
+                if other := self.get_transactions_at_range(t.file_path, t.end_byte, end_byte, transaction_order, combined=combined):
+                    return [t, *other]
 
         return matching_transactions
 
     def _get_conflicts(self, transaction: Transaction) -> list[Transaction]:
         """Returns all transactions that overlap with the given transaction"""
-        overlapping_transactions = []
-        queued_transactions = list(self.queued_transactions[transaction.file_path])
-        for t in queued_transactions:
-            if transaction.start_byte < t.end_byte and transaction.end_byte > t.start_byte:
-                overlapping_transactions.append(t)
-        return overlapping_transactions
+        return self._indexes[transaction.file_path].overlapping(transaction.start_byte, transaction.end_byte)
 
     def _get_overlapping_conflicts(self, transaction: Transaction) -> Transaction | None:
         """Returns the transaction that completely overlaps with the given transaction"""
-        for t in self.queued_transactions[transaction.file_path]:
-            if transaction.start_byte >= t.start_byte and transaction.end_byte <= t.end_byte:
-                return t
-        return None
+        return self._indexes[transaction.file_path].containing(transaction.start_byte, transaction.end_byte)
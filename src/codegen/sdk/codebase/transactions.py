@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Protocol, runtime_checkable
 
 from codegen.sdk.codebase.diff_lite import ChangeType, DiffLite
+from codegen.sdk.codebase.reparse import TextEdit
 
 if TYPE_CHECKING:
     from codegen.sdk.core.file import File
@@ -28,6 +29,56 @@ class ContentFunc(Protocol):
     def __call__(self) -> str: ...
 
 
+class ContentBuffer:
+    """Buffers byte range replacements to a file's content so a batch of transactions is applied in a single pass.
+
+    Replacements are expected in descending start_byte order, the order transactions are committed in. Everything before
+    the cursor is still the original content, so each replacement only splices the chunks after it instead of copying
+    the whole file.
+    """
+
+    # The replacements in the order they were made, as edits that can be applied one after another to a tree of the
+    # original content. None once a replacement is out of order or overlaps another.
+    edits: list[TextEdit] | None
+
+    def __init__(self, content: bytes) -> None:
+        self._content = content
+        self._cursor = len(content)
+        # Replaced content after the cursor, in reverse order
+        self._chunks: list[bytes] = []
+        self.edits = []
+
+    def replace(self, start_byte: int, end_byte: int, new_bytes: bytes) -> None:
+        """Equivalent to content = content[:start_byte] + new_bytes + content[end_byte:]"""
+        if start_byte > self._cursor:
+            # Out of order replacement, fall back to rebuilding the content
+            content = self.getvalue()
+            self.__init__(content[:start_byte] + new_bytes + content[end_byte:])
+            self.edits = None
+            return
+        if end_byte <= self._cursor:
+            self._chunks.append(self._content[end_byte : self._cursor])
+            if self.edits is not None:
+                self.edits.append(TextEdit(start_byte, end_byte, start_byte + len(new_bytes)))
+        else:
+            # The range reaches into content that has already been replaced
+            self._drop(end_byte - self._cursor)
+            self.edits = None
+        self._chunks.append(new_bytes)
+        self._cursor = start_byte
+
+    def _drop(self, num_bytes: int) -> None:
+        while num_bytes > 0 and self._chunks:
+            chunk = self._chunks.pop()
+            if len(chunk) > num_bytes:
+                self._chunks.append(chunk[num_bytes:])
+                return
+            num_bytes -= len(chunk)
+
+    def getvalue(self) -> bytes:
+        return self._content[: self._cursor] + b"".join(reversed(self._chunks))
+
+
 class Transaction:
     start_byte: int
     end_byte: int
@@ -77,10 +128,22 @@ class Transaction:
     def length(self):
         return self.end_byte - self.start_byte
 
+    def dedupe_key(self) -> tuple:
+        """Hashable key that is equal for transactions that are __eq__ to each other.
+
+        Unlike __hash__, this does not evaluate the new content, so it is safe to compute before the transaction is committed.
+        """
+        return type(self), self.start_byte, self.end_byte, self.file_path, self.priority, self._new_content
+
     def execute(self):
         msg = "Transaction.execute() must be implemented by subclasses"
         raise NotImplementedError(msg)
 
+    def apply(self, buffer: ContentBuffer) -> None:
+        """Applies this transaction to a buffer of the file's content instead of writing the file directly"""
+        msg = f"{type(self).__name__} does not modify file content"
+        raise NotImplementedError(msg)
+
     def get_diff(self) -> DiffLite:
         """Gets the diff produced by this transaction"""
         msg = "Transaction.get_diff() must be implemented by subclasses"
@@ -127,6 +190,11 @@ class RemoveTransaction(Transaction):
         if self.exec_func:
             self.exec_func()
 
+    def apply(self, buffer: ContentBuffer) -> None:
+        buffer.replace(self.start_byte, self.end_byte, b"")
+        if self.exec_func:
+            self.exec_func()
+
     def get_diff(self) -> DiffLite:
         """Gets the diff produced by this transaction"""
         return DiffLite(ChangeType.Modified, self.file_path, old_content=self.file.content_bytes)
@@ -170,6 +238,11 @@ class InsertTransaction(Transaction):
         if self.exec_func:
             self.exec_func()
 
+    def apply(self, buffer: ContentBuffer) -> None:
+        buffer.replace(self.insert_byte, self.insert_byte, bytes(self.new_content, encoding="utf-8"))
+        if self.exec_func:
+            self.exec_func()
+
     def get_diff(self) -> DiffLite:
         """Gets the diff produced by this transaction"""
         return DiffLite(ChangeType.Modified, self.file_path, old_content=self.file.content_bytes)
@@ -205,6 +278,9 @@ class EditTransaction(Transaction):
         """Edits the entirety of this node's source to new_src"""
         self.file.write_bytes(self._generate_new_content_bytes())
 
+    def apply(self, buffer: ContentBuffer) -> None:
+        buffer.replace(self.start_byte, self.end_byte, bytes(self.new_content, "utf-8"))
+
     def get_diff(self) -> DiffLite:
         """Gets the diff produced by this transaction"""
         return DiffLite(ChangeType.Modified, self.file_path, old_content=self.file.content_bytes)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, NamedTuple, Self
+
+from codegen.sdk.tree_sitter_parser import ParsedTree, parse_tree
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from tree_sitter import Node as TSNode
+
+    from codegen.sdk.codebase.codebase_context import CodebaseContext
+    from codegen.sdk.core.interfaces.editable import Editable
+    from codegen.sdk.core.node_id_factory import NodeId
+
+
+class TSNodeRef(NamedTuple):
+    """Stand-in for a TSNode, re-resolved against a parse of the same content"""
+
+    start_byte: int
+    end_byte: int
+    kind_id: int
+
+    @classmethod
+    def from_node(cls, node: TSNode) -> Self:
+        return cls(node.start_byte, node.end_byte, node.kind_id)
+
+    def pack(self) -> int:
+        """Packs the reference into a single int, which takes a fraction of the memory of the tuple or the node"""
+        return self.start_byte | self.end_byte << 32 | self.kind_id << 64
+
+    @classmethod
+    def unpack(cls, packed: int) -> Self:
+        return cls(packed & 0xFFFFFFFF, packed >> 32 & 0xFFFFFFFF, packed >> 64)
+
+
+def content_digest(content: bytes) -> str:
+    """Returns the git blob hash of content, so it can be compared against the files of a commit without reading them"""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content, usedforsecurity=False).hexdigest()
+
+
+def find_ts_node(root: TSNode, ref: TSNodeRef) -> TSNode | None:
+    """Returns the node of root's tree with the given byte range and kind, or None if there is none"""
+    node = root.descendant_for_byte_range(ref.start_byte, ref.end_byte)
+    # The smallest node spanning the range may be a child with the same range, so walk up until the kind matches
+    while node is not None and node.start_byte == ref.start_byte and node.end_byte == ref.end_byte:
+        if node.kind_id == ref.kind_id:
+            return node
+        node = node.parent
+    return None
+
+
+class TreeNotFoundError(Exception):
+    """Raised when a compact editable needs one of its nodes, but the tree of its file can not be parsed again"""
+
+    def __init__(self, editable: Editable, name: str) -> None:
+        super().__init__(
+            f"Can not re-acquire {name} of a compact {type(editable).__name__} (file node {editable.file_node_id}): its file was removed from the graph, "
+            + "or changed since it was parsed and the graph has not been synced yet."
+        )
+
+
+class TreeCache:
+    """Bounded LRU of the parsed trees of files whose editables are compact.
+
+    Compact editables hold TSNodeRefs rather than TSNodes, so only the trees in this cache stay resident. An evicted tree
+    is re-parsed from the file, read through ctx.io. Only a digest of the content each file was parsed from is kept, so a
+    file that has changed since is not re-parsed into different nodes. Instead, the trees of changed files are pinned
+    from the content their diffs recorded while the graph is synced, or re-parsed from read_blob if it has the content.
+
+    Editables restored from a snapshot hold references as well, and re-acquire their trees from here the same way.
+    """
+
+    ctx: CodebaseContext
+    maxsize: int
+    # Reads a content by its digest, for files that changed since they were parsed. Set when the graph is restored from a
+    # snapshot, as the repository has the content of most of its files.
+    read_blob: Callable[[str], bytes | None] | None
+    # The path and content digest of each file, by file node id
+    _sources: dict[NodeId, tuple[Path, str]]
+    _trees: OrderedDict[NodeId, ParsedTree]
+    # Trees of files being synced, which are kept regardless of maxsize until the sync ends
+    _pinned: dict[NodeId, ParsedTree]
+
+    def __init__(self, ctx: CodebaseContext, maxsize: int) -> None:
+        self.ctx = ctx
+        self.maxsize = maxsize
+        self.read_blob = None
+        self._sources = {}
+        self._trees = OrderedDict()
+        self._pinned = {}
+
+    def __len__(self) -> int:
+        return len(self._trees)
+
+    def add(self, file_node_id: NodeId, filepath: Path, parsed: ParsedTree) -> None:
+        self._sources[file_node_id] = (filepath, content_digest(parsed.content))
+        # The file was parsed again, so its pinned tree only belonged to editables that are gone
+        self._pinned.pop(file_node_id, None)
+        self._put(file_node_id, parsed)
+
+    def get(self, file_node_id: NodeId) -> ParsedTree | None:
+        """Returns the parsed tree of a file, re-parsing it if it was evicted.
+
+        Returns None for unknown files, and for files whose content changed since they were parsed.
+        """
+        if (parsed := self._pinned.get(file_node_id)) is not None:
+            return parsed
+        if (parsed := self._trees.get(file_node_id)) is not None:
+            self._trees.move_to_end(file_node_id)
+            return parsed
+        if (source := self._sources.get(file_node_id)) is None:
+            return None
+        filepath, digest = source
+        if not self.ctx.io.file_exists(filepath) or content_digest(content := self.ctx.io.read_bytes(filepath)) != digest:
+            if self.read_blob is None or (content := self.read_blob(digest)) is None:
+                return None
+        parsed = parse_tree(filepath, content.decode("utf-8"))
+        self._put(file_node_id, parsed)
+        return parsed
+
+    def pin(self, file_node_id: NodeId, filepath: Path, content: bytes) -> None:
+        """Keeps the tree of a changed file until unpin, if content is what the file was parsed from"""
+        if file_node_id in self._pinned or (source := self._sources.get(file_node_id)) is None:
+            return
+        if (parsed := self._trees.get(file_node_id)) is None:
+            if content_digest(content) != source[1]:
+                return
+            parsed = parse_tree(filepath, content.decode("utf-8"))
+        self._pinned[file_node_id] = parsed
+
+    def unpin(self) -> None:
+        self._pinned.clear()
+
+    def register(self, file_node_id: NodeId, filepath: Path, digest: str) -> None:
+        """Adds a file by the digest of the content it was parsed from, to be parsed once its tree is first needed"""
+        self._sources[file_node_id] = (filepath, digest)
+
+    def save(self, file_node_id: NodeId) -> tuple[tuple[Path, str], ParsedTree | None] | None:
+        """Returns the source of a file along with its tree, if cached, so they can be restored after the file changes"""
+        if (source := self._sources.get(file_node_id)) is None:
+            return None
+        return source, self._trees.get(file_node_id)
+
+    def restore(self, file_node_id: NodeId, saved: tuple[tuple[Path, str], ParsedTree | None] | None) -> None:
+        """Restores what save returned, or forgets the file if that was None"""
+        self._trees.pop(file_node_id, None)
+        self._pinned.pop(file_node_id, None)
+        if saved is None:
+            self._sources.pop(file_node_id, None)
+            return
+        self._sources[file_node_id], parsed = saved
+        if parsed is not None:
+            self._put(file_node_id, parsed)
+
+    def clear(self) -> None:
+        self.read_blob = None
+        self._sources.clear()
+        self._trees.clear()
+        self._pinned.clear()
+
+    def _put(self, file_node_id: NodeId, parsed: ParsedTree) -> None:
+        self._trees[file_node_id] = parsed
+        self._trees.move_to_end(file_node_id)
+        if len(self._trees) <= self.maxsize:
+            return
+        while len(self._trees) > self.maxsize:
+            self._trees.popitem(last=False)
+        # Editables created since the last compaction may still hold nodes of the evicted trees
+        self.ctx.compact_editables()
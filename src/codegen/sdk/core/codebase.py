@@ -290,9 +290,9 @@ class Codebase(Generic[TSourceFile, TDirectory, TSymbol, TClass, TFunction, TImp
         Returns:
             list[CodeOwners]: A list of CodeOwners objects in the codebase.
         """
-        if self.G.codeowners_parser is None:
+        if self.ctx.codeowners_parser is None:
             return []
-        return CodeOwner.from_parser(self.G.codeowners_parser, lambda *args, **kwargs: self.files(*args, **kwargs))
+        return CodeOwner.from_parser(self.ctx.codeowners_parser, lambda *args, **kwargs: self.files(*args, **kwargs), self.ctx.codeowners_index)
 
     @property
     def directories(self) -> list[TDirectory]:
@@ -596,7 +596,7 @@ class Codebase(Generic[TSourceFile, TDirectory, TSymbol, TClass, TFunction, TImp
         Returns:
             bool: True if a symbol with the given name exists in the codebase, False otherwise.
         """
-        return any([x.name == symbol_name for x in self.symbols])
+        return any(x.is_top_level for x in self.ctx.get_symbols_by_name(symbol_name))
 
     def get_symbol(self, symbol_name: str, optional: bool = False) -> TSymbol | None:
         """Returns a Symbol by name from the codebase.
@@ -639,7 +639,7 @@ class Codebase(Generic[TSourceFile, TDirectory, TSymbol, TClass, TFunction, TImp
         Note:
             When a unique symbol is required, use get_symbol() instead. It will raise ValueError if multiple symbols are found.
         """
-        return sort_editables(x for x in self.symbols if x.name == symbol_name)
+        return sort_editables(x for x in self.ctx.get_symbols_by_name(symbol_name) if x.is_top_level)
 
     def get_class(self, class_name: str, optional: bool = False) -> TClass | None:
         """Returns a class that matches the given name.
@@ -654,7 +654,7 @@ class Codebase(Generic[TSourceFile, TDirectory, TSymbol, TClass, TFunction, TImp
         Raises:
             ValueError: If the class is not found and optional=False, or if multiple classes with the same name exist.
         """
-        matches = [c for c in self.classes if c.name == class_name]
+        matches = [c for c in self.ctx.get_symbols_by_name(class_name, SymbolType.Class) if c.is_top_level]
         if len(matches) == 0:
             if not optional:
                 msg = f"Class {class_name} not found in codebase. Use optional=True to return None instead."
@@ -683,7 +683,7 @@ class Codebase(Generic[TSourceFile, TDirectory, TSymbol, TClass, TFunction, TImp
         Raises:
             ValueError: If function is not found and optional=False, or if multiple matching functions exist.
         """
-        matches = [f for f in self.functions if f.name == function_name]
+        matches = [f for f in self.ctx.get_symbols_by_name(function_name, SymbolType.Function) if f.is_top_level]
         if len(matches) == 0:
             if not optional:
                 msg = f"Function {function_name} not found in codebase. Use optional=True to return None instead."
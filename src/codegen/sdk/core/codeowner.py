@@ -1,6 +1,6 @@
 import logging
 from collections.abc import Iterable, Iterator
-from typing import Callable, Generic, Literal
+from typing import TYPE_CHECKING, Callable, Generic, Literal
 
 from codeowners import CodeOwners as CodeOwnersParser
 
@@ -17,8 +17,12 @@ from codegen.sdk.core.interfaces.has_symbols import (
     TSymbol,
 )
 from codegen.sdk.core.utils.cache_utils import cached_generator
+from codegen.sdk.extensions.sort import sort_editables
 from codegen.shared.decorators.docs import apidoc, noapidoc
 
+if TYPE_CHECKING:
+    from codegen.sdk.codebase.codeowners_index import CodeOwnersIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,28 +44,33 @@ class CodeOwner(
     owner_type: Literal["USERNAME", "TEAM", "EMAIL"]
     owner_value: str
     files_source: Callable[FilesParam, Iterable[TFile]]
+    index: "CodeOwnersIndex | None"
 
     def __init__(
         self,
         files_source: Callable[FilesParam, Iterable[TFile]],
         owner_type: Literal["USERNAME", "TEAM", "EMAIL"],
         owner_value: str,
+        index: "CodeOwnersIndex | None" = None,
     ):
         self.owner_type = owner_type
         self.owner_value = owner_value
         self.files_source = files_source
+        self.index = index
 
     @classmethod
     def from_parser(
         cls,
         parser: CodeOwnersParser,
         file_source: Callable[FilesParam, Iterable[TFile]],
+        index: "CodeOwnersIndex | None" = None,
     ) -> list["CodeOwner"]:
         """Create a list of CodeOwner objects from a CodeOwnersParser.
 
         Args:
             parser (CodeOwnersParser): The CodeOwnersParser to use.
             file_source (Callable[FilesParam, Iterable[TFile]]): A callable that returns an iterable of all files in the codebase.
+            index (CodeOwnersIndex | None): The index of the owned files in the graph, used to list source files without scanning all files.
 
         Returns:
             list[CodeOwner]: A list of CodeOwner objects.
@@ -69,12 +78,16 @@ class CodeOwner(
         codeowners = []
         for _, _, owners, _, _ in parser.paths:
             for owner_label, owner_value in owners:
-                codeowners.append(CodeOwner(file_source, owner_label, owner_value))
+                codeowners.append(CodeOwner(file_source, owner_label, owner_value, index))
         return codeowners
 
     @cached_generator(maxsize=16)
     @noapidoc
     def files_generator(self, *args: FilesParam.args, **kwargs: FilesParam.kwargs) -> Iterable[TFile]:
+        if self.index is not None and not args and kwargs.get("extensions") is None:
+            # Source files in the graph are listed from the index, in the same alphabetical order as the files source
+            yield from sort_editables((self.index.ctx.get_node(node_id) for node_id in self.index.file_node_ids(self.owner_value)), alphabetical=True, dedupe=False)
+            return
         for source_file in self.files_source(*args, **kwargs):
             # Filter files by owner value
             if self.owner_value in source_file.owners:
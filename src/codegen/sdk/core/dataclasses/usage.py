@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING
 
 from dataclasses_json import dataclass_json
 
-from codegen.shared.decorators.docs import apidoc
+from codegen.shared.decorators.docs import apidoc, noapidoc
 
 if TYPE_CHECKING:
     from codegen.sdk.core.detached_symbols.function_call import FunctionCall
@@ -38,6 +38,12 @@ class Usage:
     usage_type: UsageType
     kind: UsageKind
 
+    @property
+    @noapidoc
+    def start_byte(self) -> int:
+        """Where the usage is in its file, which usages are ordered by"""
+        return self.match.ts_node.start_byte if self.match else self.usage_symbol.ts_node.start_byte
+
 
 @unique
 @apidoc
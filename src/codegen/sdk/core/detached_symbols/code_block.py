@@ -15,10 +15,11 @@ from codegen.sdk.extensions.utils import find_line_start_and_end_nodes
 from codegen.shared.decorators.docs import apidoc, noapidoc
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Generator, Mapping
 
     from tree_sitter import Node as TSNode
 
+    from codegen.sdk.codebase.tree_cache import TSNodeRef
     from codegen.sdk.core.assignment import Assignment
     from codegen.sdk.core.detached_symbols.function_call import FunctionCall
     from codegen.sdk.core.interfaces.editable import Editable
@@ -62,13 +63,16 @@ class CodeBlock(Expression[Parent], Generic[Parent, TAssignment]):
         # self.parse()
 
     @noapidoc
-    def parse(self) -> None:
-        self._statements = self._parse_statements()
+    def parse(self, reused: Mapping[TSNodeRef, Statement] | None = None) -> None:
+        self._statements = self._parse_statements(reused)
 
     @abstractmethod
     @noapidoc
-    def _parse_statements(self) -> MultiLineCollection[Statement, Self]:
-        """Parses top level statements in the code block."""
+    def _parse_statements(self, reused: Mapping[TSNodeRef, Statement] | None = None) -> MultiLineCollection[Statement, Self]:
+        """Parses top level statements in the code block.
+
+        Statements in reused are taken as they are, instead of being parsed from the node they are keyed by.
+        """
 
     @property
     @reader
@@ -40,12 +40,15 @@ class Directory(
     dirpath: str  # Relative Path
     parent: Self | None
     items: dict[str, TFile | Self]
+    # Recursive list of files, cached until an item is added or removed anywhere below this directory
+    _files: list[TFile] | None = None
 
     def __init__(self, path: Path, dirpath: str, parent: Self | None):
         self.path = path
         self.dirpath = dirpath
         self.parent = parent
         self.items = {}
+        self._files = None
 
     def __iter__(self):
         return iter(self.items.values())
@@ -63,10 +66,14 @@ class Directory(
         return self.items[item_name]
 
     def __setitem__(self, item_name: str, item: TFile | Self) -> None:
+        if isinstance(item, Directory):
+            item.parent = self
         self.items[item_name] = item
+        self._invalidate_files()
 
     def __delitem__(self, item_name: str) -> None:
         del self.items[item_name]
+        self._invalidate_files()
         msg = f"Item {item_name} not found in directory {self.dirpath}"
         raise KeyError(msg)
 
@@ -87,17 +94,32 @@ class Directory(
     @property
     def files(self) -> list[TFile]:
         """Get a recursive list of all files in the directory and its subdirectories."""
-        files = []
+        return list(self._get_files())
 
-        def _get_files(directory: Directory):
-            for item in directory.items.values():
+    @property
+    def file_count(self) -> int:
+        """Get the number of files in the directory and its subdirectories."""
+        return len(self._get_files())
+
+    @noapidoc
+    def _get_files(self) -> list[TFile]:
+        if self._files is None:
+            files = []
+            for item in self.items.values():
                 if isinstance(item, Directory):
-                    _get_files(item)
+                    files.extend(item._get_files())
                 else:
                     files.append(item)
+            self._files = files
+        return self._files
 
-        _get_files(self)
-        return files
+    @noapidoc
+    def _invalidate_files(self) -> None:
+        """Drops the cached file lists of this directory and its parents"""
+        directory = self
+        while directory is not None:
+            directory._files = None
+            directory = directory.parent
 
     @property
     def subdirectories(self) -> list[Self]:
@@ -124,16 +146,19 @@ class Directory(
         """Add a file to the directory."""
         rel_path = os.path.relpath(file.file_path, self.dirpath)
         self.items[rel_path] = file
+        self._invalidate_files()
 
     def remove_file(self, file: TFile) -> None:
         """Remove a file from the directory."""
         rel_path = os.path.relpath(file.file_path, self.dirpath)
         del self.items[rel_path]
+        self._invalidate_files()
 
     def remove_file_by_path(self, file_path: os.PathLike) -> None:
         """Remove a file from the directory by its path."""
         rel_path = str(Path(file_path).relative_to(self.dirpath))
         del self.items[rel_path]
+        self._invalidate_files()
 
     def get_file(self, filename: str, ignore_case: bool = False) -> TFile | None:
         """Get a file by its name relative to the directory."""
@@ -149,17 +174,21 @@ class Directory(
     def add_subdirectory(self, subdirectory: Self) -> None:
         """Add a subdirectory to the directory."""
         rel_path = os.path.relpath(subdirectory.dirpath, self.dirpath)
+        subdirectory.parent = self
         self.items[rel_path] = subdirectory
+        self._invalidate_files()
 
     def remove_subdirectory(self, subdirectory: Self) -> None:
         """Remove a subdirectory from the directory."""
         rel_path = os.path.relpath(subdirectory.dirpath, self.dirpath)
         del self.items[rel_path]
+        self._invalidate_files()
 
     def remove_subdirectory_by_path(self, subdirectory_path: str) -> None:
         """Remove a subdirectory from the directory by its path."""
         rel_path = os.path.relpath(subdirectory_path, self.dirpath)
         del self.items[rel_path]
+        self._invalidate_files()
 
     def get_subdirectory(self, subdirectory_name: str) -> Self | None:
         """Get a subdirectory by its name (relative to the directory)."""
@@ -16,6 +16,7 @@ from typing_extensions import deprecated
 from codegen.sdk._proxy import proxy_property
 from codegen.sdk.codebase.codebase_context import CodebaseContext
 from codegen.sdk.codebase.range_index import RangeIndex
+from codegen.sdk.codebase.reparse import IncrementalReparse
 from codegen.sdk.codebase.span import Range
 from codegen.sdk.core.autocommit import commiter, mover, reader, remover, writer
 from codegen.sdk.core.class_definition import Class
@@ -32,7 +33,7 @@ from codegen.sdk.core.symbol import Symbol
 from codegen.sdk.enums import EdgeType, ImportType, NodeType, SymbolType
 from codegen.sdk.extensions.sort import sort_editables
 from codegen.sdk.topological_sort import pseudo_topological_sort
-from codegen.sdk.tree_sitter_parser import get_parser_by_filepath_or_extension, parse_file
+from codegen.sdk.tree_sitter_parser import ParsedTree, get_parser_by_filepath_or_extension, parse_file, parse_tree
 from codegen.sdk.typescript.function import TSFunction
 from codegen.shared.decorators.docs import apidoc, noapidoc
 from codegen.visualizations.enums import VizNode
@@ -213,10 +214,8 @@ class File(Editable[None]):
         Returns:
             set[str]: A set of Github usernames or team names that own this file. Empty if no CODEOWNERS file exists.
         """
-        if self.ctx.codeowners_parser:
-            # return get_filepath_owners(codeowners=self.ctx.codeowners_parser, filepath=self.file_path)
-            filename_owners = self.ctx.codeowners_parser.of(self.file_path)
-            return {owner[1] for owner in filename_owners}
+        if self.ctx.codeowners_index is not None:
+            return self.ctx.codeowners_index.owners(self.file_path)
         return set()
 
     @cached_property
@@ -426,13 +425,16 @@ class SourceFile(
 
     code_block: TCodeBlock
     _nodes: list[Importable]
+    # The tree ts_node belongs to and the content it was parsed from. Only set with compact editables, until the file
+    # hands it over to the tree cache, or with incremental reparsing.
+    _parsed_tree: ParsedTree | None = None
 
     def __init__(self, ts_node: TSNode, filepath: PathLike, ctx: CodebaseContext) -> None:
         self.node_id = ctx.add_node(self)
         self._nodes = []
         super().__init__(filepath, ctx, ts_node=ts_node)
         self._nodes.clear()
-        self.ctx.filepath_idx[self.file_path] = self.node_id
+        self.ctx.index_file(self.file_path, self.node_id)
         self._directory = None
         self._pending_imports = set()
         try:
@@ -453,12 +455,14 @@ class SourceFile(
 
     @noapidoc
     @commiter
-    def parse(self, ctx: CodebaseContext) -> None:
+    def parse(self, ctx: CodebaseContext, reparse: IncrementalReparse | None = None) -> None:
         self.__dict__.pop("_source", None)
         # Add self to the graph
         self.code_block = self._parse_code_block(self.ts_node)
 
-        self.code_block.parse()
+        if reparse is not None:
+            reparse.apply(self.code_block)
+        self.code_block.parse(reparse.statements if reparse is not None else None)
         self._parse_imports()
         # We need to clear the valid symbol/import names before we start resolving exports since these can be outdated.
         self.invalidate()
@@ -487,9 +491,11 @@ class SourceFile(
 
     @noapidoc
     @commiter
-    def unparse(self, reparse: bool = False) -> list[Importable]:
+    def unparse(self, reparse: bool = False, keep: Sequence[Importable] = ()) -> list[Importable]:
         """Removes all its direct nodes and edges for each of its internal symbols and imports.
 
+        Nodes in keep stay on the graph, for an incremental reparse to move them onto the new tree.
+
         Returns a list of external import node ids that need to be re-resolved
         """
         external_edges_to_resolve = []
@@ -509,30 +515,38 @@ class SourceFile(
             external_edges_to_resolve.extend(self.ctx.predecessors(node_id))
 
         # Finally, remove the nodes
+        node_ids_to_remove.difference_update(node.node_id for node in keep)
         for node_id in node_ids_to_remove:
             if reparse and node_id == self.node_id:
                 continue
             if self.ctx.has_node(node_id):
                 self.ctx.remove_node(node_id)
         if not reparse:
-            self.ctx.filepath_idx.pop(self.file_path, None)
-        self._nodes.clear()
+            self.ctx.unindex_file(self.file_path)
+            self.ctx.tree_cache.restore(self.node_id, None)
+        self._nodes[:] = keep
         return list(filter(lambda node: self.ctx.has_node(node.node_id) and node is not None, external_edges_to_resolve))
 
     @noapidoc
     @commiter
-    def sync_with_file_content(self) -> None:
-        """Re-parses parent file and re-sets current TSNode."""
+    def sync_with_file_content(self, reparse: IncrementalReparse | None = None) -> None:
+        """Re-parses parent file and re-sets current TSNode.
+
+        If an incremental reparse is given, the new tree is the one it parsed, and the statements it kept are not parsed again.
+        """
         self._pending_imports.clear()
-        self.ts_node = parse_file(self.filepath, self.content)
+        parsed = reparse.parsed if reparse is not None else parse_tree(self.filepath, self.content)
+        self.ts_node = parsed.tree.root_node
+        if self.ctx.config.feature_flags.compact_editables or self.ctx.config.feature_flags.incremental_reparse:
+            self._parsed_tree = parsed
         if self.node_id is None:
-            self.ctx.filepath_idx[self.file_path] = self.node_id
+            self.ctx.index_file(self.file_path, self.node_id)
             self.file_node_id = self.node_id
         else:
             assert self.ctx.has_node(self.node_id)
         self.name = self.path.stem
         self._range_index.clear()
-        self.parse(self.ctx)
+        self.parse(self.ctx, reparse)
 
     @staticmethod
     @noapidoc
@@ -568,10 +582,14 @@ class SourceFile(
 
     @classmethod
     @noapidoc
-    def from_content(cls, filepath: str | PathLike | Path, content: str, ctx: CodebaseContext, sync: bool = True, verify_syntax: bool = True) -> Self | None:
-        """Creates a new file from content and adds it to the graph."""
+    def from_content(cls, filepath: str | PathLike | Path, content: str, ctx: CodebaseContext, sync: bool = True, verify_syntax: bool = True, ts_node: TSNode | None = None) -> Self | None:
+        """Creates a new file from content and adds it to the graph.
+
+        If `ts_node` is given, it must be the tree-sitter root node already parsed from `content`.
+        """
         path = ctx.to_absolute(filepath)
-        ts_node = parse_file(path, content)
+        if ts_node is None:
+            ts_node = parse_file(path, content)
         if ts_node.has_error and verify_syntax:
             logger.info("Failed to parse file %s", filepath)
             return None
@@ -662,7 +680,7 @@ class SourceFile(
             list[TImport]: List of Import objects that import this file as a module,
                 sorted by file location.
         """
-        imps = [x for x in self.ctx.in_edges(self.node_id) if x[2].type == EdgeType.IMPORT_SYMBOL_RESOLUTION]
+        imps = self.ctx.in_edges(self.node_id, edge_type=EdgeType.IMPORT_SYMBOL_RESOLUTION)
         return sort_editables((self.ctx.get_node(x[0]) for x in imps), by_file=True, dedupe=False)
 
     @property
@@ -1157,9 +1175,9 @@ class SourceFile(
             range (Range): The byte range to search within the file.
 
         Returns:
-            list[Editable]: A list of all Editable objects that overlap with the given range.
+            list[Editable]: A list of all Editable objects that overlap with the given range, ordered by start byte.
         """
-        return self._range_index.get_all_for_range(range)
+        return self._range_index.get_overlapping(range.start_byte, range.end_byte)
 
     @property
     @noapidoc
@@ -8,9 +8,11 @@ from typing import TYPE_CHECKING, Generic, Self, TypeVar, Unpack, final, overloa
 
 from rich.markup import escape
 from rich.pretty import Pretty
+from tree_sitter import Node as TSNode
 
 from codegen.sdk.codebase.span import Span
 from codegen.sdk.codebase.transactions import EditTransaction, InsertTransaction, RemoveTransaction, TransactionPriority
+from codegen.sdk.codebase.tree_cache import TreeNotFoundError, TSNodeRef, find_ts_node
 from codegen.sdk.core.autocommit import commiter, reader, remover, repr_func, writer
 from codegen.sdk.core.placeholder.placeholder import Placeholder
 from codegen.sdk.extensions.utils import get_all_identifiers
@@ -26,7 +28,6 @@ if TYPE_CHECKING:
 
     import rich.repr
     from rich.console import Console, ConsoleOptions, RenderResult
-    from tree_sitter import Node as TSNode
     from tree_sitter import Point, Range
 
     from codegen.sdk.codebase.codebase_context import CodebaseContext
@@ -124,6 +125,8 @@ class Editable(JSONable, Generic[Parent]):
         self.file_node_id = file_node_id
         self.ctx = ctx
         self.parent = parent
+        if ctx.config.feature_flags.compact_editables:
+            ctx.uncompacted_editables.append(self)
         if ctx.config.feature_flags.debug:
             seen = set()
             while parent is not None:
@@ -133,6 +136,45 @@ class Editable(JSONable, Generic[Parent]):
         if self.file and self.ctx.config.feature_flags.full_range_index:
             self._add_to_index
 
+    def __getattr__(self, name: str):
+        """Re-acquires the nodes that compact editables, and editables restored from a snapshot, hold references to.
+
+        Only reached when regular lookup fails.
+        """
+        ctx = self.__dict__.get("ctx")
+        ref = self.__dict__.get(f"_{name}_ref") if ctx is not None and ctx.lazy_nodes else None
+        if ref is None:
+            msg = f"{type(self).__name__!r} object has no attribute {name!r}"
+            raise AttributeError(msg)
+        if ctx.config.feature_flags.compact_editables or (file := ctx.get_node(self.file_node_id)) is self:
+            if (parsed := ctx.tree_cache.get(self.file_node_id)) is None:
+                raise TreeNotFoundError(self, name)
+            root = parsed.tree.root_node
+        else:
+            root = file.ts_node
+        node = find_ts_node(root, TSNodeRef.unpack(ref))
+        if not ctx.config.feature_flags.compact_editables:
+            # Restored editables keep the node once re-acquired, and the root node of their file keeps its tree, as if
+            # the graph had been built
+            self.__dict__[name] = node
+            del self.__dict__[f"_{name}_ref"]
+        return node
+
+    @noapidoc
+    def _compact(self, root: TSNode) -> None:
+        """Replaces the TSNodes this editable holds from root's tree with references, so it no longer pins the tree.
+
+        Each reference is packed into an int under its own attribute, as a dict of TSNodeRefs per editable would take more
+        memory than the trees it releases.
+        """
+        for name, value in list(self.__dict__.items()):
+            if isinstance(value, TSNode):
+                ref = TSNodeRef.from_node(value)
+                # Editables can also hold nodes parsed from other content, which can not be re-acquired from the file
+                if find_ts_node(root, ref) == value:
+                    self.__dict__[f"_{name}_ref"] = ref.pack()
+                    del self.__dict__[name]
+
     def __hash__(self):
         if self._hash is None:
             self._hash = hash((self.filepath, self.range, self.ts_node.kind_id))
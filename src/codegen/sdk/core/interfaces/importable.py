@@ -58,23 +58,8 @@ class Importable(Expression[Parent], HasName, Generic[Parent]):
         Note:
             This method can be called as both a property or a method. If used as a property, it is equivalent to invoking it without arguments.
         """
-        # Get direct dependencies for this symbol and its descendants
-        avoid = set(self.descendant_symbols)
-        deps = []
-        for symbol in self.descendant_symbols:
-            deps.extend(filter(lambda x: x not in avoid, symbol._get_dependencies(usage_types)))
-
-        if max_depth is not None and max_depth > 1:
-            # For max_depth > 1, recursively collect dependencies
-            seen = set(deps)
-            for dep in list(deps):  # Create a copy of deps to iterate over
-                if isinstance(dep, Importable):
-                    next_deps = dep.dependencies(usage_types=usage_types, max_depth=max_depth - 1)
-                    for next_dep in next_deps:
-                        if next_dep not in seen:
-                            seen.add(next_dep)
-                            deps.append(next_dep)
-
+        max_depth = max_depth if max_depth is not None and max_depth > 1 else 1
+        deps = self.ctx.transitive_successors(self.node_id, usage_types=usage_types, max_depth=max_depth, symbols=True)
         return sort_editables(deps, by_file=True)
 
     @reader(cache=False)
@@ -85,7 +70,7 @@ class Importable(Expression[Parent], HasName, Generic[Parent]):
         Opposite of `usages`
         """
         # TODO: sort out attribute usages in dependencies
-        edges = [x for x in self.ctx.out_edges(self.node_id) if x[2].type == EdgeType.SYMBOL_USAGE]
+        edges = self.ctx.out_edges(self.node_id, edge_type=EdgeType.SYMBOL_USAGE)
         unique_dependencies = []
         for edge in edges:
             if edge[2].usage.usage_type is None or edge[2].usage.usage_type in usage_types:
@@ -24,11 +24,13 @@ class Usable(Importable[Parent], Generic[Parent]):
 
     @proxy_property
     @reader(cache=False)
-    def symbol_usages(self, usage_types: UsageType | None = None) -> list[Import | Symbol | Export]:
+    def symbol_usages(self, usage_types: UsageType | None = None, max_depth: int | None = None) -> list[Import | Symbol | Export]:
         """Returns a list of symbols that use or import the exportable object.
 
         Args:
             usage_types (UsageType | None): The types of usages to search for. Defaults to any.
+            max_depth (int | None): Maximum depth to traverse in the usage graph. If provided, will also collect the symbols
+                using those symbols, up to this depth. Defaults to None (only direct usages).
 
         Returns:
             list[Import | Symbol | Export]: A list of symbols that use or import the exportable object.
@@ -36,10 +38,8 @@ class Usable(Importable[Parent], Generic[Parent]):
         Note:
             This method can be called as both a property or a method. If used as a property, it is equivalent to invoking it without arguments.
         """
-        symbol_usages = []
-        for usage in self.usages(usage_types=usage_types):
-            symbol_usages.append(usage.usage_symbol.parent_symbol)
-        return list(dict.fromkeys(symbol_usages))
+        max_depth = max_depth if max_depth is not None and max_depth > 1 else 1
+        return self.ctx.transitive_predecessors(self.node_id, usage_types=usage_types, max_depth=max_depth, symbols=True)
 
     @proxy_property
     @reader(cache=False)
@@ -66,14 +66,11 @@ class Usable(Importable[Parent], Generic[Parent]):
 
         assert self.node_id is not None
         usages_to_return = []
-        in_edges = self.ctx.in_edges(self.node_id)
-        for edge in in_edges:
-            meta_data = edge[2]
-            if meta_data.type == EdgeType.SYMBOL_USAGE:
-                usage = meta_data.usage
-                if usage_types is None or usage.usage_type in usage_types:
-                    usages_to_return.append(usage)
-        return sorted(dict.fromkeys(usages_to_return), key=lambda x: x.match.ts_node.start_byte if x.match else x.usage_symbol.ts_node.start_byte, reverse=True)
+        for _, _, edge in self.ctx.in_edges(self.node_id, edge_type=EdgeType.SYMBOL_USAGE):
+            usage = edge.usage
+            if usage_types is None or usage.usage_type in usage_types:
+                usages_to_return.append(usage)
+        return sorted(dict.fromkeys(usages_to_return), key=lambda x: x.start_byte, reverse=True)
 
     def rename(self, new_name: str, priority: int = 0) -> tuple[NodeId, NodeId]:
         """Renames a symbol and updates all its references in the codebase.
@@ -5,12 +5,15 @@ from typing import TYPE_CHECKING, Generic, Protocol, Self, TypeVar
 
 from rich.console import Console
 
+from codegen.sdk.codebase.tree_cache import TSNodeRef
 from codegen.sdk.core.expressions.placeholder_type import PlaceholderType
 from codegen.sdk.core.expressions.value import Value
 from codegen.sdk.core.statements.symbol_statement import SymbolStatement
 from codegen.sdk.utils import find_first_function_descendant
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     from tree_sitter import Node as TSNode
 
     from codegen.sdk.codebase.codebase_context import CodebaseContext
@@ -96,7 +99,7 @@ class Parser(Generic[Expression]):
 
         return PlaceholderType(node, file_node_id, ctx, parent)
 
-    def parse_ts_statements(self, node: TSNode, file_node_id: NodeId, ctx: CodebaseContext, parent: TSCodeBlock) -> list[Statement]:
+    def parse_ts_statements(self, node: TSNode, file_node_id: NodeId, ctx: CodebaseContext, parent: TSCodeBlock, reused: Mapping[TSNodeRef, Statement] | None = None) -> list[Statement]:
         from codegen.sdk.core.statements.export_statement import ExportStatement
         from codegen.sdk.core.statements.expression_statement import ExpressionStatement
         from codegen.sdk.core.statements.return_statement import ReturnStatement
@@ -118,8 +121,13 @@ class Parser(Generic[Expression]):
         if node.type in self.expressions or node.type == "expression_statement":
             return [ExpressionStatement(node, file_node_id, ctx, parent, 0, expression_node=node)]
         for child in node.named_children:
+            # =====[ Kept by an incremental reparse ]=====
+            if reused and (statement := reused.get(TSNodeRef.from_node(child))) is not None:
+                statement._pos = len(statements)
+                statements.append(statement)
+
             # =====[ Functions + Methods ]=====
-            if child.type in _VALID_TYPE_NAMES:
+            elif child.type in _VALID_TYPE_NAMES:
                 statements.append(SymbolStatement(child, file_node_id, ctx, parent, len(statements)))
 
             # =====[ Classes ]=====
@@ -193,7 +201,7 @@ class Parser(Generic[Expression]):
 
         return statements
 
-    def parse_py_statements(self, node: TSNode, file_node_id: NodeId, ctx: CodebaseContext, parent: PyCodeBlock) -> list[Statement]:
+    def parse_py_statements(self, node: TSNode, file_node_id: NodeId, ctx: CodebaseContext, parent: PyCodeBlock, reused: Mapping[TSNodeRef, Statement] | None = None) -> list[Statement]:
         from codegen.sdk.core.statements.expression_statement import ExpressionStatement
         from codegen.sdk.core.statements.raise_statement import RaiseStatement
         from codegen.sdk.core.statements.return_statement import ReturnStatement
@@ -223,8 +231,13 @@ class Parser(Generic[Expression]):
             statements.append(PyComment.from_code_block(comment, parent, pos=len(statements)))
 
         for child in node.named_children:
+            # =====[ Kept by an incremental reparse ]=====
+            if reused and (statement := reused.get(TSNodeRef.from_node(child))) is not None:
+                statement._pos = len(statements)
+                statements.append(statement)
+
             # =====[ Decorated definitions ]=====
-            if child.type == "decorated_definition":
+            elif child.type == "decorated_definition":
                 statements.append(SymbolStatement(child, file_node_id, ctx, parent, len(statements)))
 
             # =====[ Functions ]=====
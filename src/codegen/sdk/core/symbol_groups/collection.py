@@ -40,7 +40,7 @@ class Collection(SymbolGroup[Child, Parent], MutableSequence[Child], Generic[Chi
         super().__init__(file_node_id, ctx, parent, node)
         self._delimiter = delimiter
         self._reversed = set()
-        self._inserts = defaultdict(lambda: 0)
+        self._inserts = defaultdict(int)
         self._container_start_byte = self.ts_node.start_byte
         self._container_end_byte = self.ts_node.end_byte
         self._bracket_size = bracket_size
@@ -43,7 +43,7 @@ class MultiLineCollection(Collection[Child, Parent], Generic[Child, Parent]):
         end_byte: int | None = None,
     ) -> None:
         super().__init__(node, file_node_id, ctx, parent, trailing_delimiter, children=children, bracket_size=0)
-        self._inserts_max_size = defaultdict(lambda: 0)
+        self._inserts_max_size = defaultdict(int)
         self._leading_delimiter = leading_delimiter
         self._trailing_delimiter = trailing_delimiter
         self._indent = indent_size
@@ -1,6 +1,7 @@
 from collections.abc import Generator, Iterable
 from functools import cached_property as functools_cached_property
 from functools import lru_cache as functools_lru_cache
+from weakref import WeakValueDictionary
 
 from tree_sitter import Node as TSNode
 
@@ -19,8 +20,20 @@ def find_line_start_and_end_nodes(node: TSNode) -> list[tuple[TSNode, TSNode]]:
 
 def find_first_descendant(node: TSNode, type_names: list[str], max_depth: int | None = None) -> TSNode | None: ...
 
+# Instances holding cached_property values, by the node id of the file they belong to (None if outside of any file), then by id
+to_uncache: dict[int | None, WeakValueDictionary[int, object]]
+
 cached_property = functools_cached_property
 lru_cache = functools_lru_cache
 
+def is_cached(instance: object, name: str) -> bool:
+    """Whether the attribute of the instance holds a tracked cached_property value"""
+
+def uncache_files(file_node_ids: Iterable[int]) -> None:
+    """Clears the cached_property values of instances belonging to the given files"""
+
+def uncache_unowned() -> None:
+    """Clears the cached_property values of instances outside of any file, such as directories, and every lru_cache"""
+
 def uncache_all(): ...
 def is_descendant_of(node: TSNode, possible_parent: TSNode) -> bool: ...
@@ -2,6 +2,7 @@ from collections import Counter
 from collections.abc import Generator, Iterable
 from functools import cached_property as functools_cached_property
 from functools import lru_cache as functools_lru_cache
+from weakref import WeakValueDictionary
 
 from tabulate import tabulate
 from tree_sitter import Node as TSNode
@@ -106,16 +107,37 @@ def find_first_descendant(node: TSNode, type_names: list[str], max_depth: int |
     return find(node)
 
 
-to_uncache = []
+# Instances holding cached_property values, keyed by the node id of the file they belong to (None for instances outside
+# of any file), then by id. Instances are only weakly referenced, so tracking them never keeps a dropped node alive, and
+# buckets are dropped once uncached.
+to_uncache = {}
 lru_caches = []
 counter = Counter()
+# Names of the tracked cached properties of each class
+_cached_names = {}
+
+
+def _get_cached_names(cls):
+    names = _cached_names.get(cls)
+    if names is None:
+        names = _cached_names[cls] = frozenset(value.attrname for klass in cls.__mro__ for value in vars(klass).values() if isinstance(value, cached_property))
+    return names
+
+
+def _track(instance):
+    file_node_id = instance.__dict__.get("file_node_id")
+    bucket = to_uncache.get(file_node_id)
+    if bucket is None:
+        bucket = to_uncache[file_node_id] = WeakValueDictionary()
+    if bucket.get(id(instance)) is not instance:
+        bucket[id(instance)] = instance
 
 
 class cached_property(functools_cached_property):
     def __get__(self, instance, owner=None):
         ret = super().__get__(instance)
         if instance is not None:
-            to_uncache.append((instance, self.attrname))
+            _track(instance)
             counter[self.attrname] += 1
         return ret
 
@@ -134,12 +156,39 @@ def lru_cache(func=None, *, maxsize=128, typed=False):
     return cached_func
 
 
+def _uncache_bucket(bucket):
+    for instance in list(bucket.values()):
+        for name in _get_cached_names(type(instance)):
+            instance.__dict__.pop(name, None)
+
+
+def is_cached(instance, name):
+    """Whether the attribute of the instance holds a tracked cached_property value"""
+    bucket = to_uncache.get(instance.__dict__.get("file_node_id"))
+    if bucket is None:
+        return False
+    return bucket.get(id(instance)) is instance and name in _get_cached_names(type(instance)) and name in instance.__dict__
+
+
+def uncache_files(file_node_ids):
+    """Clears the cached_property values of instances belonging to the given files"""
+    for file_node_id in file_node_ids:
+        bucket = to_uncache.pop(file_node_id, None)
+        if bucket is not None:
+            _uncache_bucket(bucket)
+
+
+def uncache_unowned():
+    """Clears the cached_property values of instances outside of any file, such as directories, and every lru_cache"""
+    uncache_files((None,))
+    for cached_func in lru_caches:
+        cached_func.cache_clear()
+
+
 def uncache_all():
-    for instance, name in to_uncache:
-        try:
-            del instance.__dict__[name]
-        except KeyError:
-            pass
+    for bucket in to_uncache.values():
+        _uncache_bucket(bucket)
+    to_uncache.clear()
 
     for cached_func in lru_caches:
         cached_func.cache_clear()
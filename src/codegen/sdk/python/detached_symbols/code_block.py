@@ -11,6 +11,9 @@ from codegen.sdk.core.symbol_groups.multi_line_collection import MultiLineCollec
 from codegen.shared.decorators.docs import noapidoc, py_apidoc
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from codegen.sdk.codebase.tree_cache import TSNodeRef
     from codegen.sdk.python.assignment import PyAssignment
     from codegen.sdk.python.interfaces.has_block import PyHasBlock
     from codegen.sdk.python.statements.with_statement import WithStatement
@@ -25,8 +28,8 @@ class PyCodeBlock(CodeBlock[Parent, "PyAssignment"], Generic[Parent]):
 
     @noapidoc
     @reader
-    def _parse_statements(self) -> MultiLineCollection[Statement, Self]:
-        statements: list[Statement] = self.ctx.parser.parse_py_statements(self.ts_node, self.file_node_id, self.ctx, self)
+    def _parse_statements(self, reused: Mapping[TSNodeRef, Statement] | None = None) -> MultiLineCollection[Statement, Self]:
+        statements: list[Statement] = self.ctx.parser.parse_py_statements(self.ts_node, self.file_node_id, self.ctx, self, reused)
         collection = MultiLineCollection(
             children=statements,
             file_node_id=self.file_node_id,
@@ -24,6 +24,17 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def _base_path_to_module(base_path: str) -> str | None:
+    """Converts a base path relative to the repo root ("src/app") to a module prefix ("src.app")"""
+    base_path = os.path.normpath(base_path) if base_path else ""
+    if base_path in ("", "."):
+        return ""
+    parts = base_path.split(os.sep)
+    if any(not part or part == ".." or "." in part for part in parts):
+        return None
+    return ".".join(parts)
+
+
 @py_apidoc
 class PyImport(Import["PyFile"]):
     """Extends Import for Python codebases."""
@@ -93,36 +104,38 @@ class PyImport(Import["PyFile"]):
         if module_source.startswith("."):
             module_source = self._relative_to_absolute_import(module_source)
 
+        # Candidates are looked up by dotted module name relative to the repo root, e.g. `src.a.b.c` for src/a/b/c.py.
+        # Base paths that are no module prefix (e.g. with dots in a directory name) are looked up by filepath instead.
+        base_module = _base_path_to_module(base_path)
+
+        def get_module_file(module: str) -> PyFile | None:
+            if base_module is None:
+                return self.ctx.get_file(os.path.join(base_path, module.replace(".", "/") + ".py"))
+            return self.ctx.get_module_file(f"{base_module}.{module}" if base_module else module)
+
         # =====[ Check if we are importing an entire file ]=====
         if self.is_module_import():
             # covers `import a.b.c` case and `from a.b.c import *` case
-            filepath = os.path.join(base_path, module_source.replace(".", "/") + ".py")
+            file_module = module_source
         else:
             # This is the case where you do:
             # `from a.b.c import foo`
-            filepath = os.path.join(
-                base_path,
-                module_source.replace(".", "/") + "/" + symbol_name + ".py",
-            )
-        if file := self.ctx.get_file(filepath):
+            file_module = f"{module_source}.{symbol_name}"
+        if file := get_module_file(file_module):
             return ImportResolution(from_file=file, symbol=None, imports_file=True)
 
-        filepath = filepath.replace(".py", "/__init__.py")
-        if file := self.ctx.get_file(filepath):
+        if file := get_module_file(f"{file_module}.__init__"):
             # TODO - I think this is another edge case, due to `dao/__init__.py` etc.
             # You can't do `from a.b.c import foo` => `foo.utils.x` right now since `foo` is just a file...
             return ImportResolution(from_file=file, symbol=None, imports_file=True)
 
         # =====[ Check if `module.py` file exists in the graph ]=====
-        filepath = module_source.replace(".", "/") + ".py"
-        filepath = os.path.join(base_path, filepath)
-        if file := self.ctx.get_file(filepath):
+        if file := get_module_file(module_source):
             symbol = file.get_node_by_name(symbol_name)
             return ImportResolution(from_file=file, symbol=symbol)
 
         # =====[ Check if `module/__init__.py` file exists in the graph ]=====
-        filepath = filepath.replace(".py", "/__init__.py")
-        if from_file := self.ctx.get_file(filepath):
+        if from_file := get_module_file(f"{module_source}.__init__"):
             symbol = from_file.get_node_by_name(symbol_name)
             return ImportResolution(from_file=from_file, symbol=symbol)
 
@@ -1,12 +1,12 @@
 import os
 from os import PathLike
 from pathlib import Path
-from typing import Union
+from typing import NamedTuple, Union
 
 import tree_sitter_javascript as ts_javascript
 import tree_sitter_python as ts_python
 import tree_sitter_typescript as ts_typescript
-from tree_sitter import Language, Parser
+from tree_sitter import Language, Parser, Tree
 from tree_sitter import Node as TSNode
 
 from codegen.sdk.output.utils import stylize_error
@@ -69,10 +69,21 @@ def get_lang_by_filepath_or_extension(filepath_or_extension: str = ".py") -> Lan
     return _ts_parser_factory.extension_to_lang[extension]
 
 
-def parse_file(filepath: PathLike, content: str) -> TSNode:
+class ParsedTree(NamedTuple):
+    """A tree-sitter tree along with the exact bytes it was parsed from"""
+
+    tree: Tree
+    content: bytes
+
+
+def parse_tree(filepath: PathLike, content: str) -> ParsedTree:
     parser = get_parser_by_filepath_or_extension(filepath)
-    ts_node = parser.parse(bytes(content, "utf-8")).root_node
-    return ts_node
+    content_bytes = bytes(content, "utf-8")
+    return ParsedTree(parser.parse(content_bytes), content_bytes)
+
+
+def parse_file(filepath: PathLike, content: str) -> TSNode:
+    return parse_tree(filepath, content).tree.root_node
 
 
 def print_errors(filepath: PathLike, content: str) -> None:
@@ -34,6 +34,15 @@ class TSConfigParser(ConfigParser):
             return self.config_files.get(path)
         return None
 
+    def is_config_file(self, filepath: Path) -> bool:
+        return filepath.name == self.default_config_name or self.ctx.to_absolute(filepath) in self.config_files
+
+    def invalidate(self, filepath: Path) -> list["TSFile"]:
+        # Configs extend and reference each other, so re-read all of them on the next parse
+        self.config_files.clear()
+        directory = self.ctx.to_absolute(filepath).parent
+        return [file for file in self.ctx.get_nodes(NodeType.FILE) if file.ts_config is not None or file.path.is_relative_to(directory)]
+
     def parse_configs(self):
         # This only yields a 0.05s speedup, but its funny writing dynamic programming code
         @cache
@@ -1,5 +1,7 @@
+from collections.abc import Mapping
 from typing import TYPE_CHECKING, Generic, Self, TypeVar
 
+from codegen.sdk.codebase.tree_cache import TSNodeRef
 from codegen.sdk.core.autocommit import reader, writer
 from codegen.sdk.core.detached_symbols.code_block import CodeBlock
 from codegen.sdk.core.interfaces.editable import Editable
@@ -22,8 +24,8 @@ class TSCodeBlock(CodeBlock[Parent, "TSAssignment"], Generic[Parent]):
 
     @noapidoc
     @reader
-    def _parse_statements(self) -> MultiLineCollection[Statement, Self]:
-        statements: list[Statement] = self.ctx.parser.parse_ts_statements(self.ts_node, self.file_node_id, self.ctx, self)
+    def _parse_statements(self, reused: Mapping[TSNodeRef, Statement] | None = None) -> MultiLineCollection[Statement, Self]:
+        statements: list[Statement] = self.ctx.parser.parse_ts_statements(self.ts_node, self.file_node_id, self.ctx, self, reused)
         line_nodes = find_line_start_and_end_nodes(self.ts_node)
         start_node = line_nodes[1][0] if len(line_nodes) > 1 else line_nodes[0][0]
         end_node = line_nodes[-2][1] if len(line_nodes) > 1 else line_nodes[-1][1]
@@ -26,6 +26,11 @@ if TYPE_CHECKING:
     from codegen.sdk.typescript.file import TSFile
     from codegen.sdk.typescript.statements.import_statement import TSImportStatement
 
+# Files a directory import resolves to, in order of precedence
+INDEX_FILES = ["index.ts", "index.js", "index.tsx", "index.jsx"]
+# Extensions tried when resolving a module path, both appended to it and in place of its own extension
+MODULE_EXTENSIONS = ["", ".ts", ".d.ts", ".tsx", ".d.tsx", ".js", ".jsx"]
+
 
 @ts_apidoc
 class TSImport(Import["TSFile"], Exportable):
@@ -222,8 +227,12 @@ class TSImport(Import["TSFile"], Exportable):
         import_source = self.module.source.strip('"').strip("'") if self.module else ""
 
         # Try to resolve the import using the tsconfig paths
-        if self.file.ts_config:
-            import_source = self.file.ts_config.translate_import_path(import_source)
+        if ts_config := self.file.ts_config:
+            cache = self.ctx.module_resolution_cache
+            if (translated := cache.get_translation(ts_config, import_source)) is None:
+                translated = ts_config.translate_import_path(import_source)
+                cache.set_translation(ts_config, import_source, translated)
+            import_source = translated
 
         # Check if need to resolve relative import path to absolute path
         relative_import = False
@@ -241,37 +250,59 @@ class TSImport(Import["TSFile"], Exportable):
         else:
             import_source = os.path.normpath(import_source)
 
+        if (file := self._resolve_module_path(import_source)) is None:
+            # If the imported file is not found, treat it as an external module
+            return None
+        if self.is_module_import():
+            return ImportResolution(from_file=file, symbol=None, imports_file=True)
+        else:
+            # If the import is a named import, resolve to the named export in the file
+            if self.symbol_name is None:
+                return ImportResolution(from_file=file, symbol=None, imports_file=True)
+            export_symbol = file.get_export(export_name=self.symbol_name.source)
+            if export_symbol is None:
+                # If the named export is not found, it is importing a module re-export.
+                # In this case, resolve to the file itself and dynamically resolve the symbol later.
+                return ImportResolution(from_file=file, symbol=None, imports_file=True)
+            return ImportResolution(from_file=file, symbol=export_symbol)
+
+    @noapidoc
+    @reader
+    def _resolve_module_path(self, module_path: str) -> TSFile | None:
+        """Returns the file a normalized module path (e.g. "src/utils" or "src/utils/math.js") refers to.
+
+        Results are cached on the context until a file that was probed as a candidate is added or removed.
+        """
+        cache = self.ctx.module_resolution_cache
+        if module_path in cache:
+            node_id = cache.get(module_path)
+            return None if node_id is None else self.ctx.get_node(node_id)
+
+        stems = []
+        import_source = module_path
         # covers the case where the import is from a directory ex: "import { postExtract } from './post'"
         import_name = import_source.split("/")[-1]
         if "." not in import_name:
-            possible_paths = ["index.ts", "index.js", "index.tsx", "index.jsx"]
-            for p_path in possible_paths:
-                if self.ctx.to_absolute(os.path.join(import_source, p_path)).exists():
+            stems.append(os.path.join(import_source, "index"))
+            for p_path in INDEX_FILES:
+                if self.ctx.get_file(os.path.join(import_source, p_path)) is not None:
                     import_source = os.path.join(import_source, p_path)
                     break
 
-        # Loop through all extensions and try to find the file
-        extensions = ["", ".ts", ".d.ts", ".tsx", ".d.tsx", ".js", ".jsx"]
         # Try both filename with and without extension
+        resolved = None
         for import_source_base in (import_source, os.path.splitext(import_source)[0]):
-            for extension in extensions:
-                import_source_ext = import_source_base + extension
-                if file := self.ctx.get_file(import_source_ext):
-                    if self.is_module_import():
-                        return ImportResolution(from_file=file, symbol=None, imports_file=True)
-                    else:
-                        # If the import is a named import, resolve to the named export in the file
-                        if self.symbol_name is None:
-                            return ImportResolution(from_file=file, symbol=None, imports_file=True)
-                        export_symbol = file.get_export(export_name=self.symbol_name.source)
-                        if export_symbol is None:
-                            # If the named export is not found, it is importing a module re-export.
-                            # In this case, resolve to the file itself and dynamically resolve the symbol later.
-                            return ImportResolution(from_file=file, symbol=None, imports_file=True)
-                        return ImportResolution(from_file=file, symbol=export_symbol)
-
-        # If the imported file is not found, treat it as an external module
-        return None
+            stems.append(import_source_base)
+            for extension in MODULE_EXTENSIONS:
+                if resolved := self.ctx.get_file(import_source_base + extension):
+                    break
+            if resolved is not None:
+                break
+
+        # Stems outside of the repo can't be matched against the files added and removed, so don't cache those
+        if not os.path.isabs(module_path) and not module_path.startswith(".."):
+            cache.set(module_path, None if resolved is None else resolved.node_id, stems)
+        return resolved
 
     @noapidoc
     @reader
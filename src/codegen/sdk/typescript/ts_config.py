@@ -1,6 +1,5 @@
 import logging
 import os
-from functools import cache
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -11,12 +10,67 @@ from codegen.sdk.core.file import File
 from codegen.shared.decorators.docs import ts_apidoc
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     from codegen.sdk.typescript.config_parser import TSConfigParser
     from codegen.sdk.typescript.file import TSFile
 
 logger = logging.getLogger(__name__)
 
 
+class _TrieNode:
+    __slots__ = ("alias", "children", "target")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.alias: str | None = None
+        self.target: str | None = None
+
+
+class PathAliasTrie:
+    """Character trie over path aliases, matching the longest alias that is a directory prefix of a path.
+
+    An alias matches a path if it equals the path or one of its parent directories, with or without a trailing slash.
+    `@utils/` therefore matches `@utils/math` and `@utils`, but not `@utilsx`. A lookup walks the path once.
+    """
+
+    def __init__(self, targets: "Mapping[str, str]") -> None:
+        self._root = _TrieNode()
+        for alias, target in targets.items():
+            node = self._root
+            for char in alias:
+                node = node.children.setdefault(char, _TrieNode())
+            node.alias = alias
+            node.target = target
+
+    def __bool__(self) -> bool:
+        return bool(self._root.children)
+
+    @staticmethod
+    def _match_at(node: _TrieNode) -> _TrieNode | None:
+        if node.alias is not None:
+            return node
+        if (slash := node.children.get("/")) is not None and slash.alias is not None:
+            return slash
+        return None
+
+    def longest_match(self, path: str) -> tuple[str, str] | None:
+        """Returns the longest (alias, target) matching a directory prefix of the path, or None if there is none"""
+        match = None
+        node = self._root
+        for i, char in enumerate(path):
+            # Every slash (but a leading one) ends a parent directory of the path
+            if char == "/" and i > 0 and (found := self._match_at(node)) is not None:
+                match = found
+            node = node.children.get(char)
+            if node is None:
+                break
+        else:
+            if path and path != "/" and (found := self._match_at(node)) is not None:
+                match = found
+        return None if match is None else (match.alias, match.target)
+
+
 @ts_apidoc
 class TSConfig:
     """TypeScript configuration file specified in tsconfig.json, used for import resolution and computing dependencies.
@@ -55,6 +109,10 @@ class TSConfig:
     # Optimization hack. If all the path alises start with `@` or `~`, then we can skip any path that doesn't start with `@` or `~`
     # when computing the import resolution.
     _import_optimization_enabled: bool = False
+    # Longest-prefix matchers from alias to the (first) path it translates to
+    _override_trie: PathAliasTrie = PathAliasTrie({})
+    _reference_alias_trie: PathAliasTrie = PathAliasTrie({})
+    _path_alias_trie: PathAliasTrie = PathAliasTrie({})
 
     def __init__(self, config_file: File, config_parser: "TSConfigParser"):
         self.config_file = config_file
@@ -66,6 +124,8 @@ class TSConfig:
         except pyjson5.Json5Exception:
             logger.exception(f"Failed to parse tsconfig.json file: {config_file.filepath}")
             self.config = {}
+        if overrides := config_file.ctx.config.feature_flags.import_resolution_overrides:
+            self._override_trie = PathAliasTrie(overrides)
 
         # Precompute the base config, base url, paths, and references
         self._precompute_config_values()
@@ -221,6 +281,10 @@ class TSConfig:
 
         self._reference_import_aliases = {**base_reference_import_aliases, **self_reference_import_aliases}
 
+        # Precompute the alias matchers, translating to the first path of every alias
+        self._reference_alias_trie = PathAliasTrie({alias: paths[0] for alias, paths in self.reference_import_aliases.items() if paths})
+        self._path_alias_trie = PathAliasTrie({alias: paths[0] for alias, paths in self.path_import_aliases.items() if paths})
+
         # Precompute _import_optimization_enabled
         self._import_optimization_enabled = all(k.startswith("@") or k.startswith("~") for k in list(self.path_import_aliases.keys()) + list(self.reference_import_aliases.keys()))
 
@@ -262,43 +326,18 @@ class TSConfig:
             return import_path
 
         # Step 1: Try to resolve with import_resolution_overrides
-        if self.config_file.ctx.config.feature_flags.import_resolution_overrides:
-            if path_check := TSConfig._find_matching_path(frozenset(self.config_file.ctx.config.feature_flags.import_resolution_overrides.keys()), import_path):
-                to_base = self.config_file.ctx.config.feature_flags.import_resolution_overrides[path_check]
-
-                # Get the remaining path after the matching prefix
-                remaining_path = import_path[len(path_check) :].lstrip("/")
-
-                # Join the path together
-                import_path = os.path.join(to_base, remaining_path)
-
-                return import_path
-
         # Step 2: Keep traveling down the parent config paths until we find a match a reference_import_aliases
-        if path_check := TSConfig._find_matching_path(frozenset(self.reference_import_aliases.keys()), import_path):
-            # TODO: This assumes that there is only one to_base path for the given from_base path
-            to_base = self.reference_import_aliases[path_check][0]
-
-            # Get the remaining path after the matching prefix
-            remaining_path = import_path[len(path_check) :].lstrip("/")
-
-            # Join the path together
-            import_path = os.path.join(to_base, remaining_path)
-
-            return import_path
-
         # Step 3: Keep traveling down the parent config paths until we find a match a path_import_aliases
-        if path_check := TSConfig._find_matching_path(frozenset(self.path_import_aliases.keys()), import_path):
+        for trie in (self._override_trie, self._reference_alias_trie, self._path_alias_trie):
             # TODO: This assumes that there is only one to_base path for the given from_base path
-            to_base = self.path_import_aliases[path_check][0]
-
-            # Get the remaining path after the matching prefix
-            remaining_path = import_path[len(path_check) :].lstrip("/")
+            if match := trie.longest_match(import_path):
+                path_check, to_base = match
 
-            # Join the path together
-            import_path = os.path.join(to_base, remaining_path)
+                # Get the remaining path after the matching prefix
+                remaining_path = import_path[len(path_check) :].lstrip("/")
 
-            return import_path
+                # Join the path together
+                return os.path.join(to_base, remaining_path)
 
         # Step 4: Try to resolve with base path for non-relative imports
         return self.resolve_base_url(import_path)
@@ -347,22 +386,6 @@ class TSConfig:
         else:
             return import_path
 
-    @staticmethod
-    @cache
-    def _find_matching_path(path_import_aliases: set[str], path_check: str):
-        """Recursively find the longest matching path in path_import_aliases."""
-        # Base case
-        if not path_check or path_check == "/":
-            return None
-
-        # Recursive case
-        if path_check in path_import_aliases:
-            return path_check
-        elif f"{path_check}/" in path_import_aliases:
-            return f"{path_check}/"
-        else:
-            return TSConfig._find_matching_path(path_import_aliases, os.path.dirname(path_check))
-
     @property
     def base_config(self) -> "TSConfig | None":
         """Returns the base TSConfig that this config inherits from.
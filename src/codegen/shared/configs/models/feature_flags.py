@@ -26,6 +26,14 @@ class CodebaseFeatureFlags(BaseSettings):
     ignore_process_errors: bool = True
     disable_graph: bool = False
     generics: bool = True
+    snapshot_dir: str | None = None
+    # Save a snapshot into snapshot_dir after every build. Off by default, as pickling the graph slows down cold starts.
+    save_snapshots: bool = False
+    compact_editables: bool = False
+    # Re-parse edited files incrementally, keeping the statements an edit did not touch. Files keep the tree they were
+    # parsed from for this, so it has no effect along with compact_editables.
+    incremental_reparse: bool = False
+    tree_cache_size: int = 128
     import_resolution_overrides: dict[str, str] = Field(default_factory=lambda: {})
     typescript: TypescriptConfig = Field(default_factory=TypescriptConfig)
 
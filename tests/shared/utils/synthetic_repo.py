@@ -0,0 +1,128 @@
+import random
+from dataclasses import asdict, dataclass
+
+from codegen.shared.enums.programming_language import ProgrammingLanguage
+
+
+@dataclass(frozen=True)
+class SyntheticRepoConfig:
+    """Shape of a generated repo. The same config and seed always generate the same files."""
+
+    num_files: int = 200
+    # Modules each module imports from
+    fan_out: int = 3
+    # Modules imported by (up to) this many other modules, on top of the regular imports. One per package.
+    fan_in: int = 20
+    files_per_package: int = 20
+    # Helper functions per module, which only call each other
+    functions_per_file: int = 5
+    # Maximum length of a chain of classes inheriting across modules
+    hierarchy_depth: int = 4
+    # Number of modules re-exporting func0 from the previous one, with the last one imported by the hub modules
+    reexport_depth: int = 3
+    seed: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class SyntheticRepo:
+    """Generates a Python or TypeScript repo of packages of modules, as a dict from filepath to content.
+
+    Module i lives in package i // files_per_package and defines func{i}, which calls the functions it imports, and
+    Class{i}, which extends a class of an imported module as long as the hierarchy is not too deep. Modules only import
+    from modules with a lower index, so the import graph is acyclic. Every package has an index (__init__.py or
+    index.ts) re-exporting the functions of its modules.
+    """
+
+    config: SyntheticRepoConfig
+    language: ProgrammingLanguage
+
+    def __init__(self, config: SyntheticRepoConfig, language: ProgrammingLanguage = ProgrammingLanguage.PYTHON) -> None:
+        self.config = config
+        self.language = language
+
+    @property
+    def extension(self) -> str:
+        return "py" if self.language == ProgrammingLanguage.PYTHON else "ts"
+
+    def module_path(self, i: int) -> str:
+        return f"pkg{i // self.config.files_per_package}/mod{i}.{self.extension}"
+
+    def module_paths(self) -> list[str]:
+        return [self.module_path(i) for i in range(self.config.num_files)]
+
+    def hubs(self) -> list[int]:
+        """Indexes of the modules with a high fan-in, the first module of every package"""
+        return list(range(0, self.config.num_files, self.config.files_per_package))
+
+    def generate(self) -> dict[str, str]:
+        rng = random.Random(self.config.seed)
+        hubs = self.hubs()
+        hub_importers = {hub: set(rng.sample(range(hub + 1, self.config.num_files), min(self.config.fan_in, self.config.num_files - hub - 1))) for hub in hubs}
+        reexport_tail = self.config.reexport_depth - 1
+        depths = []
+        files = {}
+        for i in range(self.config.num_files):
+            imports = set(rng.sample(range(i), min(self.config.fan_out, i)))
+            imports.update(hub for hub in hubs if i in hub_importers[hub])
+            imports = sorted(imports)
+            # Inherit from the first imported class whose hierarchy is not too deep yet
+            base = next((j for j in imports if depths[j] < self.config.hierarchy_depth - 1), None)
+            depths.append(0 if base is None else depths[base] + 1)
+            # Hubs import func0 through the re-export chain, unless they already import it directly
+            reexport = i in hubs and i > 0 and reexport_tail >= 0 and 0 not in imports
+            files[self.module_path(i)] = self._module(i, imports, base, reexport_tail if reexport else None)
+        for package in range(len(hubs)):
+            members = range(package * self.config.files_per_package, min((package + 1) * self.config.files_per_package, self.config.num_files))
+            files.update(self._package_index(package, members))
+        for level in range(self.config.reexport_depth):
+            files.update(self._reexport(level))
+        return files
+
+    def edit(self, files: dict[str, str], count: int, revision: int = 1) -> dict[str, str]:
+        """Returns new content for the first count modules, each with an extra function, different for every revision"""
+        ret = {}
+        for filepath in self.module_paths()[:count]:
+            if self.language == ProgrammingLanguage.PYTHON:
+                ret[filepath] = f"{files[filepath]}\n\ndef edited{revision}(x):\n    return x + {revision}\n"
+            else:
+                ret[filepath] = f"{files[filepath]}\nexport function edited{revision}(x: number): number {{\n    return x + {revision};\n}}\n"
+        return ret
+
+    def _module(self, i: int, imports: list[int], base: int | None, reexport_level: int | None) -> str:
+        calls = [f"func{j}(x)" for j in imports]
+        if reexport_level is not None:
+            calls.append("func0(x)")
+        helpers = [f"helper{i}_{k}" for k in range(self.config.functions_per_file)]
+        if self.language == ProgrammingLanguage.PYTHON:
+            lines = [f"from pkg{j // self.config.files_per_package}.mod{j} import Class{j}, func{j}" for j in imports]
+            if reexport_level is not None:
+                lines.append(f"from reexports.level{reexport_level} import func0")
+            lines.append("")
+            for k, helper in enumerate(helpers):
+                lines += ["", f"def {helper}(x):", f"    return {f'{helpers[k - 1]}(x) + ' if k else ''}{k}", ""]
+            lines += ["", f"def func{i}(x):", f"    return {' + '.join([f'{helpers[-1]}(x)' if helpers else 'x', *calls])}", ""]
+            lines += ["", f"class Class{i}{f'(Class{base})' if base is not None else ''}:", f"    def method{i}(self):", f"        return func{i}(1)", ""]
+        else:
+            lines = [f'import {{ Class{j}, func{j} }} from "../pkg{j // self.config.files_per_package}/mod{j}";' for j in imports]
+            if reexport_level is not None:
+                lines.append(f'import {{ func0 }} from "../reexports/level{reexport_level}";')
+            lines.append("")
+            for k, helper in enumerate(helpers):
+                lines += [f"function {helper}(x: number): number {{", f"    return {f'{helpers[k - 1]}(x) + ' if k else ''}{k};", "}", ""]
+            lines += [f"export function func{i}(x: number): number {{", f"    return {' + '.join([f'{helpers[-1]}(x)' if helpers else 'x', *calls])};", "}", ""]
+            lines += [f"export class Class{i}{f' extends Class{base}' if base is not None else ''} {{", f"    method{i}(): number {{", f"        return func{i}(1);", "    }", "}", ""]
+        return "\n".join(lines).lstrip("\n")
+
+    def _package_index(self, package: int, members: range) -> dict[str, str]:
+        if self.language == ProgrammingLanguage.PYTHON:
+            return {f"pkg{package}/__init__.py": "".join(f"from pkg{package}.mod{i} import func{i}\n" for i in members)}
+        return {f"pkg{package}/index.ts": "".join(f'export {{ func{i} }} from "./mod{i}";\n' for i in members)}
+
+    def _reexport(self, level: int) -> dict[str, str]:
+        if self.language == ProgrammingLanguage.PYTHON:
+            source = "pkg0.mod0" if level == 0 else f"reexports.level{level - 1}"
+            return {f"reexports/level{level}.py": f"from {source} import func0\n"}
+        source = "../pkg0/mod0" if level == 0 else f"./level{level - 1}"
+        return {f"reexports/level{level}.ts": f'export {{ func0 }} from "{source}";\n'}
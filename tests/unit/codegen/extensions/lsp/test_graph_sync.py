@@ -0,0 +1,116 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from pygls.workspace import Workspace
+
+from codegen.extensions.lsp.io import LSPIO
+from codegen.extensions.lsp.sync import GraphSync
+from codegen.sdk.codebase.factory.get_session import get_codebase_session
+
+
+def wait_for_generation(sync: GraphSync, generation: int, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    while sync.generation < generation:
+        assert time.monotonic() < deadline, "Timed out waiting for the graph to sync"
+        time.sleep(0.01)
+
+
+def test_graph_sync_coalesces_changes(tmpdir) -> None:
+    with get_codebase_session(tmpdir=tmpdir, files={"a.py": "def a():\n    pass\n"}) as codebase:
+        sync = GraphSync(codebase, debounce=0.1)
+        try:
+            path = codebase.get_file("a.py").path
+            for name in "bcd":
+                codebase.ctx.io.write_text(path, codebase.ctx.io.read_text(path) + f"\ndef {name}():\n    pass\n")
+                sync.schedule(path)
+            assert codebase.get_function("d", optional=True) is None
+            wait_for_generation(sync, 1)
+            assert sync.generation == 1
+            assert sync.pending == []
+            assert [function.name for function in codebase.functions] == ["a", "b", "c", "d"]
+        finally:
+            sync.close()
+
+
+def test_graph_sync_flushed(tmpdir) -> None:
+    with get_codebase_session(tmpdir=tmpdir, files={"a.py": "def a():\n    pass\n"}) as codebase:
+        sync = GraphSync(codebase, debounce=60)
+        try:
+            path = codebase.get_file("a.py").path
+            codebase.ctx.io.write_text(path, "def renamed():\n    pass\n")
+            sync.schedule(path)
+            assert sync.pending == [path]
+            with sync.flushed():
+                assert codebase.get_function("renamed") is not None
+            assert sync.generation == 1
+            assert sync.pending == []
+        finally:
+            sync.close()
+
+
+def test_graph_sync_keeps_failed_changes_pending(tmpdir) -> None:
+    with get_codebase_session(tmpdir=tmpdir, files={"a.py": "def a():\n    pass\n"}) as codebase:
+        sync = GraphSync(codebase, debounce=60)
+        try:
+            path = codebase.get_file("a.py").path
+            codebase.ctx.io.write_text(path, "def renamed():\n    pass\n")
+            sync.schedule(path)
+            with patch.object(codebase.ctx, "apply_diffs", side_effect=RuntimeError("sync failed")):
+                with pytest.raises(RuntimeError):
+                    sync.flush()
+            assert sync.pending == [path]
+            assert sync.generation == 0
+
+            sync.flush()
+            assert sync.pending == []
+            assert codebase.get_function("renamed") is not None
+        finally:
+            sync.close()
+
+
+def test_graph_sync_schedule_does_not_wait_for_batch(tmpdir) -> None:
+    with get_codebase_session(tmpdir=tmpdir, files={"a.py": "def a():\n    pass\n"}) as codebase:
+        sync = GraphSync(codebase, debounce=0)
+        started = threading.Event()
+        release = threading.Event()
+        apply_diffs = codebase.ctx.apply_diffs
+
+        def slow_apply_diffs(diffs):
+            started.set()
+            release.wait()
+            apply_diffs(diffs)
+
+        try:
+            path = codebase.get_file("a.py").path
+            with patch.object(codebase.ctx, "apply_diffs", side_effect=slow_apply_diffs):
+                sync.schedule(path)
+                assert started.wait(10)
+                # The worker holds the graph lock for the whole batch, buffering a change must not need it
+                codebase.ctx.io.write_text(path, "def renamed():\n    pass\n")
+                sync.schedule(path)
+                assert sync.pending == [path]
+                release.set()
+                wait_for_generation(sync, 2)
+            assert codebase.get_function("renamed") is not None
+        finally:
+            release.set()
+            sync.close()
+
+
+def test_graph_sync_pending_source(tmpdir) -> None:
+    with get_codebase_session(tmpdir=tmpdir, files={"a.py": "def a():\n    pass\n"}) as codebase:
+        codebase.ctx.io = LSPIO(Workspace(codebase.repo_path.as_uri()))
+        sync = GraphSync(codebase, debounce=60)
+        try:
+            path = codebase.get_file("a.py").path
+            assert sync.pending_source(path) is None
+            sync.schedule(path, 1, "def renamed():\n    pass\n")
+            assert sync.pending_source(path) == "def renamed():\n    pass\n"
+            assert codebase.get_function("renamed", optional=True) is None
+            sync.flush()
+            assert sync.pending_source(path) is None
+            assert codebase.get_function("renamed") is not None
+        finally:
+            sync.close()
@@ -0,0 +1,46 @@
+import pytest
+from lsprotocol.types import Position, Range, TextDocumentItem
+from pygls.workspace import Workspace
+
+from codegen.extensions.lsp.io import LSPIO
+from codegen.extensions.lsp.server import CodegenLanguageServer
+from codegen.sdk.codebase.factory.get_session import get_codebase_session
+from codegen.sdk.core.function import Function
+from codegen.shared.configs.models.feature_flags import CodebaseFeatureFlags
+
+# language=python
+CONTENT = """
+def example_function(a, b):
+    return helper(a + 1, [b])
+
+def main():
+    example_function(1, 2)
+"""
+
+
+@pytest.mark.parametrize("full_range_index", [True, False], ids=["full_range_index", "canonical_only"])
+def test_get_node_under_cursor(tmpdir, full_range_index: bool) -> None:
+    feature_flags = CodebaseFeatureFlags(full_range_index=full_range_index)
+    with get_codebase_session(tmpdir=tmpdir, files={"test.py": CONTENT}, feature_flags=feature_flags, verify_output=False) as codebase:
+        file = codebase.get_file("test.py")
+        uri = file.path.absolute().as_uri()
+        server = CodegenLanguageServer("test", "v1")
+        server.codebase = codebase
+        server.protocol._workspace = Workspace(codebase.repo_path.as_uri())
+        server.io = LSPIO(server.workspace)
+        server.workspace.put_text_document(TextDocumentItem(uri=uri, language_id="python", version=0, text=CONTENT))
+
+        node = server.get_node_under_cursor(uri, Position(line=5, character=6))
+        assert node is not None
+        assert node.source == "example_function"
+        assert node.start_byte <= CONTENT.index("example_function(1") < node.end_byte
+        assert isinstance(server.get_symbol(uri, Position(line=2, character=12)), Function)
+
+        node = server.get_node_under_cursor(uri, Position(line=2, character=18), Position(line=2, character=23))
+        assert node is not None
+        assert "a + 1" in node.source
+        assert node.source in "helper(a + 1, [b])"
+
+        node = server.get_node_for_range(uri, Range(start=Position(line=1, character=4), end=Position(line=1, character=20)))
+        assert node is not None
+        assert node.source == "example_function"
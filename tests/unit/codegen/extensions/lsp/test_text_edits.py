@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from codegen.extensions.lsp.range import get_text_edits
+from tests.unit.codegen.extensions.lsp.utils import get_offset
+
+
+def apply_text_edits(content: str, edits) -> str:
+    for edit in sorted(edits, key=lambda edit: get_offset(content, edit.range.start), reverse=True):
+        content = content[: get_offset(content, edit.range.start)] + edit.new_text + content[get_offset(content, edit.range.end) :]
+    return content
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ("", ""),
+        ("", "a\nb\n"),
+        ("a\nb\n", ""),
+        ("a", "a\nb"),
+        ("a\nb", "a"),
+        ("def foo():\n    pass\n", "def bar():\n    pass\n"),
+        ("x = 1\ny = 2\nz = 3\n", "x = 1\nz = 3\n"),
+        ("x = 1\n", "w = 0\nx = 1\n"),
+        ("a\r\nb\r\n", "a\r\nc\r\n"),
+        ("a\r\nb\r\n", "a\nb\n"),
+        ("a\rb\r", "a\r\nb\r\n"),
+        ("a\rb\rc", "a\rx\rc"),
+        ("x = '😀'; y = 1\n", "x = '😀'; z = 1\n"),
+        ("😀😀 a 😀\n", "😀😀 b 😀🎉\n"),
+    ],
+)
+def test_get_text_edits(old: str, new: str) -> None:
+    assert apply_text_edits(old, get_text_edits(old, new)) == new
+
+
+def test_get_text_edits_minimal() -> None:
+    old = "".join(f"def func{i}():\n    return helper({i})\n\n" for i in range(1000))
+    new = old.replace("helper(10)", "assist(10)").replace("helper(500)", "assist(500)")
+    edits = get_text_edits(old, new)
+    assert [(edit.range.start.line, edit.range.start.character, edit.range.end.character, edit.new_text) for edit in edits] == [(31, 11, 17, "assist"), (1501, 11, 17, "assist")]
+
+
+def test_get_text_edits_random() -> None:
+    rng = random.Random(0)
+    for _ in range(200):
+        lines = [rng.choice(["a", "b", "", "ab", "ba"]) + rng.choice(["\n", "\n", ""]) for _ in range(rng.randint(0, 10))]
+        old = "".join(lines)
+        new = "".join(rng.choice([line, line + "x\n", "", "b" + line, line.replace("\n", "\r\n"), line + "\r"]) for line in lines)
+        assert apply_text_edits(old, get_text_edits(old, new)) == new
+
+
+def test_get_text_edits_form_feed() -> None:
+    edits = get_text_edits("a\x0cb\nc\n", "a\x0cb\nd\n")
+    assert [(edit.range.start.line, edit.range.start.character, edit.new_text) for edit in edits] == [(1, 0, "d")]
+
+
+def test_get_text_edits_utf16() -> None:
+    # Characters outside the BMP take two UTF-16 code units
+    edits = get_text_edits("x = '😀'; y = 1\n", "x = '😀'; z = 1\n")
+    assert [(edit.range.start.character, edit.range.end.character, edit.new_text) for edit in edits] == [(10, 11, "z")]
+
+
+def test_get_text_edits_crlf() -> None:
+    # \r\n and a lone \r end a line, as in LSP
+    edits = get_text_edits("a = 1\r\nb = 2\r\nc = 3\r\n", "a = 1\r\nb = 4\r\nc = 3\r\n")
+    assert [(edit.range.start.line, edit.range.start.character, edit.range.end.line, edit.range.end.character, edit.new_text) for edit in edits] == [(1, 4, 1, 5, "4")]
+    edits = get_text_edits("a\rb\rc\r", "a\rb\rd\r")
+    assert [(edit.range.start.line, edit.range.start.character, edit.new_text) for edit in edits] == [(2, 0, "d")]
+    # Converting line endings replaces whole line endings, never half of a \r\n
+    edits = get_text_edits("a\r\nb\r\n", "a\nb\n")
+    assert [(edit.range.start.line, edit.range.start.character, edit.range.end.line, edit.range.end.character, edit.new_text) for edit in edits] == [(0, 1, 2, 0, "\nb\n")]
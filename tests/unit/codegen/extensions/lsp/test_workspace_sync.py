@@ -250,5 +250,9 @@ async def test_rename_after_sync(
         )
     )
     if result:
+        # The edits apply to the document as the client has it, so mirror the unsaved change first
+        file = codebase.get_file("test.py")
+        file.edit(file.content.replace("    pass", "    pass # modified", 1))
+        codebase.commit()
         apply_edit(codebase, result)
     assert_expected(codebase)
@@ -1,17 +1,35 @@
-from lsprotocol.types import CreateFile, TextDocumentEdit, WorkspaceEdit
+import re
+
+from lsprotocol.types import CreateFile, Position, TextDocumentEdit, WorkspaceEdit
 
 from codegen.extensions.lsp.utils import get_path
 from codegen.sdk.core.codebase import Codebase
 
 
+def get_offset(content: str, position: Position) -> int:
+    r"""Returns the offset of a position, whose character is counted in UTF-16 code units. Lines end in \n, \r\n or \r"""
+    lines = re.split(r"(?<=\r\n)|(?<=\r)(?!\n)|(?<=\n)", content)
+    offset = sum(len(line) for line in lines[: position.line])
+    units = 0
+    for char in lines[position.line] if position.line < len(lines) else "":
+        if units >= position.character:
+            break
+        units += 2 if ord(char) > 0xFFFF else 1
+        offset += 1
+    return offset
+
+
 def apply_edit(codebase: Codebase, edit: WorkspaceEdit):
     for change in edit.document_changes:
-        if isinstance(change, TextDocumentEdit):
-            path = get_path(change.text_document.uri)
-            file = codebase.get_file(str(path.relative_to(codebase.repo_path)))
-            for edit in change.edits:
-                file.edit(edit.new_text)
         if isinstance(change, CreateFile):
             path = get_path(change.uri)
             codebase.create_file(str(path.relative_to(codebase.repo_path)))
+        if isinstance(change, TextDocumentEdit):
+            path = get_path(change.text_document.uri)
+            file = codebase.get_file(str(path.relative_to(codebase.repo_path)))
+            content = file.content
+            # All edits refer to the original content, so apply them back to front
+            for text_edit in sorted(change.edits, key=lambda text_edit: get_offset(content, text_edit.range.start), reverse=True):
+                content = content[: get_offset(content, text_edit.range.start)] + text_edit.new_text + content[get_offset(content, text_edit.range.end) :]
+            file.edit(content)
     codebase.commit()
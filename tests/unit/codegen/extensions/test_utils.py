@@ -1,8 +1,11 @@
+import gc
+import weakref
 from threading import Event
 
 import pytest
 
-from codegen.sdk.extensions.utils import lru_cache, uncache_all
+from codegen.sdk.extensions import utils
+from codegen.sdk.extensions.utils import cached_property, is_cached, lru_cache, uncache_all, uncache_files, uncache_unowned
 
 
 def test_lru_cache_with_uncache_all():
@@ -41,3 +44,51 @@ def test_lru_cache_args_with_uncache_all():
     for idx in range(2):
         with pytest.raises(AssertionError):
             cached_function(idx)
+
+
+def test_uncache_files():
+    class Cached:
+        def __init__(self, file_node_id: int | None) -> None:
+            if file_node_id is not None:
+                self.file_node_id = file_node_id
+            self.calls = 0
+
+        @cached_property
+        def value(self) -> int:
+            self.calls += 1
+            return self.calls
+
+    first, second, unowned = Cached(1), Cached(2), Cached(None)
+    for _ in range(3):
+        assert (first.value, second.value, unowned.value) == (1, 1, 1)
+    assert is_cached(first, "value") and is_cached(unowned, "value")
+    assert not is_cached(first, "calls")
+
+    uncache_files([1])
+    assert not is_cached(first, "value")
+    assert (first.value, second.value, unowned.value) == (2, 1, 1)
+
+    uncache_unowned()
+    assert (first.value, second.value, unowned.value) == (2, 1, 2)
+
+    uncache_all()
+    assert (first.value, second.value, unowned.value) == (3, 2, 3)
+    # Every instance is tracked once, no matter how often its values are recomputed
+    assert sum(len(bucket) for bucket in utils.to_uncache.values()) == 3
+
+
+def test_uncache_does_not_keep_instances_alive():
+    class Cached:
+        file_node_id = 1
+
+        @cached_property
+        def value(self) -> int:
+            return 1
+
+    instance = Cached()
+    assert instance.value == 1
+    ref = weakref.ref(instance)
+    del instance
+    gc.collect()
+    assert ref() is None
+    assert not utils.to_uncache.get(1)
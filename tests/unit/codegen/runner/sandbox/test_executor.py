@@ -1,19 +1,23 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
-from unittest.mock import MagicMock
+import threading
+from multiprocessing.context import ForkProcess
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 import pytest
+from git import Repo as GitCLI
 
 from codegen.git.models.codemod_context import CodemodContext
-from codegen.runner.models.codemod import GroupingConfig
-from codegen.sdk.codebase.config import SessionOptions
+from codegen.git.repo_operator.local_repo_operator import LocalRepoOperator
+from codegen.runner.models.codemod import BranchConfig, GroupingConfig
+from codegen.runner.sandbox.executor import SandboxExecutor
+from codegen.sdk.codebase.config import ProjectConfig, SessionOptions
 from codegen.sdk.codebase.flagging.code_flag import CodeFlag
 from codegen.sdk.codebase.flagging.groupers.enums import GroupBy
+from codegen.sdk.core.codebase import Codebase
 from codegen.shared.compilation.string_to_code import create_execute_function_from_codeblock
-
-if TYPE_CHECKING:
-    from codegen.runner.sandbox.executor import SandboxExecutor
+from codegen.shared.enums.programming_language import ProgrammingLanguage
 
 
 @pytest.mark.asyncio
@@ -228,3 +232,108 @@ async def test_find_flag_groups_with_max_prs(executor: SandboxExecutor):
         grouping_config=GroupingConfig(group_by=GroupBy.FILE, max_prs=0),
     )
     assert len(groups) == 0
+
+
+@pytest.mark.asyncio
+async def test_execute_flag_groups_in_parallel(tmpdir):
+    op = LocalRepoOperator.create_from_files(repo_path=f"{tmpdir}/test-repo", files={"a.py": "a = 1\n", "b.py": "b = 1\n"}, bot_commit=True)
+    remote = GitCLI.init(f"{tmpdir}/remote.git", bare=True)
+    op.git_cli.create_remote("origin", remote.git_dir)
+    codebase = Codebase(projects=[ProjectConfig(repo_operator=op, programming_language=ProgrammingLanguage.PYTHON)])
+    executor = SandboxExecutor(codebase)
+    mock_source = """
+for file in codebase.files:
+    flag = codebase.flag_instance(file)
+    if codebase.should_fix(flag):
+        file.edit(file.content.replace("1", "2"))
+"""
+    code_to_exec = create_execute_function_from_codeblock(codeblock=mock_source)
+    flags = await executor.find_flags(code_to_exec)
+    groups = await executor.find_flag_groups(code_flags=flags, grouping_config=GroupingConfig(group_by=GroupBy.FILE))
+    assert [group.segment for group in groups] == ["a.py", "b.py"]
+
+    branch_config = BranchConfig(branch_name="codemod", custom_base_branch=op.git_cli.active_branch.name)
+    results, branches = await executor.execute_flag_groups("update", code_to_exec, groups, branch_config, max_workers=2)
+
+    assert [branch.head_ref for branch in branches] == ["codemod-group-0", "codemod-group-1"]
+    assert all(result.is_complete and result.error is None for result in results)
+    # Every group only changes the files of its own flags
+    assert "+a = 2" in results[0].observation and "b.py" not in results[0].observation
+    assert "+b = 2" in results[1].observation and "a.py" not in results[1].observation
+    assert (remote.git.show("codemod-group-0:a.py"), remote.git.show("codemod-group-0:b.py")) == ("a = 2", "b = 1")
+    assert (remote.git.show("codemod-group-1:a.py"), remote.git.show("codemod-group-1:b.py")) == ("a = 1", "b = 2")
+    # The parent codebase and its working tree are untouched
+    assert codebase.get_file("a.py").content == "a = 1\n"
+    assert not op.git_cli.is_dirty()
+
+
+@pytest.mark.asyncio
+async def test_execute_flag_groups_in_parallel_checks_out_base_branch(tmpdir):
+    op = LocalRepoOperator.create_from_files(repo_path=f"{tmpdir}/test-repo", files={"a.py": "a = 1\n", "b.py": "b = 1\n"}, bot_commit=True)
+    remote = GitCLI.init(f"{tmpdir}/remote.git", bare=True)
+    op.git_cli.create_remote("origin", remote.git_dir)
+    default_branch = op.git_cli.active_branch.name
+    op.checkout_branch("base", create_if_missing=True)
+    (Path(op.repo_path) / "b.py").write_text("b = 3\n")
+    op.git_cli.index.add(["b.py"])
+    op.git_cli.index.commit("base")
+    op.checkout_branch(default_branch)
+    codebase = Codebase(projects=[ProjectConfig(repo_operator=op, programming_language=ProgrammingLanguage.PYTHON)])
+    executor = SandboxExecutor(codebase)
+    mock_source = """
+for file in codebase.files:
+    flag = codebase.flag_instance(file)
+    if codebase.should_fix(flag):
+        file.edit(file.content + "# fixed\\n")
+"""
+    code_to_exec = create_execute_function_from_codeblock(codeblock=mock_source)
+    flags = await executor.find_flags(code_to_exec)
+    groups = await executor.find_flag_groups(code_flags=flags, grouping_config=GroupingConfig(group_by=GroupBy.FILE))
+
+    branch_config = BranchConfig(branch_name="codemod", custom_base_branch="base")
+    results, branches = await executor.execute_flag_groups("update", code_to_exec, groups, branch_config, max_workers=2)
+
+    assert all(result.is_complete and result.error is None for result in results)
+    assert [branch.head_ref for branch in branches] == ["codemod-group-0", "codemod-group-1"]
+    # The groups run against the base branch, rather than the branch checked out before
+    assert op.is_branch_checked_out("base")
+    assert remote.git.show("codemod-group-1:b.py") == "b = 3\n# fixed"
+    assert remote.git.show("codemod-group-0:b.py") == "b = 3"
+
+
+@pytest.mark.asyncio
+async def test_execute_flag_groups_in_parallel_more_groups_than_workers(tmpdir):
+    op = LocalRepoOperator.create_from_files(repo_path=f"{tmpdir}/test-repo", files={"a.py": "a = 1\n", "b.py": "b = 1\n", "c.py": "c = 1\n"}, bot_commit=True)
+    remote = GitCLI.init(f"{tmpdir}/remote.git", bare=True)
+    op.git_cli.create_remote("origin", remote.git_dir)
+    codebase = Codebase(projects=[ProjectConfig(repo_operator=op, programming_language=ProgrammingLanguage.PYTHON)])
+    executor = SandboxExecutor(codebase)
+    mock_source = """
+for file in codebase.files:
+    flag = codebase.flag_instance(file)
+    if codebase.should_fix(flag):
+        file.edit(file.content.replace("1", "2"))
+"""
+    code_to_exec = create_execute_function_from_codeblock(codeblock=mock_source)
+    flags = await executor.find_flags(code_to_exec)
+    groups = await executor.find_flag_groups(code_flags=flags, grouping_config=GroupingConfig(group_by=GroupBy.FILE))
+
+    branch_config = BranchConfig(branch_name="codemod", custom_base_branch=op.git_cli.active_branch.name)
+    start = ForkProcess.start
+    thread_counts = []
+
+    def counting_start(process: ForkProcess) -> None:
+        thread_counts.append(threading.active_count())
+        start(process)
+
+    baseline = threading.active_count()
+    with patch.object(ForkProcess, "start", counting_start):
+        results, branches = await executor.execute_flag_groups("update", code_to_exec, groups, branch_config, max_workers=2)
+
+    # Later groups fork while earlier ones are still being waited on, which must not start threads to fork with
+    assert thread_counts == [baseline] * 3
+    assert all(result.is_complete and result.error is None for result in results)
+    assert [branch.head_ref for branch in branches] == ["codemod-group-0", "codemod-group-1", "codemod-group-2"]
+    assert remote.git.show("codemod-group-2:c.py") == "c = 2"
+    # Every worktree is removed once its group is done
+    assert len(op.git_cli.git.worktree("list").splitlines()) == 1
@@ -0,0 +1,30 @@
+import pytest
+
+from codegen.sdk.codebase.factory.get_session import get_codebase_session
+from codegen.sdk.enums import NodeType
+from codegen.shared.configs.models.feature_flags import CodebaseFeatureFlags
+
+
+def generate_files(num_files: int) -> dict[str, str]:
+    files = {}
+    for i in range(num_files):
+        imports = "\n".join(f"from file{j} import func{j}" for j in range(max(0, i - 3), i))
+        body = "\n\n".join(f"def func{i}_{k}(x):\n    return x + {k}" for k in range(20))
+        files[f"file{i}.py"] = f"import os\n{imports}\n\n{body}\n\ndef func{i}():\n    return os.getcwd()\n\nclass Class{i}:\n    def method(self):\n        return func{i}()\n"
+    return files
+
+
+NUM_FILES = 500
+
+
+@pytest.fixture(scope="module")
+def codebase(tmp_path_factory):
+    with get_codebase_session(tmpdir=tmp_path_factory.mktemp("repo"), files=generate_files(NUM_FILES), feature_flags=CodebaseFeatureFlags(), verify_input=False, verify_output=False) as codebase:
+        yield codebase
+
+
+@pytest.mark.benchmark(group="sdk-benchmark-get-nodes", min_time=0.1, max_time=5, disable_gc=True)
+@pytest.mark.parametrize("node_type", [NodeType.FILE, NodeType.IMPORT, NodeType.EXTERNAL])
+def test_codebase_get_nodes(node_type: NodeType, codebase, benchmark):
+    nodes = benchmark(codebase.ctx.get_nodes, node_type)
+    assert all(node.node_type == node_type for node in nodes)
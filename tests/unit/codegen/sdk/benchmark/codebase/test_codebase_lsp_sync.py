@@ -0,0 +1,93 @@
+import statistics
+import time
+
+import pytest
+from pygls.workspace import Workspace
+
+from codegen.extensions.lsp.io import LSPIO
+from codegen.extensions.lsp.sync import DEFAULT_DEBOUNCE, GraphSync
+from codegen.sdk.codebase.diff_lite import ChangeType, DiffLite
+from codegen.sdk.codebase.factory.get_session import get_codebase_session
+from codegen.shared.configs.models.feature_flags import CodebaseFeatureFlags
+from tests.shared.utils.synthetic_repo import SyntheticRepo, SyntheticRepoConfig
+
+CONFIG = SyntheticRepoConfig(num_files=100)
+NUM_BURSTS = 10
+KEYSTROKES_PER_BURST = 10
+KEYSTROKE_INTERVAL = 0.01
+# Long enough for the worker to start a batch, so the next burst arrives while it is being applied
+PAUSE = DEFAULT_DEBOUNCE * 1.5
+# A request, like a go to definition, follows every this many keystrokes, so there are enough requests for quantiles
+REQUEST_INTERVAL = 2
+
+
+@pytest.mark.benchmark(group="sdk-benchmark-lsp-typing", disable_gc=True)
+@pytest.mark.parametrize("debounced", [False, True], ids=["synchronous", "debounced"])
+def test_lsp_typing_latency(debounced: bool, tmp_path, benchmark) -> None:
+    """Replays a typing session in bursts with pauses in between, and reports how long each notification and request takes.
+
+    Synchronously, every keystroke is applied to the graph as it arrives. Debounced, with the production debounce window,
+    a keystroke only buffers the new version of the document, and the pauses let the worker apply a batch while the
+    next burst arrives. A request applies whatever is still pending, as position-based requests flush the sync.
+    """
+    repo = SyntheticRepo(CONFIG)
+    hub = repo.hubs()[1]
+    with get_codebase_session(tmpdir=tmp_path, files=repo.generate(), feature_flags=CodebaseFeatureFlags(), verify_input=False, verify_output=False) as codebase:
+        codebase.ctx.io = LSPIO(Workspace(codebase.repo_path.as_uri()))
+        sync = GraphSync(codebase, debounce=DEFAULT_DEBOUNCE)
+        path = codebase.get_file(repo.module_path(hub)).path
+        content = codebase.ctx.io.read_text(path)
+        notification_latencies = []
+        in_flight_latencies = []
+        request_latencies = []
+
+        def session() -> None:
+            nonlocal content
+            version = 0
+            for _ in range(NUM_BURSTS):
+                for _ in range(KEYSTROKES_PER_BURST):
+                    time.sleep(KEYSTROKE_INTERVAL)
+                    version += 1
+                    content += f"\n# keystroke {version}"
+                    # Whether the worker is applying a batch as the notification arrives, probed outside the timing
+                    in_flight = not sync.lock.acquire(blocking=False)
+                    if not in_flight:
+                        sync.lock.release()
+                    start = time.perf_counter()
+                    if debounced:
+                        sync.schedule(path, version, content)
+                    else:
+                        with sync.lock:
+                            codebase.ctx.io.update_file(path, version, content)
+                            codebase.ctx.apply_diffs([DiffLite(change_type=ChangeType.Modified, path=path)])
+                    latency = time.perf_counter() - start
+                    notification_latencies.append(latency)
+                    if in_flight:
+                        in_flight_latencies.append(latency)
+                    if version % REQUEST_INTERVAL == 0:
+                        start = time.perf_counter()
+                        with sync.flushed():
+                            assert codebase.get_function(f"func{hub}").usages
+                        request_latencies.append(time.perf_counter() - start)
+                time.sleep(PAUSE)
+
+        try:
+            benchmark.pedantic(session, rounds=1, iterations=1)
+            sync.flush()
+        finally:
+            sync.close()
+        quantiles = statistics.quantiles(notification_latencies, n=100, method="inclusive")
+        request_quantiles = statistics.quantiles(request_latencies, n=100, method="inclusive")
+        benchmark.extra_info.update(
+            repo.config.to_dict(),
+            debounce_ms=DEFAULT_DEBOUNCE * 1000,
+            notification_p50_ms=quantiles[49] * 1000,
+            notification_p99_ms=quantiles[98] * 1000,
+            notifications_during_batch=len(in_flight_latencies),
+            notification_during_batch_max_ms=max(in_flight_latencies, default=0) * 1000,
+            requests=len(request_latencies),
+            request_p50_ms=request_quantiles[49] * 1000,
+            request_p99_ms=request_quantiles[98] * 1000,
+            batches=sync.generation,
+        )
+        assert codebase.get_file(repo.module_path(hub)).content.count("# keystroke") == NUM_BURSTS * KEYSTROKES_PER_BURST
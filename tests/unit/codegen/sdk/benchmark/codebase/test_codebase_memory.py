@@ -0,0 +1,60 @@
+import gc
+import multiprocessing
+import tracemalloc
+
+import pytest
+
+from codegen.git.repo_operator.local_repo_operator import LocalRepoOperator
+from codegen.git.schemas.repo_config import RepoConfig
+from codegen.sdk.codebase.config import CodebaseConfig, ProjectConfig
+from codegen.sdk.core.codebase import Codebase
+from codegen.shared.configs.models.feature_flags import CodebaseFeatureFlags
+from codegen.shared.enums.programming_language import ProgrammingLanguage
+from codegen.shared.performance.memory_utils import get_memory_stats
+
+
+def generate_files(num_files: int) -> dict[str, str]:
+    files = {}
+    for i in range(num_files):
+        imports = "\n".join(f"from file{j} import Class{j}, func{j}" for j in range(max(0, i - 3), i))
+        body = "\n\n".join(f"def func{i}_{k}(x):\n    return [func{i}_{k - 1}(y) for y in range(x) if y % 2] if {k} else x" for k in range(10))
+        files[f"file{i}.py"] = f"{imports}\n\n{body}\n\ndef func{i}():\n    return func{i}_9(1)\n\nclass Class{i}:\n    def method(self):\n        return func{i}()\n"
+    return files
+
+
+NUM_FILES = 200
+
+
+def measure_build(repo_path: str, compact_editables: bool) -> tuple[float, float]:
+    """Builds the codebase and returns the memory it holds on to and the growth of the RSS, in MB.
+
+    Run in a fresh process, so earlier tests do not skew it. The comparison uses the traced memory, as freed trees leave
+    holes in the heap that the RSS still counts. py-tree-sitter allocates trees through Python, so they are traced.
+    """
+    op = LocalRepoOperator(repo_config=RepoConfig.from_repo_path(repo_path))
+    gc.collect()
+    rss_gb = get_memory_stats().memory_rss_gb
+    tracemalloc.start()
+    config = CodebaseConfig(feature_flags=CodebaseFeatureFlags(compact_editables=compact_editables))
+    codebase = Codebase(projects=[ProjectConfig(repo_operator=op, programming_language=ProgrammingLanguage.PYTHON)], config=config)
+    gc.collect()
+    traced_mb = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    rss_mb = (get_memory_stats().memory_rss_gb - rss_gb) * 2**10
+    assert len(codebase.files) == NUM_FILES
+    assert all(function.source.startswith("def ") for function in codebase.functions)
+    return traced_mb, rss_mb
+
+
+def measure_in_subprocess(repo_path: str, compact_editables: bool) -> tuple[float, float]:
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(measure_build, (repo_path, compact_editables))
+
+
+@pytest.mark.benchmark(group="sdk-benchmark-memory", disable_gc=True)
+def test_codebase_memory(tmp_path, benchmark):
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmp_path), files=generate_files(NUM_FILES))
+    full_mb, full_rss_mb = measure_in_subprocess(op.repo_path, compact_editables=False)
+    compact_mb, compact_rss_mb = benchmark.pedantic(measure_in_subprocess, args=(op.repo_path, True), rounds=1)
+    benchmark.extra_info.update(full_mb=full_mb, compact_mb=compact_mb, full_rss_mb=full_rss_mb, compact_rss_mb=compact_rss_mb)
+    assert compact_mb < full_mb
@@ -0,0 +1,150 @@
+"""Benchmarks of the main graph operations on a seeded synthetic repo.
+
+Save the results of a run with `--benchmark-json=<path>` (or `--benchmark-autosave`) and compare runs with
+`pytest-benchmark compare`. The shape of the synthetic repo is stored in the extra info of every benchmark.
+"""
+
+import itertools
+from pathlib import Path
+
+import pytest
+
+from codegen.git.repo_operator.local_repo_operator import LocalRepoOperator
+from codegen.sdk.codebase.config import CodebaseConfig, ProjectConfig
+from codegen.sdk.codebase.diff_lite import ChangeType, DiffLite
+from codegen.sdk.codebase.factory.get_session import get_codebase_session
+from codegen.sdk.core.codebase import Codebase
+from codegen.shared.configs.models.feature_flags import CodebaseFeatureFlags
+from codegen.shared.enums.programming_language import ProgrammingLanguage
+from tests.shared.utils.synthetic_repo import SyntheticRepo, SyntheticRepoConfig
+
+CONFIG = SyntheticRepoConfig(num_files=1000)
+LANGUAGES = [ProgrammingLanguage.PYTHON, ProgrammingLanguage.TYPESCRIPT]
+
+
+@pytest.fixture(scope="module", params=LANGUAGES, ids=lambda language: language.value)
+def synthetic(request, tmp_path_factory):
+    repo = SyntheticRepo(CONFIG, request.param)
+    files = repo.generate()
+    with get_codebase_session(
+        tmpdir=tmp_path_factory.mktemp("repo"), programming_language=request.param, files=files, feature_flags=CodebaseFeatureFlags(), verify_input=False, verify_output=False
+    ) as codebase:
+        yield repo, files, codebase
+
+
+@pytest.fixture
+def record_config(benchmark):
+    def record(repo: SyntheticRepo) -> None:
+        benchmark.extra_info.update(repo.config.to_dict(), language=repo.language.value)
+
+    return record
+
+
+def write_files(codebase: Codebase, contents: dict[str, str]) -> list[DiffLite]:
+    diffs = []
+    for filepath, content in contents.items():
+        path = Path(codebase.ctx.repo_path) / filepath
+        path.write_text(content)
+        diffs.append(DiffLite(change_type=ChangeType.Modified, path=path))
+    return diffs
+
+
+def hub_functions(repo: SyntheticRepo, codebase: Codebase):
+    return [codebase.get_file(repo.module_path(i)).get_function(f"func{i}") for i in repo.hubs()]
+
+
+def rename_hub_functions(repo: SyntheticRepo, codebase: Codebase) -> None:
+    for function in hub_functions(repo, codebase):
+        function.rename(f"{function.name}_renamed")
+
+
+def build_codebase(op: LocalRepoOperator, language: ProgrammingLanguage) -> Codebase:
+    config = CodebaseConfig(feature_flags=CodebaseFeatureFlags())
+    return Codebase(projects=[ProjectConfig(repo_operator=op, programming_language=language)], config=config)
+
+
+@pytest.mark.benchmark(group="sdk-benchmark-synthetic-build", min_time=1, max_time=5, disable_gc=True)
+@pytest.mark.parametrize("language", LANGUAGES, ids=lambda language: language.value)
+def test_synthetic_cold_build(language: ProgrammingLanguage, tmp_path, benchmark, record_config):
+    repo = SyntheticRepo(CONFIG, language)
+    files = repo.generate()
+    record_config(repo)
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmp_path), files=files)
+    codebase = benchmark.pedantic(build_codebase, args=(op, language), rounds=3)
+    assert len(codebase.files) == len(files)
+
+
+@pytest.mark.benchmark(group="sdk-benchmark-synthetic-apply-diffs", min_time=0.1, max_time=5, disable_gc=True)
+@pytest.mark.parametrize("num_diffs", [1, 100, 1000])
+def test_synthetic_apply_diffs(num_diffs: int, synthetic, benchmark, record_config):
+    repo, files, codebase = synthetic
+    record_config(repo)
+    revisions = itertools.count(1)
+
+    def setup():
+        # Every round edits the original content, so it replaces the function added by the previous round
+        return (write_files(codebase, repo.edit(files, num_diffs, next(revisions))),), {}
+
+    try:
+        benchmark.pedantic(codebase.ctx.apply_diffs, setup=setup, rounds=3)
+        assert codebase.get_file(repo.module_path(num_diffs - 1)).get_function("edited3")
+    finally:
+        codebase.ctx.apply_diffs(write_files(codebase, {filepath: files[filepath] for filepath in repo.module_paths()[:num_diffs]}))
+
+
+@pytest.mark.benchmark(group="sdk-benchmark-synthetic-usages", min_time=0.1, max_time=5, disable_gc=True)
+def test_synthetic_usages(synthetic, benchmark, record_config):
+    repo, _, codebase = synthetic
+    record_config(repo)
+    functions = hub_functions(repo, codebase)
+    counts = benchmark(lambda: [len(function.usages) for function in functions])
+    assert all(counts)
+
+
+@pytest.mark.benchmark(group="sdk-benchmark-synthetic-dependencies", min_time=0.1, max_time=5, disable_gc=True)
+@pytest.mark.parametrize("max_depth", [1, CONFIG.hierarchy_depth])
+def test_synthetic_dependencies(max_depth: int, synthetic, benchmark, record_config):
+    repo, _, codebase = synthetic
+    record_config(repo)
+    classes = codebase.classes
+    dependencies = benchmark(lambda: [cls.dependencies(max_depth=max_depth) for cls in classes])
+    assert any(dependencies)
+
+
+@pytest.mark.benchmark(group="sdk-benchmark-synthetic-rename", min_time=0.1, max_time=5, disable_gc=True)
+def test_synthetic_bulk_rename(synthetic, benchmark, record_config):
+    repo, _, codebase = synthetic
+    record_config(repo)
+    try:
+        benchmark.pedantic(rename_hub_functions, args=(repo, codebase), setup=codebase.reset, rounds=3)
+    finally:
+        codebase.reset()
+
+
+@pytest.mark.benchmark(group="sdk-benchmark-synthetic-commit", min_time=0.1, max_time=5, disable_gc=True)
+def test_synthetic_commit_transactions(synthetic, benchmark, record_config):
+    repo, _, codebase = synthetic
+    record_config(repo)
+
+    def setup():
+        codebase.reset()
+        rename_hub_functions(repo, codebase)
+
+    try:
+        benchmark.pedantic(codebase.ctx.commit_transactions, setup=setup, rounds=3)
+        assert codebase.get_file(repo.module_path(0)).get_function("func0_renamed")
+    finally:
+        codebase.reset()
+
+
+@pytest.mark.benchmark(group="sdk-benchmark-synthetic-reset", min_time=0.1, max_time=5, disable_gc=True)
+def test_synthetic_reset(synthetic, benchmark, record_config):
+    repo, _, codebase = synthetic
+    record_config(repo)
+
+    def setup():
+        rename_hub_functions(repo, codebase)
+        codebase.commit()
+
+    benchmark.pedantic(codebase.reset, setup=setup, rounds=3)
+    assert codebase.get_file(repo.module_path(0)).get_function("func0")
@@ -1,10 +1,17 @@
 """Tests covering the core abstractions of GraphSitter. Should run very fast since it only parses strings"""
 
 import itertools
+import os
+from unittest.mock import patch
+
+import pytest
 
 from codegen.sdk.codebase.codebase_context import CodebaseContext
+from codegen.sdk.codebase.config import TestFlags
 from codegen.sdk.codebase.factory.get_session import get_codebase_session
-from codegen.sdk.enums import EdgeType
+from codegen.sdk.codebase.reparse import TextEdit
+from codegen.sdk.codebase.tree_cache import TreeNotFoundError
+from codegen.sdk.enums import EdgeType, NodeType
 
 
 def test_codebase_with_wrapper(tmpdir) -> None:
@@ -58,3 +65,278 @@ class MySubClass(MyClass):
         assert len(import_resolution_edges) == 4
         assert len(file_contains_node_edges) == 14
         assert len(symbol_usage_edges) == 6
+
+
+def test_codebase_get_nodes_by_type(tmpdir) -> None:
+    files = {
+        "a.py": "import os\nfrom b import helper\n\ndef main():\n    return helper(os.getcwd())\n",
+        "b.py": "def helper(x):\n    return x\n\nclass Helper:\n    pass\n",
+    }
+
+    def by_type(ctx: CodebaseContext) -> dict[NodeType, list[int]]:
+        return {node_type: [node.node_id for node in ctx.get_nodes(node_type)] for node_type in NodeType}
+
+    def by_filter(ctx: CodebaseContext) -> dict[NodeType, list[int]]:
+        return {node_type: list(ctx._graph.filter_nodes(lambda node: node.node_type == node_type)) for node_type in NodeType}
+
+    with get_codebase_session(tmpdir=tmpdir, files=files) as codebase:
+        assert by_type(codebase.ctx) == by_filter(codebase.ctx)
+        assert len(codebase.ctx.get_nodes(exclude_type=NodeType.FILE)) == len(codebase.ctx.nodes) - 2
+
+        # Mutating the returned list does not affect the graph
+        codebase.ctx.get_nodes(NodeType.FILE).clear()
+        assert len(codebase.files) == 2
+
+        codebase.get_file("b.py").remove()
+        codebase.create_file("c.py", "import sys\n\nclass C:\n    def f(self):\n        return sys.argv\n")
+        codebase.commit()
+        assert by_type(codebase.ctx) == by_filter(codebase.ctx)
+        assert {file.filepath for file in codebase.files} == {"a.py", "c.py"}
+
+
+def test_codebase_neighbours_by_edge_type(tmpdir) -> None:
+    files = {
+        "a.py": "from b import helper\n\ndef main():\n    return helper() + helper()\n\ndef other():\n    return helper()\n",
+        "b.py": "def helper():\n    return 1\n",
+    }
+
+    def neighbours(ctx: CodebaseContext) -> dict:
+        return {
+            (node_id, edge_type): (
+                [node.node_id for node in ctx.predecessors(node_id, edge_type)],
+                [node.node_id for node in ctx.successors(node_id, edge_type=edge_type)],
+                [(u, v, edge) for u, v, edge in ctx.in_edges(node_id, edge_type)],
+                [(u, v, edge) for u, v, edge in ctx.out_edges(node_id, edge_type)],
+            )
+            for node_id in ctx._graph.node_indices()
+            for edge_type in EdgeType
+        }
+
+    def by_position(node):
+        return node.ts_node.start_byte, node.node_id
+
+    def neighbours_by_filter(ctx: CodebaseContext) -> dict:
+        return {
+            (node_id, edge_type): (
+                [node.node_id for node in sorted(ctx._graph.find_predecessors_by_edge(node_id, lambda edge: edge.type == edge_type), key=by_position)],
+                [node.node_id for node in sorted(ctx._graph.find_successors_by_edge(node_id, lambda edge: edge.type == edge_type), key=by_position)],
+                [edge for edge in ctx._graph.in_edges(node_id) if edge[2].type == edge_type],
+                [edge for edge in ctx._graph.out_edges(node_id) if edge[2].type == edge_type],
+            )
+            for node_id in ctx._graph.node_indices()
+            for edge_type in EdgeType
+        }
+
+    with get_codebase_session(tmpdir=tmpdir, files=files) as codebase:
+        helper = codebase.get_function("helper")
+        assert {usage.usage_symbol.name for usage in helper.usages} == {"main", "other", "helper"}
+        assert neighbours(codebase.ctx) == neighbours_by_filter(codebase.ctx)
+
+        codebase.get_function("other").remove()
+        codebase.commit()
+        helper = codebase.get_function("helper")
+        assert {usage.usage_symbol.name for usage in helper.usages} == {"main", "helper"}
+        assert neighbours(codebase.ctx) == neighbours_by_filter(codebase.ctx)
+
+
+def test_codebase_dependency_stats(tmpdir) -> None:
+    files = {
+        "a.py": "from b import helper\n\ndef main():\n    return helper()\n\nclass A:\n    def run(self):\n        return main()\n",
+        "b.py": "def helper():\n    return 1\n",
+    }
+    with get_codebase_session(tmpdir=tmpdir, files=files) as codebase:
+        # A full build computes the dependencies of every node exactly once
+        stats = codebase.ctx.dependency_stats
+        assert stats.recomputed == len(codebase.ctx.nodes)
+        assert sum(stats.recomputed_by_type.values()) == stats.recomputed
+        assert stats.recomputed_by_type[NodeType.FILE] == 2
+        assert set(stats.seconds_by_type) == set(stats.recomputed_by_type)
+
+        codebase.get_function("helper").rename("assist")
+        codebase.commit()
+        stats = codebase.ctx.dependency_stats
+        assert 0 < stats.recomputed <= len(codebase.ctx.nodes)
+        assert codebase.get_function("assist").usages[0].usage_symbol.name == "main"
+
+
+def test_codebase_build_reads_files_once(tmpdir, monkeypatch) -> None:
+    files = {
+        "a.py": "from pkg.b import helper\n\nhelper()\n",
+        "pkg/b.py": "def helper():\n    return 1\n",
+        "docs/README.md": "# Docs\n",
+        "unicode dir/ä.py": "x = 1\n",
+    }
+    with get_codebase_session(tmpdir=tmpdir, files=files) as codebase:
+        op = codebase.ctx.projects[0].repo_operator
+        assert sorted(op.get_filepaths_for_repo(None)) == sorted(files)
+        assert {file.filepath for file in codebase.files} == {"a.py", "pkg/b.py", "unicode dir/ä.py"}
+        # Directories without source files are part of the tree as well
+        assert codebase.ctx.to_absolute("docs") in codebase.ctx.directories
+        assert codebase.get_directory("unicode dir").files[0].name == "ä"
+
+        reads = []
+        monkeypatch.setattr(type(op), "get_file", lambda self, path: reads.append(path))
+        codebase.ctx.build_graph(op)
+        assert reads == []
+        assert codebase.get_function("helper").usages[0].usage_symbol.filepath == "a.py"
+
+
+def test_codebase_compact_editables(tmpdir) -> None:
+    files = {f"pkg/file{i}.py": f"from pkg.file{i - 1} import func{i - 1}\n\n@decorator\ndef func{i}(x=1):\n    return func{i - 1}(x)\n" for i in range(1, 20)}
+    files["pkg/file0.py"] = "def func0(x):\n    return x\n"
+    flags = TestFlags.model_copy(update={"compact_editables": True, "tree_cache_size": 4})
+
+    def signature(codebase):
+        return [(function.name, function.source, function.start_point, [usage.match.source for usage in function.usages]) for function in codebase.functions]
+
+    with get_codebase_session(tmpdir=tmpdir / "regular", files=files) as codebase:
+        regular = signature(codebase)
+    with get_codebase_session(tmpdir=tmpdir / "compact", files=files, feature_flags=flags) as codebase:
+        assert not codebase.ctx.uncompacted_editables
+        assert "ts_node" not in codebase.get_function("func3").__dict__
+        assert len(codebase.ctx.tree_cache) <= 4
+        assert signature(codebase) == regular
+
+        # Nodes are re-acquired from the content the file was parsed from, and re-parsed on the next sync
+        codebase.get_function("func3").rename("renamed")
+        codebase.commit()
+        assert "def renamed(x=1):\n    return func2(x)" in codebase.get_function("renamed").source
+        assert "renamed(x)" in codebase.get_function("func4").source
+
+        # Evicted trees are parsed again from the file, unless it changed since it was parsed
+        func1 = codebase.get_function("func1")
+        codebase.ctx.tree_cache._trees.clear()
+        assert func1.ts_node.text.startswith(b"def func1")
+        codebase.ctx.io.write_text(func1.file.path, "func1 = 1\n")
+        codebase.ctx.tree_cache._trees.clear()
+        with pytest.raises(TreeNotFoundError):
+            func1.ts_node
+        codebase.ctx.io.untrack_file(func1.file.path)
+
+
+def test_codebase_incremental_reparse(tmpdir) -> None:
+    files = {
+        "a.py": (
+            "from b import helper\n\ndef first():\n    return helper()\n\n\n"
+            "class Service:\n    def run(self):\n        return first() + helper()\n\n    def stop(self):\n        return 2\n\n\n"
+            "def last(x):\n    return x + helper()\n\nVALUE = last(1)\n"
+        ),
+        "b.py": "def helper():\n    return 1\n",
+    }
+    flags = TestFlags.model_copy(update={"incremental_reparse": True})
+
+    def signature(codebase):
+        return [
+            (symbol.name, symbol.source, symbol.start_point, sorted((usage.usage_symbol.name, usage.match.start_byte) for usage in symbol.usages))
+            for file in codebase.files
+            for symbol in file.symbols(nested=True)
+        ]
+
+    with get_codebase_session(tmpdir=tmpdir / "incremental", files=files, feature_flags=flags) as codebase:
+        first, last, value = codebase.get_function("first"), codebase.get_function("last"), codebase.get_symbol("VALUE")
+        node_ids = [symbol.node_id for symbol in (first, last, value)]
+        codebase.get_class("Service").get_method("stop").edit("def halt(self):\n        x = 2\n        return x")
+        codebase.commit()
+        # Symbols before and after the edited statement are kept, and the ones after it are moved
+        assert codebase.get_function("first") is first
+        assert codebase.get_function("last") is last
+        assert [symbol.node_id for symbol in (first, last, value)] == node_ids
+        assert last.source == "def last(x):\n    return x + helper()"
+        assert value.start_point == (18, 0)
+        incremental = signature(codebase)
+        contents = {file.filepath: file.content for file in codebase.files}
+
+        codebase.reset()
+        assert codebase.get_class("Service").get_method("stop") is not None
+        assert last.start_point == (14, 0)
+    with get_codebase_session(tmpdir=tmpdir / "regular", files=contents) as codebase:
+        assert signature(codebase) == incremental
+
+
+def test_codebase_incremental_reparse_multiple_edits(tmpdir) -> None:
+    files = {
+        "a.py": (
+            "from b import helper\n\ndef first():\n    return helper()\n\n\n"
+            "class Service:\n    def run(self):\n        return first() + helper()\n\n\n"
+            "def last(x):\n    return x + helper()\n\nVALUE = last(1)\n"
+        ),
+        "b.py": "def helper():\n    return 1\n",
+    }
+    flags = TestFlags.model_copy(update={"incremental_reparse": True})
+
+    def signature(codebase):
+        return [
+            (symbol.name, symbol.source, symbol.start_point, sorted((usage.usage_symbol.name, usage.match.start_byte) for usage in symbol.usages))
+            for symbol in codebase.get_file("a.py").symbols(nested=True)
+        ]
+
+    with get_codebase_session(tmpdir=tmpdir / "incremental", files=files, feature_flags=flags) as codebase:
+        service, value = codebase.get_class("Service"), codebase.get_symbol("VALUE")
+        codebase.get_function("first").edit("def first():\n    x = helper()\n    return x")
+        codebase.get_function("last").edit("def last(x, y=0):\n    return x + y")
+        # The re-parse uses the edits of the commit rather than comparing the old and new content
+        with patch.object(TextEdit, "between", side_effect=AssertionError):
+            codebase.commit()
+        assert codebase.ctx.transaction_manager.edits == {}
+        # The statements between and after the edits are kept, and moved by the edits before them
+        assert codebase.get_class("Service") is service
+        assert codebase.get_symbol("VALUE") is value
+        assert service.start_point == (7, 0)
+        assert value.source == "VALUE = last(1)"
+        incremental = signature(codebase)
+        contents = {file.filepath: file.content for file in codebase.files}
+    with get_codebase_session(tmpdir=tmpdir / "regular", files=contents) as codebase:
+        assert signature(codebase) == incremental
+
+
+def test_codebase_build_skips_unreadable_tracked_files(tmpdir) -> None:
+    files = {
+        "a.py": "from b import helper\n\nhelper()\n",
+        "b.py": "def helper():\n    return 1\n",
+        "deleted.py": "x = 1\n",
+    }
+    with get_codebase_session(tmpdir=tmpdir, files=files) as codebase:
+        op = codebase.ctx.projects[0].repo_operator
+        # Still tracked by git, but gone from the working tree
+        os.remove(codebase.ctx.to_absolute("deleted.py"))
+        assert "deleted.py" in op.get_filepaths_for_repo(None)
+
+        codebase.ctx.build_graph(op)
+        assert {file.filepath for file in codebase.files} == {"a.py", "b.py"}
+        assert codebase.get_function("helper").usages[0].usage_symbol.filepath == "a.py"
+
+
+@pytest.mark.parametrize(
+    "files",
+    [
+        {
+            "a.py": "from b import helper\n\ndef main():\n    return helper()\n",
+            "b.py": "from c import helper\n",
+            "c.py": "def helper():\n    return 1\n",
+        },
+        {
+            "a.py": "from b import helper\n\ndef main():\n    return helper()\n",
+            "b.py": "from d import helper\n",
+            "d.py": "from e import helper as helper\n",
+            "e.py": "from c import helper\n",
+            "c.py": "def helper():\n    return 1\n",
+        },
+        {
+            "a.py": "from b import *\n\ndef main():\n    return helper()\n",
+            "b.py": "from d import *\n",
+            "d.py": "from c import *\n",
+            "c.py": "def helper():\n    return 1\n",
+        },
+    ],
+    ids=["re_export", "chained_re_exports", "wildcard_imports"],
+)
+def test_codebase_sync_uncaches_transitive_dependents(tmpdir, files: dict[str, str]) -> None:
+    with get_codebase_session(tmpdir=tmpdir, files=files) as codebase:
+        call = codebase.get_function("main").function_calls[0]
+        assert [[parameter.name for parameter in function.parameters] for function in call.function_definitions] == [[]]
+
+        # a.py only depends on c.py through the re-export in b.py, so its resolution must be cleared as well
+        codebase.get_file("c.py").edit("def helper(x):\n    return x\n")
+        codebase.commit()
+        # a.py is not reparsed, so the call keeps the definitions cached before the sync unless they are cleared
+        assert [[parameter.name for parameter in function.parameters] for function in call.function_definitions] == [["x"]]
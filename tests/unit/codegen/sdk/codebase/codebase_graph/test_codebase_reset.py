@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 
 from codegen.sdk.core.codebase import Codebase
@@ -344,3 +346,32 @@ def test_codebase_reset_complex_changes(codebase: Codebase, assert_expected):
 
     codebase.reset()
     assert_expected(codebase)
+
+
+@pytest.mark.parametrize(
+    "original, expected",
+    [
+        (
+            {"a.py": "def f():\n    pass\n", "b.py": "from a import f\n\nf()\n"},
+            {"a.py": "def f():\n    pass\n", "b.py": "from a import f\n\nf()\n"},
+        ),
+    ],
+    indirect=["original", "expected"],
+)
+def test_codebase_reset_restores_checkpoint(codebase: Codebase, assert_expected):
+    f = codebase.get_function("f")
+    usages = f.usages
+    f.rename("g")
+    codebase.commit()
+    codebase.create_file("c.py", "from a import g\n")
+    codebase.commit()
+    assert codebase.get_function("f", optional=True) is None
+
+    # The graph is restored from the checkpoint taken before the first sync, rather than by re-applying reversed diffs
+    with patch.object(codebase.ctx, "_revert_diffs") as revert_diffs:
+        codebase.reset()
+    revert_diffs.assert_not_called()
+    assert codebase.get_function("f") is f
+    assert codebase.get_file("c.py", optional=True) is None
+    assert f.usages == usages
+    assert_expected(codebase)
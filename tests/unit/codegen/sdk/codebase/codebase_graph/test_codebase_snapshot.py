@@ -0,0 +1,215 @@
+import gzip
+import io
+import pickle
+import stat
+from pathlib import Path
+
+import pytest
+
+from codegen.git.repo_operator.local_repo_operator import LocalRepoOperator
+from codegen.sdk.codebase.codebase_context import CodebaseContext
+from codegen.sdk.codebase.config import CodebaseConfig, ProjectConfig, TestFlags
+from codegen.sdk.codebase.snapshot import DIGEST_SIZE, KEY_FILENAME, GraphSnapshotStore, _SnapshotPickler, _SnapshotUnpickler
+from codegen.sdk.core.codebase import Codebase
+from codegen.shared.enums.programming_language import ProgrammingLanguage
+
+
+def graph_signature(codebase: Codebase):
+    """Node ids depend on the order nodes were added in, so compare graphs by node location instead"""
+
+    def key(node_id):
+        node = codebase.ctx.get_node(node_id)
+        ts_node = getattr(node, "ts_node", None)
+        return type(node).__name__, getattr(node, "name", None), node.filepath, ts_node and (ts_node.start_byte, ts_node.end_byte)
+
+    nodes = sorted(key(node_id) for node_id in codebase.ctx._graph.node_indices())
+    edges = sorted((key(u), key(v), edge.type, edge.usage.match.source if edge.usage else None) for u, v, edge in codebase.ctx._graph.weighted_edge_list())
+    return nodes, edges
+
+
+def create_codebase(op: LocalRepoOperator, snapshot_dir, programming_language: ProgrammingLanguage = ProgrammingLanguage.PYTHON, **flags) -> Codebase:
+    config = CodebaseConfig(feature_flags=TestFlags.model_copy(update={"snapshot_dir": str(snapshot_dir), "save_snapshots": True, **flags}))
+    return Codebase(projects=[ProjectConfig(repo_operator=op, programming_language=programming_language)], config=config)
+
+
+@pytest.fixture
+def no_build_graph(monkeypatch):
+    def build_graph(self, repo_operator):
+        msg = "Graph should have been restored from a snapshot"
+        raise AssertionError(msg)
+
+    return lambda: monkeypatch.setattr(CodebaseContext, "build_graph", build_graph)
+
+
+def test_snapshot_same_commit(tmpdir, no_build_graph) -> None:
+    files = {
+        "a.py": "from b import helper\n\nclass A:\n    def run(self, x: int):\n        return helper(x)\n",
+        "b.py": "\n\ndef helper(x):\n    return [y for y in range(x)]\n",
+    }
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmpdir / "repo"), files=files)
+    built = create_codebase(op, tmpdir / "snapshots")
+    store = GraphSnapshotStore(tmpdir / "snapshots", built.ctx)
+    assert store.commits() == [op.head_commit.hexsha]
+
+    no_build_graph()
+    restored = create_codebase(op, tmpdir / "snapshots")
+    # Files are only parsed once their nodes are needed
+    assert "ts_node" not in restored.get_function("helper").__dict__
+    assert graph_signature(restored) == graph_signature(built)
+    helper = restored.get_function("helper")
+    assert [usage.match.source for usage in helper.usages] == [usage.match.source for usage in built.get_function("helper").usages]
+    assert restored.get_class("A").get_method("run").parameters[1].type.source == "int"
+
+    # The restored graph is fully editable
+    helper.rename("assist")
+    restored.commit()
+    assert restored.get_file("a.py").content == files["a.py"].replace("helper", "assist")
+
+
+def test_snapshot_nearby_commit(tmpdir, no_build_graph) -> None:
+    files = {
+        "a.py": "from b import helper\n\ndef main():\n    return helper()\n",
+        "b.py": "def helper():\n    return 1\n",
+        "c.py": "def unused():\n    return 2\n",
+    }
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmpdir / "repo"), files=files)
+    create_codebase(op, tmpdir / "snapshots")
+
+    # Move HEAD one commit ahead of the snapshot
+    (tmpdir / "repo" / "b.py").write_text("def helper():\n    return 3\n\ndef other():\n    return helper()\n", encoding="utf-8")
+    (tmpdir / "repo" / "c.py").remove()
+    (tmpdir / "repo" / "d.py").write_text("from b import other\n\nother()\n", encoding="utf-8")
+    op.git_cli.git.add(A=True)
+    op.git_cli.index.commit("Change files")
+    cold = create_codebase(op, tmpdir / "cold")
+
+    no_build_graph()
+    restored = create_codebase(op, tmpdir / "snapshots")
+    assert {file.filepath for file in restored.files} == {"a.py", "b.py", "d.py"}
+    assert restored.get_function("other").usages[0].usage_symbol.filepath == "d.py"
+    assert restored.ctx.synced_commit == op.head_commit
+    assert graph_signature(restored) == graph_signature(cold)
+
+    # A snapshot is saved for the new commit as well
+    assert op.head_commit.hexsha in GraphSnapshotStore(tmpdir / "snapshots", restored.ctx).commits()
+    again = create_codebase(op, tmpdir / "snapshots")
+    assert graph_signature(again) == graph_signature(cold)
+
+
+def test_snapshot_uncommitted_changes(tmpdir, no_build_graph) -> None:
+    files = {
+        "a.py": "from b import helper\n\ndef main():\n    return helper()\n",
+        "b.py": "def helper():\n    return 1\n",
+    }
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmpdir / "repo"), files=files)
+    # Taken with b.py differing from the commit, so the snapshot has to carry its content
+    (tmpdir / "repo" / "b.py").write_text("def helper():\n    return 2\n\ndef other():\n    return helper()\n", encoding="utf-8")
+    create_codebase(op, tmpdir / "snapshots")
+
+    # Back to the committed content, and a change git has not seen yet
+    (tmpdir / "repo" / "b.py").write_text(files["b.py"], encoding="utf-8")
+    (tmpdir / "repo" / "a.py").write_text("from b import helper\n\ndef main():\n    return helper() + helper()\n", encoding="utf-8")
+    cold = create_codebase(op, tmpdir / "cold")
+
+    no_build_graph()
+    restored = create_codebase(op, tmpdir / "snapshots", save_snapshots=False)
+    assert graph_signature(restored) == graph_signature(cold)
+    assert restored.get_function("other", optional=True) is None
+    assert len(restored.get_function("helper").usages) == len(cold.get_function("helper").usages) == 3
+
+
+def test_snapshot_points_round_trip(tmpdir) -> None:
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmpdir / "repo"), files={"a.py": "x = 0\n"})
+    codebase = create_codebase(op, tmpdir / "snapshots", save_snapshots=False)
+    ts_node = codebase.get_symbol("x").ts_node
+    values = (ts_node.start_point, ts_node.range)
+    f = io.BytesIO()
+    _SnapshotPickler(f, codebase.ctx).dump(values)
+    f.seek(0)
+    assert _SnapshotUnpickler(f, codebase.ctx).load() == values
+
+
+def test_snapshot_typescript(tmpdir, no_build_graph) -> None:
+    files = {
+        "tsconfig.json": '{"compilerOptions": {"baseUrl": ".", "paths": {"@utils/*": ["src/utils/*"]}}}',
+        "src/utils/math.ts": "export function add(a: number, b: number): number {\n  return a + b;\n}\n",
+        "src/index.ts": "import { add } from '@utils/math';\n\nexport const total = add(1, 2);\n",
+    }
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmpdir / "repo"), files=files)
+    built = create_codebase(op, tmpdir / "snapshots", ProgrammingLanguage.TYPESCRIPT)
+
+    no_build_graph()
+    restored = create_codebase(op, tmpdir / "snapshots", ProgrammingLanguage.TYPESCRIPT)
+    assert graph_signature(restored) == graph_signature(built)
+    assert restored.get_file("src/index.ts").ts_config is not None
+    assert restored.get_function("add").usages[0].usage_symbol.name == "total"
+
+
+def test_snapshot_corrupt_falls_back_to_build(tmpdir) -> None:
+    files = {"a.py": "def a():\n    return 1\n"}
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmpdir / "repo"), files=files)
+    built = create_codebase(op, tmpdir / "snapshots")
+    GraphSnapshotStore(tmpdir / "snapshots", built.ctx).path_for(op.head_commit.hexsha).write_bytes(b"not a snapshot")
+
+    rebuilt = create_codebase(op, tmpdir / "snapshots")
+    assert graph_signature(rebuilt) == graph_signature(built)
+
+
+def test_snapshot_shared_across_graph_independent_flags(tmpdir, no_build_graph) -> None:
+    files = {"a.py": "from b import helper\n\ndef a():\n    return helper()\n", "b.py": "def helper():\n    return 1\n"}
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmpdir / "repo"), files=files)
+    built = create_codebase(op, tmpdir / "snapshots")
+    changed = create_codebase(op, tmpdir / "snapshots", method_usages=False)
+    assert GraphSnapshotStore(tmpdir / "snapshots", changed.ctx).directory != GraphSnapshotStore(tmpdir / "snapshots", built.ctx).directory
+
+    no_build_graph()
+    restored = create_codebase(op, tmpdir / "snapshots", tree_cache_size=4)
+    assert graph_signature(restored) == graph_signature(built)
+
+
+class FailOnUnpickle:
+    def __reduce__(self):
+        return pytest.fail, ("Unsigned snapshot was unpickled",)
+
+
+def test_snapshot_unsigned_is_not_unpickled(tmpdir) -> None:
+    files = {"a.py": "def a():\n    return 1\n"}
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmpdir / "repo"), files=files)
+    built = create_codebase(op, tmpdir / "snapshots")
+    store = GraphSnapshotStore(tmpdir / "snapshots", built.ctx)
+    # A valid snapshot that was not signed with the store's key, which fails the test if it is ever unpickled
+    payload = gzip.compress(pickle.dumps(FailOnUnpickle()))
+    store.path_for(op.head_commit.hexsha).write_bytes(bytes(DIGEST_SIZE) + payload)
+
+    rebuilt = create_codebase(op, tmpdir / "snapshots")
+    assert graph_signature(rebuilt) == graph_signature(built)
+
+
+def test_snapshot_key_must_be_private(tmpdir) -> None:
+    files = {"a.py": "def a():\n    return 1\n"}
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmpdir / "repo"), files=files)
+    built = create_codebase(op, tmpdir / "snapshots")
+    key_path = Path(tmpdir / "snapshots" / KEY_FILENAME)
+    assert stat.S_IMODE(key_path.stat().st_mode) == 0o600
+
+    key_path.chmod(0o644)
+    with pytest.raises(PermissionError):
+        GraphSnapshotStore(tmpdir / "snapshots", built.ctx)
+    rebuilt = create_codebase(op, tmpdir / "snapshots")
+    assert graph_signature(rebuilt) == graph_signature(built)
+
+
+def test_snapshot_find_closest(tmpdir) -> None:
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmpdir / "repo"), files={"a.py": "x = 0\n"})
+    commits = [op.head_commit.hexsha]
+    for i in range(1, 4):
+        (tmpdir / "repo" / "a.py").write_text(f"x = {i}\n", encoding="utf-8")
+        op.git_cli.git.add(A=True)
+        commits.append(op.git_cli.index.commit(f"Change {i}").hexsha)
+    store = GraphSnapshotStore(tmpdir / "snapshots", create_codebase(op, tmpdir / "snapshots", save_snapshots=False).ctx)
+    store.directory.mkdir(exist_ok=True)
+    for commit in (commits[0], commits[1], "0" * 40):
+        store.path_for(commit).touch()
+
+    assert store.find_closest(op.git_cli, commits[3]) == commits[1]
+    assert store.find_closest(op.git_cli, commits[1]) == commits[1]
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from codegen.sdk.codebase.io.worktree_io import WorktreeIO
+
+
+def test_worktree_io_redirects_repo_paths(tmpdir) -> None:
+    repo_path = Path(tmpdir) / "repo"
+    worktree_path = Path(tmpdir) / "worktree"
+    repo_path.mkdir()
+    worktree_path.mkdir()
+    (repo_path / "a.py").write_text("a = 1")
+    (worktree_path / "a.py").write_text("a = 1")
+    io = WorktreeIO(repo_path, worktree_path)
+
+    io.write_text(repo_path / "a.py", "a = 2")
+    assert io.read_text(repo_path / "a.py") == "a = 2"
+    io.save_files()
+
+    assert (worktree_path / "a.py").read_text() == "a = 2"
+    assert (repo_path / "a.py").read_text() == "a = 1"
+    assert io.read_text(repo_path / "a.py") == "a = 2"
+
+    io.delete_file(repo_path / "a.py")
+    assert not io.file_exists(repo_path / "a.py")
+    assert (repo_path / "a.py").exists()
+
+
+def test_worktree_io_leaves_outside_paths(tmpdir) -> None:
+    outside = Path(tmpdir) / "outside.py"
+    io = WorktreeIO(Path(tmpdir) / "repo", Path(tmpdir) / "worktree")
+
+    io.write_text(outside, "b = 1")
+    io.save_files()
+
+    assert outside.read_text() == "b = 1"
@@ -1,9 +1,11 @@
+import random
 from os import PathLike
 from pathlib import Path
 
 from codegen.sdk.codebase.factory.get_session import get_codebase_session
 from codegen.sdk.codebase.transaction_manager import (
     TransactionError,
+    TransactionIndex,
     TransactionManager,
 )
 from codegen.sdk.codebase.transactions import EditTransaction, InsertTransaction, RemoveTransaction
@@ -665,3 +667,115 @@ def content():
         assert queue[2].new_content == "Ok"
         assert isinstance(queue[3], RemoveTransaction)
         assert isinstance(queue[4], InsertTransaction)
+
+
+class WritableMockFile:
+    def __init__(self, path: PathLike, content: str) -> None:
+        self.content_bytes = bytes(content, "utf-8")
+        self.path = Path(path)
+        self.writes = 0
+
+    def write_bytes(self, content_bytes: bytes) -> None:
+        self.content_bytes = content_bytes
+        self.writes += 1
+
+
+def create_transactions(file: WritableMockFile, calls: list[str]) -> list:
+    return [
+        RemoveTransaction(start_byte=90, end_byte=95, file=file, exec_func=lambda: calls.append("remove")),
+        InsertTransaction(insert_byte=80, file=file, new_content=lambda: f"<{len(calls)}>", exec_func=lambda: calls.append("insert")),
+        EditTransaction(start_byte=70, end_byte=85, file=file, new_content="overlapping"),
+        InsertTransaction(insert_byte=50, file=file, new_content="a", priority=1),
+        InsertTransaction(insert_byte=50, file=file, new_content="b", priority=2),
+        RemoveTransaction(start_byte=40, end_byte=50, file=file),
+        EditTransaction(start_byte=10, end_byte=30, file=file, new_content="edit"),
+        InsertTransaction(insert_byte=0, file=file, new_content="start"),
+        InsertTransaction(insert_byte=120, file=file, new_content="past the end"),
+        RemoveTransaction(start_byte=98, end_byte=110, file=file),
+    ]
+
+
+def test_commit_single_write(tmpdir) -> None:
+    FILENAME = Path("filename")
+    content = "".join(chr(ord("a") + i % 26) for i in range(100))
+
+    # Execute transactions one by one
+    expected_calls = []
+    expected_file = WritableMockFile(FILENAME, content)
+    transactions = sorted(create_transactions(expected_file, expected_calls), key=lambda t: t._to_sort_key())
+    for transaction in transactions:
+        transaction.execute()
+
+    # Commit the same transactions through the TransactionManager
+    transaction_manager = TransactionManager()
+    calls = []
+    file = WritableMockFile(FILENAME, content)
+    for transaction in create_transactions(file, calls):
+        transaction_manager.add_transaction(transaction, solve_conflicts=False)
+    diffs = transaction_manager.commit({FILENAME})
+
+    assert file.content_bytes == expected_file.content_bytes
+    assert calls == expected_calls == ["remove", "insert"]
+    assert file.writes == 1
+    assert len(diffs) == 1
+    assert diffs[0].old_content == bytes(content, "utf-8")
+
+
+def test_transaction_index_matches_scan(tmpdir) -> None:
+    FILENAME = Path("filename")
+    file = MockFile(FILENAME)
+    rng = random.Random(0)
+    queue = []
+    index = TransactionIndex(queue)
+    for i in range(1000):
+        start = rng.randrange(100)
+        # Including transactions spanning the whole file, like a full replace
+        end = start + rng.choice([0, 0, 1, 5, 20, 100])
+        if end == start:
+            transaction = InsertTransaction(insert_byte=start, file=file, new_content=str(i))
+        else:
+            transaction = RemoveTransaction(start_byte=start, end_byte=end, file=file)
+        if i % 7 == 3:
+            index.insert(rng.randrange(len(queue) + 1), transaction)
+        else:
+            index.append(transaction)
+        if i % 5 == 4:
+            index.remove(rng.choice(queue))
+        if i % 3 == 0:
+            # Requeue a transaction, which must not be reported twice
+            requeued = rng.choice(queue)
+            idx = next(j for j, queued in enumerate(queue) if queued is requeued)
+            assert index.remove(requeued) == idx
+            index.append(requeued)
+        if i % 50 == 49:
+            index.sort()
+
+        start = rng.randrange(100)
+        end = start + rng.choice([0, 1, 10])
+        assert index.overlapping(start, end) == [t for t in queue if start < t.end_byte and end > t.start_byte]
+        assert index.containing(start, end) == next((t for t in queue if start >= t.start_byte and end <= t.end_byte), None)
+        assert index.starting_at(start) == [t for t in queue if t.start_byte == start]
+        assert all(index.contains(t) for t in queue)
+
+
+def test_num_transactions(tmpdir) -> None:
+    FILENAME = Path("filename")
+
+    # Create TransactionManager
+    transaction_manager = TransactionManager()
+
+    # Create transactions
+    transaction_manager.add_transaction(InsertTransaction(insert_byte=4, file=MockFile(FILENAME), new_content="a"))
+    transaction_manager.add_transaction(InsertTransaction(insert_byte=4, file=MockFile(FILENAME), new_content="a"))
+    transaction_manager.add_transaction(InsertTransaction(insert_byte=8, file=MockFile(FILENAME), new_content="b"))
+    transaction_manager.add_transaction(EditTransaction(start_byte=10, end_byte=12, file=MockFile(FILENAME), new_content="c"))
+    transaction_manager.add_transaction(InsertTransaction(insert_byte=0, file=MockFile(Path("other")), new_content="d"))
+    assert transaction_manager.get_num_transactions() == 4
+
+    # Removes both inserts
+    transaction_manager.add_transaction(RemoveTransaction(start_byte=2, end_byte=9, file=MockFile(FILENAME)))
+    assert transaction_manager.get_num_transactions() == 3
+    assert transaction_manager.get_num_transactions() == sum(len(queue) for queue in transaction_manager.queued_transactions.values())
+
+    transaction_manager.clear_transactions()
+    assert transaction_manager.get_num_transactions() == 0
@@ -167,3 +167,72 @@ def use_both():
         assert len(deps_with_types) == 2
         assert a_class in deps_with_types
         assert b_class in deps_with_types
+
+
+def test_transitive_dependencies_diamond(tmpdir) -> None:
+    """Test transitive dependencies and usages on a diamond shaped graph."""
+    # language=python
+    content = """
+def base():
+    pass
+
+def left():
+    base()
+
+def right():
+    base()
+
+def top():
+    left()
+    right()
+"""
+    with get_codebase_session(tmpdir=tmpdir, files={"test.py": content}) as codebase:
+        file = codebase.get_file("test.py")
+        base = file.get_function("base")
+        left = file.get_function("left")
+        right = file.get_function("right")
+        top = file.get_function("top")
+
+        assert set(top.dependencies(max_depth=3)) == {left, right, base}
+        assert set(base.symbol_usages(max_depth=1)) == {left, right}
+        assert set(base.symbol_usages(max_depth=2)) == {left, right, top}
+
+        # Nodes are ordered by their distance
+        successors = codebase.ctx.transitive_successors(top.node_id)
+        assert set(successors[:2]) == {left, right}
+        assert successors[2:] == [base]
+        assert set(codebase.ctx.transitive_successors(top.node_id, max_depth=1)) == {left, right}
+        assert set(codebase.ctx.transitive_predecessors(base.node_id, cache=True)) == {left, right, top}
+        assert set(codebase.ctx.transitive_predecessors(base.node_id, cache=True)) == {left, right, top}
+        assert codebase.ctx.transitive_predecessors(top.node_id) == []
+
+
+def test_transitive_dependencies_nested_symbols(tmpdir) -> None:
+    """Test dependencies and usages of nested symbols are attributed to the symbols containing them."""
+    # language=python
+    content = """
+def base():
+    pass
+
+class Runner:
+    def run(self):
+        return base()
+
+    def again(self):
+        return self.run()
+
+def main():
+    Runner().run()
+"""
+    with get_codebase_session(tmpdir=tmpdir, files={"test.py": content}) as codebase:
+        file = codebase.get_file("test.py")
+        base = file.get_function("base")
+        runner = file.get_class("Runner")
+        run = runner.get_method("run")
+        main = file.get_function("main")
+
+        # The usage of run within Runner is internal, so Runner only depends on base
+        assert runner.dependencies == [base]
+        assert main.dependencies(max_depth=2) == [base, runner]
+        assert base.symbol_usages == [run]
+        assert base.symbol_usages(max_depth=2) == codebase.ctx.transitive_predecessors(base.node_id, max_depth=2, symbols=True) == [run, main, runner.get_method("again")]
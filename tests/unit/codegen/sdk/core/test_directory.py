@@ -157,6 +157,20 @@ def test_files_property(mock_directory, sub_dir, mock_codebase_context):
     assert new_file in files_list
 
 
+def test_file_count_nested(mock_directory, sub_dir, mock_codebase_context):
+    """Test the cached file counts of every ancestor are updated when a nested directory changes."""
+    assert mock_directory.file_count == 1
+
+    nested_dir = Directory(path=sub_dir.path / "nested", dirpath=str(Path(sub_dir.dirpath) / "nested"), parent=None)
+    sub_dir["nested"] = nested_dir
+    assert nested_dir.parent is sub_dir
+    assert mock_directory.file_count == 1
+
+    nested_dir.add_file(File(filepath=Path("mock_dir/subdir/nested/example_3.py"), ctx=mock_codebase_context))
+    assert sub_dir.file_count == 1
+    assert mock_directory.file_count == 2
+
+
 def test_subdirectories_property(mock_directory, sub_dir):
     """Test the 'subdirectories' property returns all directories recursively."""
     all_subdirs = mock_directory.subdirectories
@@ -1,6 +1,6 @@
 import pytest
 
-from codegen.sdk.codebase.io.file_io import FileIO
+from codegen.sdk.codebase.io.file_io import MMAP_THRESHOLD, FileIO
 
 
 @pytest.fixture
@@ -61,3 +61,17 @@ def test_delete_file(file_io, tmp_path):
 
     assert not test_file.exists()
     assert test_file not in file_io.files
+
+
+@pytest.mark.parametrize("size", [0, 10, MMAP_THRESHOLD + 10])
+def test_read_text(file_io, tmp_path, size):
+    test_file = tmp_path / "test.txt"
+    content = ("é" * size)[:size]
+
+    # Reading should load from disk, mapping large files
+    test_file.write_text(content, encoding="utf-8")
+    assert file_io.read_text(test_file) == content
+
+    # Pending writes take precedence
+    file_io.write_text(test_file, "pending")
+    assert file_io.read_text(test_file) == "pending"
@@ -1,4 +1,7 @@
+import pytest
+
 from codegen.sdk.codebase.factory.get_session import get_codebase_session
+from codegen.sdk.enums import SymbolType
 
 
 def test_codebase_symbols(tmpdir) -> None:
@@ -16,3 +19,75 @@ class MyClass1:
         assert [f.name for f in codebase.functions] == ["top_level_func"]
         assert len(list(codebase.symbols)) == 2
         assert set([s.name for s in codebase.symbols]) == {"top_level_func", "MyClass1"}
+
+
+def test_codebase_get_symbol_by_name(tmpdir) -> None:
+    # language=python
+    content1 = """
+def foo():
+    return 1
+
+class Bar:
+    def foo(self):
+        return 2
+"""
+    # language=python
+    content2 = """
+GLOBAL = 1
+
+def baz():
+    return GLOBAL
+"""
+    with get_codebase_session(tmpdir=tmpdir, files={"file1.py": content1, "file2.py": content2}) as codebase:
+        # Methods are not top level symbols
+        assert codebase.get_function("foo").filepath == "file1.py"
+        assert codebase.get_class("Bar").name == "Bar"
+        assert codebase.get_symbol("GLOBAL").filepath == "file2.py"
+        assert codebase.has_symbol("baz")
+        assert not codebase.has_symbol("missing")
+        assert codebase.get_function("Bar", optional=True) is None
+        assert codebase.get_class("foo", optional=True) is None
+
+        codebase.get_function("baz").rename("qux")
+        codebase.create_file("file3.py", "def foo():\n    return 3\n")
+        codebase.commit()
+        assert codebase.get_function("baz", optional=True) is None
+        assert codebase.get_function("qux").filepath == "file2.py"
+        assert {s.filepath for s in codebase.get_symbols("foo")} == {"file1.py", "file3.py"}
+        with pytest.raises(ValueError):
+            codebase.get_function("foo")
+
+        codebase.get_file("file1.py").remove()
+        codebase.commit()
+        assert codebase.get_function("foo").filepath == "file3.py"
+        assert not codebase.has_symbol("Bar")
+        assert [s.name for s in codebase.get_symbols("foo")] == ["foo"]
+
+
+def test_codebase_symbol_index_follows_renames(tmpdir) -> None:
+    # language=python
+    content = """
+def helper():
+    return 1
+
+class Service:
+    def run(self):
+        return helper()
+"""
+    with get_codebase_session(tmpdir=tmpdir, files={"service.py": content, "main.py": "from service import helper\n\nhelper()\n"}) as codebase:
+        ctx = codebase.ctx
+        assert [s.name for s in ctx.get_symbols_by_name("run")] == ["run"]
+
+        codebase.get_function("helper").rename("assist")
+        codebase.get_class("Service").get_method("run").rename("start")
+        # The index is keyed by the names the symbols were parsed with until the rename is committed
+        assert codebase.has_symbol("helper")
+        codebase.commit()
+
+        assert ctx.get_symbols_by_name("helper") == []
+        assert ctx.get_symbols_by_name("run") == []
+        assert [s.filepath for s in ctx.get_symbols_by_name("assist")] == ["service.py"]
+        assert [s.parent_class.name for s in ctx.get_symbols_by_name("start", SymbolType.Function)] == ["Service"]
+        assert not codebase.has_symbol("helper")
+        assert codebase.has_symbol("assist")
+        assert {usage.usage_symbol.filepath for usage in codebase.get_function("assist").usages} == {"service.py", "main.py"}
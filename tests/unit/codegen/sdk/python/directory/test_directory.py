@@ -158,3 +158,27 @@ def test_subdirectories_listing_odd_filetypes(tmpdir) -> None:
         for subdir in subdirectories:
             assert subdir.dirpath in expected_tree.keys()
             assert list(subdir.items.keys()) == expected_tree[subdir.dirpath]
+
+
+def test_directory_updated_in_place(tmpdir) -> None:
+    with get_codebase_session(tmpdir=tmpdir, files={"dir/file1.py": "a = 1", "dir/subdir/file2.py": "b = 2"}) as codebase:
+        directory = codebase.get_directory("dir")
+        subdir = codebase.get_directory("dir/subdir")
+        assert directory.file_count == 2
+
+        codebase.create_file("dir/subdir/file3.py", "c = 3")
+        codebase.create_file("dir/new/file4.py", "d = 4")
+        codebase.commit()
+        assert codebase.get_directory("dir") is directory
+        assert codebase.get_directory("dir/subdir") is subdir
+        assert codebase.get_directory("dir/new").parent is directory
+        assert directory.file_count == 4
+        assert {f.filepath for f in subdir.files} == {"dir/subdir/file2.py", "dir/subdir/file3.py"}
+
+        codebase.get_file("dir/subdir/file2.py").remove()
+        codebase.get_file("dir/subdir/file3.py").remove()
+        codebase.commit()
+        assert codebase.get_directory("dir/subdir", optional=True) is None
+        assert codebase.get_directory("dir") is directory
+        assert {f.filepath for f in directory.files} == {"dir/file1.py", "dir/new/file4.py"}
+        assert {d.dirpath for d in codebase.directories} == {"", "dir", "dir/new"}
@@ -0,0 +1,69 @@
+from tree_sitter import Point, Range
+
+from codegen.sdk.codebase.factory.get_session import get_codebase_session
+from codegen.sdk.codebase.span import Span
+
+
+def byte_range(start: int, end: int) -> Range:
+    return Range(Point(0, start), Point(0, end), start, end)
+
+
+def test_file_find_by_byte_range(tmpdir) -> None:
+    # language=python
+    content = """
+def foo(a):
+    return bar(a + 1)
+
+def baz():
+    pass
+"""
+    with get_codebase_session(tmpdir=tmpdir, files={"test.py": content}) as codebase:
+        file = codebase.get_file("test.py")
+        nodes = file._range_index.nodes
+        start = content.index("a + 1")
+
+        found = file.find_by_byte_range(byte_range(start, start + 1))
+        assert found == sorted(found, key=lambda node: node.start_byte)
+        assert {id(node) for node in found} == {id(node) for node in nodes if node.start_byte < start + 1 and node.end_byte > start}
+        assert file.get_function("foo") in found
+        assert file.get_function("baz") not in found
+        assert codebase.find_by_span(Span(range=byte_range(start, start + 1), filepath="test.py")) == found
+
+        innermost = file._range_index.get_innermost(start)
+        assert innermost.source == "a"
+        containing = file._range_index.get_containing(start, start + len("a + 1"))
+        assert {node.source for node in containing} >= {"a + 1", "bar(a + 1)", "return bar(a + 1)", file.get_function("foo").source}
+        assert all(node.start_byte <= start and node.end_byte >= start + len("a + 1") for node in containing)
+
+        # The index is rebuilt after the file is reparsed
+        file.get_function("baz").rename("qux")
+        codebase.commit()
+        qux = file.get_function("qux")
+        assert file._range_index.get_innermost(qux.start_byte + len("def q")).source == "qux"
+
+
+def test_file_get_innermost_matches_scan(tmpdir) -> None:
+    content = "".join(f"def func{i}(a, b):\n    return helper(a + {i}, [b, {i}])\n\n" for i in range(200))
+    with get_codebase_session(tmpdir=tmpdir, files={"test.py": content}, verify_output=False) as codebase:
+        file = codebase.get_file("test.py")
+        range_index = file._range_index
+
+        def scan(start: int, end: int):
+            candidates = [node for node in range_index.nodes if node.start_byte <= start and node.end_byte >= end]
+            return min(candidates, key=lambda node: node.end_byte - node.start_byte, default=None)
+
+        def check() -> None:
+            for start in range(0, len(content), 7):
+                assert range_index.get_innermost(start) is scan(start, start)
+                assert range_index.get_innermost(start, start + 5) is scan(start, start + 5)
+                assert {id(node) for node in range_index.get_containing(start, start + 5)} == {id(node) for node in range_index.nodes if node.start_byte <= start and node.end_byte >= start + 5}
+
+        check()
+        # Editables created lazily after the tree is built are picked up without rebuilding it
+        tree = range_index.interval_tree
+        for function in file.functions[:3]:
+            function.extended
+        range_index.__dict__.pop("nodes")
+        assert range_index._pending
+        check()
+        assert range_index.interval_tree is tree
@@ -1,6 +1,7 @@
 from unittest.mock import MagicMock, patch
 
 from codegen.sdk.codebase.factory.get_session import get_codebase_session
+from codegen.sdk.codebase.flagging.groupers.codeowner_grouper import CodeownerGrouper
 
 
 def test_file_owners_non_codeowners_parser_returns_empty_set(tmpdir) -> None:
@@ -27,3 +28,34 @@ print("hello world")
             owners = file.owners
             assert len(owners) == 2
             assert owners == {"@team-owner", "@user-owner"}
+
+
+def test_codeowners_index_updated_on_sync(tmpdir) -> None:
+    mock_codeowners = MagicMock()
+    mock_codeowners.of = lambda file_path: [("TEAM", "@team-a")] if file_path.startswith("a/") else [("TEAM", "@team-b")]
+    mock_codeowners.paths = [("*", "*", [("TEAM", "@team-b")], 2, None), ("a/", "a/", [("TEAM", "@team-a")], 1, None)]
+    with patch("codegen.git.repo_operator.local_repo_operator.LocalRepoOperator.codeowners_parser", mock_codeowners):
+        with get_codebase_session(tmpdir=tmpdir, files={"a/file1.py": "x = 1", "b/file2.py": "y = 2"}) as codebase:
+            team_a = next(codeowner for codeowner in codebase.codeowners if codeowner.name == "@team-a")
+            assert [file.filepath for file in team_a.files] == ["a/file1.py"]
+
+            codebase.create_file("a/file3.py", "z = 3")
+            codebase.get_file("a/file1.py").remove()
+            codebase.commit()
+            node_ids = codebase.ctx.codeowners_index.file_node_ids("@team-a")
+            assert {codebase.ctx.get_node(node_id).filepath for node_id in node_ids} == {"a/file3.py"}
+            team_a = next(codeowner for codeowner in codebase.codeowners if codeowner.name == "@team-a")
+            assert [file.filepath for file in team_a.files] == ["a/file3.py"]
+
+
+def test_codeowner_grouper_uses_codeowners_index(tmpdir) -> None:
+    mock_codeowners = MagicMock()
+    mock_codeowners.of = MagicMock(side_effect=lambda file_path: [("TEAM", "@team-a")] if file_path.startswith("a/") else [])
+    with patch("codegen.git.repo_operator.local_repo_operator.LocalRepoOperator.codeowners_parser", mock_codeowners):
+        with get_codebase_session(tmpdir=tmpdir, files={"a/file1.py": "def f():\n    pass\n\ndef g():\n    pass\n", "b/file2.py": "y = 2"}) as codebase:
+            flags = [codebase.flag_instance(symbol) for symbol in [*codebase.get_file("a/file1.py").functions, codebase.get_file("b/file2.py")]]
+            for _ in range(2):
+                groups = CodeownerGrouper.create_all_groups(flags, codebase.op)
+                assert [(group.segment, len(group.flags)) for group in groups] == [("@team-a", 2), ("@no-owner", 1)]
+            # Every path is matched against the rules once, across calls
+            assert sorted(call.args[0] for call in mock_codeowners.of.call_args_list) == ["a/file1.py", "b/file2.py"]
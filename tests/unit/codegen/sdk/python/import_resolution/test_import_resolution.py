@@ -1,6 +1,10 @@
 from typing import TYPE_CHECKING
 
+from codegen.git.repo_operator.local_repo_operator import LocalRepoOperator
+from codegen.sdk.codebase.config import ProjectConfig
 from codegen.sdk.codebase.factory.get_session import get_codebase_session
+from codegen.sdk.core.codebase import Codebase
+from codegen.shared.enums.programming_language import ProgrammingLanguage
 
 if TYPE_CHECKING:
     from codegen.sdk.core.file import SourceFile
@@ -368,3 +372,52 @@ def test_import_wildcard_preserves_import_resolution(tmpdir: str) -> None:
         mainfile: SourceFile = codebase.get_file("file.py")
 
         assert len(mainfile.ctx.edges) == 5
+
+
+def test_import_resolution_module_index(tmpdir: str) -> None:
+    # language=python
+    with get_codebase_session(
+        tmpdir,
+        files={
+            "src/pkg/__init__.py": "",
+            "src/pkg/mod.py": "def helper():\n    pass\n",
+            "main.py": "from pkg.mod import helper\nimport pkg\nfrom pkg import other\n",
+        },
+    ) as codebase:
+        ctx = codebase.ctx
+        assert ctx.get_module_file("src.pkg.mod") == codebase.get_file("src/pkg/mod.py")
+        assert ctx.get_module_file("src.pkg.__init__") == codebase.get_file("src/pkg/__init__.py")
+        assert ctx.get_module_file("pkg.mod") is None
+
+        imports = codebase.get_file("main.py").imports
+        assert imports[0].resolved_symbol == codebase.get_function("helper")
+        assert imports[1].resolved_symbol == codebase.get_file("src/pkg/__init__.py")
+        assert imports[2].resolved_symbol is None
+
+        # The index follows files that are added, renamed and removed
+        codebase.create_file("src/pkg/other.py", "x = 1\n")
+        codebase.get_file("src/pkg/mod.py").rename("renamed")
+        codebase.commit()
+        assert ctx.get_module_file("src.pkg.mod") is None
+        assert ctx.get_module_file("src.pkg.renamed") == codebase.get_file("src/pkg/renamed.py")
+        imports = codebase.get_file("main.py").imports
+        assert imports[2].resolved_symbol == codebase.get_file("src/pkg/other.py")
+
+        codebase.get_file("src/pkg/other.py").remove()
+        codebase.commit()
+        assert ctx.get_module_file("src.pkg.other") is None
+        assert codebase.get_file("main.py").imports[2].resolved_symbol is None
+
+
+def test_import_resolution_base_path_with_dot(tmpdir: str) -> None:
+    # A base path that is no module prefix falls back to looking up files by path
+    files = {
+        "my.app/pkg/__init__.py": "",
+        "my.app/pkg/mod.py": "def helper():\n    pass\n",
+        "my.app/main.py": "from pkg.mod import helper\nfrom pkg import mod\n",
+    }
+    op = LocalRepoOperator.create_from_files(repo_path=str(tmpdir), files=files)
+    codebase = Codebase(projects=[ProjectConfig.from_repo_operator(op, programming_language=ProgrammingLanguage.PYTHON, base_path="my.app")])
+    imports = codebase.get_file("my.app/main.py").imports
+    assert imports[0].resolved_symbol == codebase.get_function("helper")
+    assert imports[1].resolved_symbol == codebase.get_file("my.app/pkg/mod.py")
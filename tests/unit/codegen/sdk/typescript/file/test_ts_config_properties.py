@@ -1,6 +1,8 @@
+import os
 from typing import TYPE_CHECKING
 
 from codegen.sdk.codebase.factory.get_session import get_codebase_session
+from codegen.sdk.typescript.ts_config import PathAliasTrie
 from codegen.shared.enums.programming_language import ProgrammingLanguage
 
 if TYPE_CHECKING:
@@ -130,3 +132,24 @@ def test_file_get_config(tmpdir) -> None:
             "app": ["shared/app"],
             "shared/app": ["shared/app"],
         }
+
+
+def test_path_alias_trie_longest_match() -> None:
+    aliases = ["@app", "@app/utils/", "@app/utils/math", "~", "shared/", "@appx"]
+    trie = PathAliasTrie({alias: f"target/{alias}" for alias in aliases})
+
+    def expected(path: str) -> str | None:
+        # Walk up the parent directories, like tsc does
+        while path and path != "/":
+            if path in aliases:
+                return path
+            if f"{path}/" in aliases:
+                return f"{path}/"
+            path = os.path.dirname(path)
+        return None
+
+    for path in ["@app", "@app/", "@app/x", "@app/utils", "@app/utils/math", "@app/utils/math/add", "@app/utilsx", "@appx/y", "@ap", "~/a/b", "shared", "shared/a", "sharedx", "/", "", "/@app"]:
+        match = trie.longest_match(path)
+        assert (match and match[0]) == expected(path), path
+        if match:
+            assert match[1] == f"target/{match[0]}"
@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING
 
+from codegen.sdk.codebase.diff_lite import ChangeType, DiffLite
 from codegen.sdk.codebase.factory.get_session import get_codebase_session
 from codegen.sdk.core.dataclasses.usage import UsageType
 from codegen.sdk.enums import ImportType
@@ -831,3 +832,49 @@ export function bar() {
         assert len(bar.call_sites) == 1
         assert foo.call_sites[0].source == "myFile2.foo()"
         assert bar.call_sites[0].source == "myFile3.bar()"
+
+
+def test_resolve_import_cache_invalidation(tmpdir) -> None:
+    files = {
+        "src/a.ts": "import { helper } from './utils';\nexport const x = helper();\n",
+        "src/b.ts": "import { helper } from './utils';\nexport const y = helper();\n",
+        "src/utils.ts": "export function helper() {}\n",
+    }
+    with get_codebase_session(tmpdir=tmpdir, files=files, programming_language=ProgrammingLanguage.TYPESCRIPT) as codebase:
+        cache = codebase.ctx.module_resolution_cache
+        assert "src/utils" in cache
+        assert codebase.get_file("src/a.ts").imports[0].from_file == codebase.get_file("src/utils.ts")
+        assert codebase.get_file("src/b.ts").imports[0].from_file == codebase.get_file("src/utils.ts")
+
+        # A directory index takes precedence over the sibling file, so adding one invalidates the resolution
+        codebase.create_file("src/utils/index.ts", "export function helper() {}\n")
+        codebase.commit()
+        assert "src/utils" not in cache
+        assert codebase.get_file("src/a.ts").imports[0].resolve_import().from_file == codebase.get_file("src/utils/index.ts")
+
+        codebase.get_file("src/utils/index.ts").remove()
+        codebase.commit()
+        assert codebase.get_file("src/b.ts").imports[0].resolve_import().from_file == codebase.get_file("src/utils.ts")
+        codebase.get_file("src/utils.ts").remove()
+        codebase.commit()
+        assert codebase.get_file("src/a.ts").imports[0].resolve_import() is None
+        assert cache.get("src/utils") is None
+
+
+def test_resolve_import_tsconfig_change(tmpdir) -> None:
+    files = {
+        "tsconfig.json": '{"compilerOptions": {"baseUrl": ".", "paths": {"@lib/*": ["./lib/*"]}}}',
+        "src/a.ts": "import { helper } from '@lib/utils';\nexport const x = helper();\n",
+        "lib/utils.ts": "export function helper() {}\n",
+        "other/utils.ts": "export function helper() {}\n",
+    }
+    with get_codebase_session(tmpdir=tmpdir, files=files, programming_language=ProgrammingLanguage.TYPESCRIPT) as codebase:
+        assert codebase.get_file("src/a.ts").imports[0].from_file == codebase.get_file("lib/utils.ts")
+
+        # Changing the alias re-resolves the imports going through it
+        path = codebase.ctx.to_absolute("tsconfig.json")
+        path.write_text('{"compilerOptions": {"baseUrl": ".", "paths": {"@lib/*": ["./other/*"]}}}')
+        codebase.ctx.apply_diffs([DiffLite(change_type=ChangeType.Modified, path=path)])
+        imp = codebase.get_file("src/a.ts").imports[0]
+        assert imp.from_file == codebase.get_file("other/utils.ts")
+        assert imp.imported_symbol == codebase.get_file("other/utils.ts").get_function("helper")